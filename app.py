@@ -6,47 +6,154 @@ persists aggregated results.
 """
 from __future__ import annotations
 
+import base64
+import csv
+import io
+import functools
+import hashlib
 import json
+import math
 import os
+import time
 import uuid
-from datetime import datetime
+import zlib
+from datetime import datetime, timedelta
 
-from flask import Flask, jsonify, render_template, request
-from sqlalchemy import text
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import (
+    Flask,
+    Response,
+    g,
+    jsonify,
+    make_response,
+    render_template,
+    request,
+    stream_with_context,
+)
+from sqlalchemy import event, func, insert, select, text, tuple_
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, selectinload
 
-from database import DatabaseManager, GameData
+from database import (
+    UID_LENGTH,
+    DatabaseManager,
+    GameData,
+    GameEventBatch,
+    GameLevelStats,
+    LevelAggregate,
+    PlayerAggregate,
+    apply_level_deltas,
+    apply_player_deltas,
+    build_level_stats,
+    bump_data_version,
+    current_data_version,
+    level_stat_deltas,
+    player_stat_deltas,
+    rebuild_level_aggregates,
+    upsert_game_sessions,
+)
+import event_log
+import metrics
+from levels import (
+    ALLOWED_GRID_SIZES,
+    ALLOWED_LEVEL_COUNTS,
+    ALLOWED_ROUNDS_PER_LEVEL,
+    DEFAULT_LEVEL_COUNT,
+    DEFAULT_LEVELS,
+    DEFAULT_ROUNDS_PER_LEVEL,
+    LEVEL_MAX_PROBABILITY,
+    LEVEL_MIN_PROBABILITY,
+    LEVEL_PRECISION,
+    generate_levels,
+)
+from response_cache import ResponseCache
+from static_assets import IMMUTABLE_CACHE_CONTROL, AssetBundle
+from write_behind import WriteBehindQueue
 import logging, sys
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 
 app = Flask(__name__)
 db_manager = DatabaseManager()
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "128")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "60")),
+)
 
-ALLOWED_GRID_SIZES = (3, 4, 5, 6, 7)
-LEVEL_MIN_PROBABILITY = 0.01
-LEVEL_MAX_PROBABILITY = 0.15
-LEVEL_PRECISION = 3
-ALLOWED_LEVEL_COUNTS = tuple(range(3, 11))
-DEFAULT_LEVEL_COUNT = 5
-ALLOWED_ROUNDS_PER_LEVEL = tuple(range(1, 11))
-DEFAULT_ROUNDS_PER_LEVEL = 2
-
-
-def _generate_levels(count: int) -> list[float]:
-    """Return evenly spaced probability levels between the configured bounds."""
-
-    safe_count = max(int(count), 1)
-    if safe_count == 1:
-        return [round(LEVEL_MIN_PROBABILITY, LEVEL_PRECISION)]
-
-    step = (LEVEL_MAX_PROBABILITY - LEVEL_MIN_PROBABILITY) / (safe_count - 1)
-    return [
-        round(LEVEL_MIN_PROBABILITY + step * index, LEVEL_PRECISION)
-        for index in range(safe_count)
-    ]
+metrics_registry = metrics.Registry()
+REQUEST_SECONDS = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time to build a response, by Flask endpoint.",
+    ("endpoint", "method"),
+)
+REQUESTS = metrics_registry.counter(
+    "http_requests_total", "Responses by Flask endpoint and status.", ("endpoint", "method", "status")
+)
+SQL_SECONDS = metrics_registry.histogram(
+    "db_query_duration_seconds", "Cursor execution time by statement type.", ("statement",)
+)
+PHASE_SECONDS = metrics_registry.histogram(
+    "app_phase_duration_seconds", "Time spent in JSON parse/serialize helpers.", ("phase",)
+)
+SAVE_UID_RETRIES = metrics_registry.counter(
+    "game_save_uid_retries_total", "UID collisions retried by /api/game/save."
+)
+SAVE_UID_EXHAUSTED = metrics_registry.counter(
+    "game_save_uid_exhausted_total", "Saves that gave up after repeated UID collisions."
+)
+EVENT_RECORDS = metrics_registry.counter(
+    "game_event_records_total", "Per-round event records appended by /api/game/events."
+)
+metrics_registry.gauge(
+    "db_pool_connections",
+    "Connection-pool utilisation (empty until the database is initialised).",
+    lambda: {
+        (key,): value
+        for key, value in db_manager.pool_status().items()
+        if key in ("size", "checked_out", "checked_in", "overflow")
+    },
+    ("state",),
+)
+metrics_registry.gauge(
+    "db_sqlite_writer",
+    "Tuned-SQLite writer: transactions, lock waits and WAL checkpoints.",
+    lambda: {
+        (key,): value
+        for key, value in ((db_manager.sqlite_status() or {}).get("stats") or {}).items()
+        if isinstance(value, (int, float))
+    },
+    ("stat",),
+)
+_SQL_STATEMENTS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_SETTLE_SECONDS = 5
+EXPORT_CSV_COLUMNS = (
+    "uid",
+    "timestamp",
+    "name",
+    "grid_size",
+    "level",
+    "probability",
+    "total_rounds",
+    "logical_failures",
+)
+MAX_SAVE_BATCH = 500
+MAX_EVENT_BATCHES = 20
+MAX_EVENT_RECORDS = 2000
+MAX_EVENT_BODY_BYTES = 512 * 1024
+DEFAULT_LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+MAX_THRESHOLD_RESAMPLES = 20000
+DEFAULT_BASELINE_SHOTS = 5000
+MAX_BASELINE_SHOTS = 20000
+DEFAULT_EXACT_LEVELS = 50
+MAX_EXACT_LEVELS = 500
 
-DEFAULT_LEVELS = _generate_levels(DEFAULT_LEVEL_COUNT)
 
 print("=" * 60)
 print("Surface Code prototype starting")
@@ -56,15 +163,8 @@ print(
 print("=" * 60)
 
 
-def _uid_max_length() -> int:
-    length = getattr(db_manager, "uid_max_length", 32)
-    if not isinstance(length, int) or length <= 0:
-        return 32
-    return length
-
-
 def _generate_uid() -> str:
-    limit = _uid_max_length()
+    limit = UID_LENGTH
     raw = uuid.uuid4().hex
     if limit >= len(raw):
         return raw
@@ -77,7 +177,7 @@ def _normalize_uid(raw_value: object) -> str | None:
     cleaned = "".join(ch for ch in str(raw_value).strip() if ch.isalnum())
     if not cleaned:
         return None
-    limit = _uid_max_length()
+    limit = UID_LENGTH
     return cleaned.lower()[:limit]
 
 
@@ -107,6 +207,7 @@ def _parse_json_array(raw_value, coercer):
     return output
 
 
+@PHASE_SECONDS.timed("parse_probability_stats")
 def _parse_probability_stats(raw_value):
     """Standardise aggregated probability stats sent by the client."""
 
@@ -140,8 +241,13 @@ def _parse_probability_stats(raw_value):
     return stats
 
 
+@PHASE_SECONDS.timed("serialize_game")
 def _serialize_game(game: GameData) -> dict:
-    """Convert database rows into plain dicts for JSON responses."""
+    """Convert database rows into plain dicts for JSON responses.
+
+    Per-level stats come from the ``game_level_stats`` children, so load them
+    with ``selectinload`` when serialising many rows.
+    """
 
     def _load_json(value: str):
         if not value:
@@ -157,14 +263,118 @@ def _serialize_game(game: GameData) -> dict:
         "name": game.name,
         "grid_size": game.grid_size,
         "error_probabilities": _load_json(game.error_probabilities),
-        "probability_stats": _load_json(game.probability_stats),
+        "probability_stats": [stat.as_dict() for stat in game.level_stats],
     }
 
 
+def _rate_with_stderr(failures: int, rounds: int) -> tuple[float, float]:
+    """Return the logical error rate and its binomial standard error."""
+
+    if rounds <= 0:
+        return 0.0, 0.0
+    rate = failures / rounds
+    variance = rate * (1 - rate) / rounds
+    return rate, math.sqrt(variance) if variance > 0 else 0.0
+
+
+def versioned_cache(view):
+    """Serve ``view`` from ``response_cache`` keyed on the shared data version.
+
+    Responses carry a strong ETag and ``Cache-Control: no-cache`` so browsers
+    revalidate and get ``304 Not Modified`` until a save bumps the version.
+    Streamed and non-200 responses pass through uncached.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        version = current_data_version(db_manager.session)
+        key = (request.path, tuple(sorted(request.args.items(multi=True))), version)
+        entry = response_cache.get(key)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            headers = [
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower().startswith("x-")
+            ]
+            entry = response_cache.put(key, response.get_data(), response.mimetype, headers)
+
+        response = app.response_class(entry.body, mimetype=entry.mimetype)
+        response.headers.extend(entry.headers)
+        response.set_etag(entry.etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    return wrapper
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    keyword = statement.lstrip()[:6].upper()
+    SQL_SECONDS.observe(
+        time.perf_counter() - started, keyword if keyword in _SQL_STATEMENTS else "OTHER"
+    )
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # Streamed bodies are timed until the response object is returned.
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, request.method)
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    return response
+
+
+@app.teardown_appcontext
+def _remove_db_session(exception=None):
+    # close() is a no-op until the database has been initialised, so static
+    # pages never trigger the lazy connect.
+    db_manager.close()
+
+
 @app.route("/")
 def index():
+    body, etag = _render_index()
+    response = make_response(body)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@functools.lru_cache(maxsize=1)
+def _static_bundle() -> AssetBundle:
+    """Fingerprint and compress the static assets on the first page or asset request.
+
+    The deploy build runs ``python static_assets.py`` so this only reads the
+    precompressed variants back from ``.cache/assets``.
+    """
+
+    return AssetBundle()
+
+
+@functools.lru_cache(maxsize=1)
+def _render_index() -> tuple[str, str]:
+    """Render the page shell once; it only depends on constants and asset digests."""
+
     database_mode = "PostgreSQL" if os.environ.get("DATABASE_URL") else "SQLite (local)"
-    return render_template(
+    body = render_template(
         "index.html",
         grid_sizes=ALLOWED_GRID_SIZES,
         levels=DEFAULT_LEVELS,
@@ -175,7 +385,26 @@ def index():
         rounds_per_level=DEFAULT_ROUNDS_PER_LEVEL,
         allowed_rounds=ALLOWED_ROUNDS_PER_LEVEL,
         database_mode=database_mode,
+        asset_url=_static_bundle().url,
     )
+    return body, hashlib.sha1(body.encode("utf-8")).hexdigest()[:24]
+
+
+@app.route("/assets/<path:filename>")
+def static_asset(filename):
+    asset = _static_bundle().get(filename)
+    if asset is None:
+        return jsonify({"status": "error", "message": "not found"}), 404
+
+    encoding = asset.negotiate(request.accept_encodings)
+    response = make_response(asset.variants[encoding])
+    response.mimetype = asset.mimetype
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    response.set_etag(f"{asset.digest}-{encoding}")
+    return response.make_conditional(request)
 
 
 @app.route("/api/health")
@@ -186,37 +415,483 @@ def api_health():
         status["database"] = "reachable"
     except Exception as exc:  # pragma: no cover - best effort
         status["database"] = f"error: {exc}"
+    status["pool"] = db_manager.pool_status()
+    status["startup"] = startup_report()
+    status["response_cache"] = response_cache.stats()
     return jsonify(status)
 
 
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics_registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route("/api/debug/ping")
 def api_ping():
     return jsonify({"message": "pong"})
 
 
+def _encode_cursor(game: GameData) -> str:
+    raw = f"{game.timestamp.isoformat()}|{game.uid}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(value: str) -> tuple[datetime, str]:
+    padded = value + "=" * (-len(value) % 4)
+    timestamp, uid = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+    return datetime.fromisoformat(timestamp), uid
+
+
+def _parse_datetime_arg(name: str) -> datetime | None:
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"invalid {name}") from None
+
+
+def _parse_grid_size_arg() -> int | None:
+    value = request.args.get("grid_size")
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("invalid grid_size") from None
+
+
+def _game_data_query():
+    """Build the filtered, newest-first query shared by the data endpoints.
+
+    Ordering on ``(timestamp, uid)`` matches ``ix_game_data_timestamp_uid`` so a
+    ``cursor`` turns into an index range scan rather than an offset.
+    """
+
+    query = select(GameData).options(selectinload(GameData.level_stats))
+    grid_size = _parse_grid_size_arg()
+    if grid_size is not None:
+        query = query.where(GameData.grid_size == grid_size)
+    name = request.args.get("name")
+    if name:
+        query = query.where(GameData.name == name)
+    since = _parse_datetime_arg("since")
+    if since is not None:
+        query = query.where(GameData.timestamp >= since)
+    until = _parse_datetime_arg("until")
+    if until is not None:
+        query = query.where(GameData.timestamp < until)
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("invalid cursor") from None
+        query = query.where(tuple_(GameData.timestamp, GameData.uid) < position)
+    return query.order_by(GameData.timestamp.desc(), GameData.uid.desc())
+
+
 @app.route("/api/game/data")
+@versioned_cache
 def api_game_data():
-    records = (
-        db_manager.session.query(GameData)
-        .order_by(GameData.timestamp.desc())
-        .limit(100)
-        .all()
+    try:
+        query = _game_data_query()
+    except ValueError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 400
+
+    if request.args.get("format") == "ndjson":
+        def generate():
+            rows = db_manager.session.scalars(
+                query.execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
+            for record in rows:
+                yield json.dumps(_serialize_game(record)) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    records = db_manager.session.scalars(query.limit(limit + 1)).all()
+    response = jsonify([_serialize_game(record) for record in records[:limit]])
+    if len(records) > limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(records[limit - 1])
+    return response
+
+
+def _export_rows(since: datetime | None, until: datetime, grid_size: int | None):
+    """Yield chunks of session/level rows, oldest first, from a streaming cursor.
+
+    Uses its own connection with ``stream_results`` (a server-side cursor on
+    PostgreSQL), so only ``EXPORT_CHUNK_SIZE`` rows are in memory at a time.
+    Sessions without level rows come through once with ``NULL`` level columns.
+    """
+
+    query = (
+        select(
+            GameData.uid,
+            GameData.timestamp,
+            GameData.name,
+            GameData.grid_size,
+            GameData.error_probabilities,
+            GameLevelStats.position,
+            GameLevelStats.probability,
+            GameLevelStats.total_rounds,
+            GameLevelStats.logical_failures,
+        )
+        .outerjoin(GameLevelStats, GameLevelStats.uid == GameData.uid)
+        .where(GameData.timestamp < until)
+        .order_by(GameData.timestamp, GameData.uid, GameLevelStats.position)
     )
-    return jsonify([_serialize_game(record) for record in records])
+    if since is not None:
+        query = query.where(GameData.timestamp >= since)
+    if grid_size is not None:
+        query = query.where(GameData.grid_size == grid_size)
 
+    with db_manager.reader_engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=EXPORT_CHUNK_SIZE
+        ).execute(query)
+        yield from result.partitions()
 
-@app.route("/api/game/save", methods=["POST"])
-def api_game_save():
-    payload = request.get_json(silent=True) or {}
+
+def _export_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    # The header goes out on its own so an empty pull is still a valid CSV.
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for chunk in chunks:
+        for row in chunk:
+            writer.writerow(
+                (
+                    row.uid,
+                    row.timestamp.isoformat() if row.timestamp else "",
+                    row.name or "",
+                    row.grid_size,
+                    "" if row.position is None else row.position,
+                    "" if row.probability is None else row.probability,
+                    "" if row.total_rounds is None else row.total_rounds,
+                    "" if row.logical_failures is None else row.logical_failures,
+                )
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _export_ndjson(chunks):
+    """One line per session; a session's level rows may span two chunks."""
+
+    pending = None
+
+    def line(entry) -> str:
+        return json.dumps(entry) + "\n"
+
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            if pending is None or pending["uid"] != row.uid:
+                if pending is not None:
+                    lines.append(line(pending))
+                try:
+                    probabilities = json.loads(row.error_probabilities or "[]")
+                except json.JSONDecodeError:
+                    probabilities = []
+                pending = {
+                    "uid": row.uid,
+                    "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                    "name": row.name,
+                    "grid_size": row.grid_size,
+                    "error_probabilities": probabilities,
+                    "probability_stats": [],
+                }
+            if row.position is not None:
+                pending["probability_stats"].append(
+                    {
+                        "probability": row.probability,
+                        "total_rounds": row.total_rounds,
+                        "logical_failures": row.logical_failures,
+                    }
+                )
+        yield "".join(lines)
+    if pending is not None:
+        yield line(pending)
+
+
+def _gzip_stream(pieces):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for piece in pieces:
+        data = compressor.compress(piece.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.route("/api/game/export")
+def api_game_export():
+    """Stream every stored session as gzip-compressed CSV or NDJSON.
+
+    ``since`` is inclusive and the upper bound is fixed when the request
+    starts (a few seconds back, so queued write-behind saves have landed).
+    It is returned in ``X-Export-Until`` to use as the next pull's ``since``.
+    """
+
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "ndjson"):
+        return jsonify({"status": "error", "message": "format must be csv or ndjson"}), 400
+    try:
+        since = _parse_datetime_arg("since")
+        grid_size = _parse_grid_size_arg()
+    except ValueError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 400
+    until = datetime.utcnow().replace(microsecond=0) - timedelta(seconds=EXPORT_SETTLE_SECONDS)
+
+    chunks = _export_rows(since, until, grid_size)
+    pieces = _export_csv(chunks) if export_format == "csv" else _export_ndjson(chunks)
+    filename = f"whack-an-error-{until:%Y%m%dT%H%M%S}.{export_format}.gz"
+    response = Response(stream_with_context(_gzip_stream(pieces)), mimetype="application/gzip")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["X-Export-Until"] = until.isoformat()
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/api/stats/aggregate")
+@versioned_cache
+def api_stats_aggregate():
+    query = db_manager.session.query(LevelAggregate)
+    grid_size = request.args.get("grid_size", type=int)
+    if grid_size is not None:
+        query = query.filter(LevelAggregate.grid_size == grid_size)
+    rows = query.order_by(LevelAggregate.grid_size, LevelAggregate.probability).all()
+
+    sections = {}
+    for row in rows:
+        if row.total_rounds <= 0:
+            continue
+        section = sections.setdefault(
+            row.grid_size,
+            {
+                "grid_size": row.grid_size,
+                "points": [],
+                "totals": {"total_rounds": 0, "logical_failures": 0},
+            },
+        )
+        rate, stderr = _rate_with_stderr(row.logical_failures, row.total_rounds)
+        section["points"].append(
+            {
+                "probability": row.probability,
+                "total_rounds": row.total_rounds,
+                "logical_failures": row.logical_failures,
+                "logical_error_rate": rate,
+                "stderr": stderr,
+            }
+        )
+        section["totals"]["total_rounds"] += row.total_rounds
+        section["totals"]["logical_failures"] += row.logical_failures
+    return jsonify(list(sections.values()))
+
+
+@app.route("/api/stats/threshold")
+@versioned_cache
+def api_stats_threshold():
+    """Crossing-point threshold estimate with bootstrap confidence intervals."""
+
+    from threshold import DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES, estimate_threshold
+
+    resamples = request.args.get("resamples", DEFAULT_RESAMPLES, type=int)
+    confidence = request.args.get("confidence", DEFAULT_CONFIDENCE, type=float)
+    min_rounds = request.args.get("min_rounds", 1, type=int)
+    if not 1 <= resamples <= MAX_THRESHOLD_RESAMPLES:
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": f"resamples must be in [1, {MAX_THRESHOLD_RESAMPLES}]",
+                }
+            ),
+            400,
+        )
+    if not 0.5 <= confidence < 1:
+        return jsonify({"status": "error", "message": "confidence must be in [0.5, 1)"}), 400
+
+    rows = db_manager.session.execute(
+        select(
+            LevelAggregate.grid_size,
+            LevelAggregate.probability,
+            LevelAggregate.total_rounds,
+            LevelAggregate.logical_failures,
+        )
+    ).all()
+    # Fixed seed: the same data version always yields the same interval.
+    return jsonify(
+        estimate_threshold(
+            rows, resamples=resamples, confidence=confidence, seed=0, min_rounds=min_rounds
+        )
+    )
+
+
+@app.route("/api/stats/reference")
+@versioned_cache
+def api_stats_reference():
+    """Importance-sampled decoder reference rates at the probabilities players saw."""
+
+    from importance_sampling import reference_strata
+
+    query = select(LevelAggregate.grid_size, LevelAggregate.probability).where(
+        LevelAggregate.total_rounds > 0
+    )
+    grid_size = request.args.get("grid_size", type=int)
+    if grid_size is not None:
+        if grid_size not in ALLOWED_GRID_SIZES:
+            return jsonify({"status": "error", "message": "invalid grid_size"}), 400
+        query = query.where(LevelAggregate.grid_size == grid_size)
+    rows = db_manager.session.execute(
+        query.order_by(LevelAggregate.grid_size, LevelAggregate.probability)
+    ).all()
+
+    sections = {}
+    for size, probability in rows:
+        if size not in ALLOWED_GRID_SIZES:
+            continue
+        # Sampled for the default levels; being p-independent the strata are
+        # reweighted to whatever probabilities the stored runs used.
+        strata = reference_strata(size)
+        section = sections.setdefault(
+            size,
+            {
+                "grid_size": size,
+                "decoder": type(strata.decoder).__name__,
+                "shots": strata.shots,
+                "points": [],
+            },
+        )
+        section["points"].append(strata.estimate(probability))
+    return jsonify(list(sections.values()))
+
+
+@app.route("/api/stats/exact")
+@versioned_cache
+def api_stats_exact():
+    """Exact undetected-logical rates from each distance's cached weight enumerator."""
+
+    from weight_enumerator import exact_rates, weight_counts
+
+    levels = request.args.get("levels", DEFAULT_EXACT_LEVELS, type=int)
+    if not 2 <= levels <= MAX_EXACT_LEVELS:
+        return (
+            jsonify({"status": "error", "message": f"levels must be in [2, {MAX_EXACT_LEVELS}]"}),
+            400,
+        )
+    grid_size = request.args.get("grid_size", type=int)
+    if grid_size is not None:
+        if grid_size not in ALLOWED_GRID_SIZES:
+            return jsonify({"status": "error", "message": "invalid grid_size"}), 400
+        distances = [grid_size]
+    else:
+        # Only distances that have been played; the chart has no curve for the rest.
+        rows = db_manager.session.execute(
+            select(LevelAggregate.grid_size)
+            .where(LevelAggregate.total_rounds > 0)
+            .distinct()
+            .order_by(LevelAggregate.grid_size)
+        ).scalars()
+        distances = [size for size in rows if size in ALLOWED_GRID_SIZES]
+
+    probabilities = generate_levels(levels)
+    sections = []
+    for size in distances:
+        _, clean_logical = weight_counts(size)
+        sections.append(
+            {
+                "grid_size": size,
+                "min_logical_weight": next(w for w, count in enumerate(clean_logical) if count),
+                "points": exact_rates(size, probabilities),
+            }
+        )
+    return jsonify(sections)
+
+
+@app.route("/api/leaderboard")
+@versioned_cache
+def api_leaderboard():
+    """Top players per (grid size, probability): lowest LER first, then most rounds."""
+
+    grid_size = request.args.get("grid_size", type=int)
+    probability = request.args.get("probability", type=float)
+    limit = request.args.get("limit", DEFAULT_LEADERBOARD_SIZE, type=int)
+    limit = max(1, min(limit, MAX_LEADERBOARD_SIZE))
+
+    ranking = (
+        PlayerAggregate.logical_error_rate.asc(),
+        PlayerAggregate.total_rounds.desc(),
+        PlayerAggregate.name.asc(),
+    )
+    query = select(PlayerAggregate).where(PlayerAggregate.total_rounds > 0)
+    if grid_size is not None:
+        query = query.where(PlayerAggregate.grid_size == grid_size)
+    if probability is not None:
+        query = query.where(PlayerAggregate.probability == round(probability, 6))
+
+    if grid_size is not None and probability is not None:
+        # A single level: walk ix_player_aggregates_rank and stop after ``limit``.
+        players = db_manager.session.scalars(query.order_by(*ranking).limit(limit)).all()
+        rows = [(player, rank) for rank, player in enumerate(players, start=1)]
+    else:
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=(PlayerAggregate.grid_size, PlayerAggregate.probability),
+                order_by=ranking,
+            )
+            .label("rank")
+        )
+        ranked = query.add_columns(rank).subquery()
+        player = aliased(PlayerAggregate, ranked)
+        rows = db_manager.session.execute(
+            select(player, ranked.c.rank)
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.grid_size, ranked.c.probability, ranked.c.rank)
+        ).all()
+
+    sections = {}
+    for player, position in rows:
+        section = sections.setdefault(
+            (player.grid_size, player.probability),
+            {"grid_size": player.grid_size, "probability": player.probability, "players": []},
+        )
+        section["players"].append(
+            {
+                "rank": position,
+                "name": player.name,
+                "total_rounds": player.total_rounds,
+                "logical_failures": player.logical_failures,
+                "logical_error_rate": player.logical_error_rate,
+            }
+        )
+    return jsonify(list(sections.values()))
+
+
+def _parse_save_payload(payload) -> tuple[dict | None, str | None]:
+    """Validate one session summary; returns ``(record, error_message)``."""
+
+    if not isinstance(payload, dict):
+        return None, "invalid payload"
     provided_uid = _normalize_uid(payload.get("uid"))
-    uid = provided_uid or _generate_uid()
+    name = payload.get("name")
+    if name is not None and not isinstance(name, str):
+        # Stored as text so the leaderboard key matches SQL ``trim``.
+        name = str(name)
 
     try:
         grid_size = int(payload.get("grid_size"))
     except (TypeError, ValueError):
         grid_size = None
     if grid_size not in ALLOWED_GRID_SIZES:
-        return jsonify({"status": "error", "message": "invalid grid_size"}), 400
+        return None, "invalid grid_size"
 
     error_probabilities = _parse_json_array(payload.get("error_probabilities"), float)
     probability_stats = _parse_probability_stats(payload.get("probability_stats"))
@@ -226,47 +901,328 @@ def api_game_save():
             for value in error_probabilities
         ]
 
-    error_probabilities_json = json.dumps(error_probabilities)
+    return {
+        "uid": provided_uid or _generate_uid(),
+        "generated": provided_uid is None,
+        "timestamp": datetime.utcnow(),
+        "name": name,
+        "grid_size": grid_size,
+        "error_probabilities": error_probabilities,
+        "probability_stats": probability_stats,
+    }, None
+
+
+def _flush_saved_sessions(records) -> None:
+    """Write a batch of parsed records with one upsert transaction."""
+
+    try:
+        with db_manager.writer() as session:
+            try:
+                upsert_game_sessions(session, records, uid_factory=_generate_uid)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            bump_data_version(session)
+    finally:
+        db_manager.close()
+
+
+write_behind = None
+if os.environ.get("WRITE_BEHIND_ENABLED") == "1":
+    write_behind = WriteBehindQueue(
+        _flush_saved_sessions,
+        max_size=int(os.environ.get("WRITE_BEHIND_MAX_QUEUE", "1000")),
+        interval=float(os.environ.get("WRITE_BEHIND_INTERVAL", "1.0")),
+        max_batch=int(os.environ.get("WRITE_BEHIND_MAX_BATCH", "200")),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _decoder_baseline(grid_size: int, probability: float, shots: int) -> dict:
+    """Decoder score for one level, seeded by its parameters so it is repeatable."""
+
+    import numpy as np
+
+    from decoder import baseline
+
+    seed = np.random.SeedSequence([grid_size, round(probability * 1_000_000), shots])
+    return baseline(grid_size, probability, shots, rng=np.random.default_rng(seed))
+
+
+@app.route("/api/decoder/baseline")
+def api_decoder_baseline():
+    grid_size = request.args.get("grid_size", type=int)
+    if grid_size not in ALLOWED_GRID_SIZES:
+        return jsonify({"status": "error", "message": "invalid grid_size"}), 400
+    probability = request.args.get("p", type=float)
+    if probability is None or not 0 < probability <= 0.5:
+        return jsonify({"status": "error", "message": "invalid p"}), 400
+    shots = request.args.get("shots", DEFAULT_BASELINE_SHOTS, type=int)
+    shots = min(max(shots, 1), MAX_BASELINE_SHOTS)
+    return jsonify(_decoder_baseline(grid_size, round(probability, 6), shots))
+
+
+@app.route("/api/game/save", methods=["POST"])
+def api_game_save():
+    payload = request.get_json(silent=True) or {}
+    parsed, error = _parse_save_payload(payload)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+
+    # Queued saves are written by the flusher; a full queue falls through to a
+    # synchronous write so the caller still gets backpressure, not data loss.
+    if write_behind is not None and write_behind.submit(parsed):
+        return jsonify({"status": "queued", "uid": parsed["uid"]}), 202
+
+    uid = parsed["uid"]
+    grid_size = parsed["grid_size"]
+    probability_stats = parsed["probability_stats"]
+    error_probabilities_json = json.dumps(parsed["error_probabilities"])
     probability_stats_json = json.dumps(probability_stats)
-    name_value = payload.get("name")
-
-    existing_record = db_manager.session.get(GameData, uid) if provided_uid else None
-    if existing_record:
-        existing_record.timestamp = datetime.utcnow()
-        existing_record.name = name_value
-        existing_record.grid_size = grid_size
-        existing_record.error_probabilities = error_probabilities_json
-        existing_record.probability_stats = probability_stats_json
-        try:
-            db_manager.session.commit()
-        except Exception as exc:  # pragma: no cover - database failure
-            db_manager.session.rollback()
-            return jsonify({"status": "error", "message": str(exc)}), 500
-        return jsonify({"status": "updated", "uid": uid})
-
-    attempts = 0
-    while attempts < 5:
-        record = GameData(
-            uid=uid,
-            name=name_value,
-            grid_size=grid_size,
-            error_probabilities=error_probabilities_json,
-            probability_stats=probability_stats_json,
+    name_value = parsed["name"]
+
+    with db_manager.writer() as session:
+        # Lock the stored row so a concurrent update of the same uid waits
+        # instead of subtracting the same old totals from the aggregates.
+        existing_record = (
+            None
+            if parsed["generated"]
+            else session.get(GameData, uid, with_for_update=True, populate_existing=True)
         )
-        try:
-            db_manager.session.add(record)
-            db_manager.session.commit()
-            return jsonify({"status": "stored", "uid": uid})
-        except IntegrityError:
-            db_manager.session.rollback()
-            uid = _generate_uid()
-            attempts += 1
+        if existing_record:
+            deltas = level_stat_deltas(
+                existing_record.grid_size,
+                [stat.as_dict() for stat in existing_record.level_stats],
+                sign=-1,
+            )
+            level_stat_deltas(grid_size, probability_stats, deltas=deltas)
+            player_deltas = player_stat_deltas(
+                existing_record.name,
+                existing_record.grid_size,
+                [stat.as_dict() for stat in existing_record.level_stats],
+                sign=-1,
+            )
+            player_stat_deltas(name_value, grid_size, probability_stats, deltas=player_deltas)
+            existing_record.timestamp = parsed["timestamp"]
+            existing_record.name = name_value
+            existing_record.grid_size = grid_size
+            existing_record.error_probabilities = error_probabilities_json
+            existing_record.probability_stats = probability_stats_json
+            existing_record.level_stats = build_level_stats(grid_size, probability_stats)
+            try:
+                apply_level_deltas(session, deltas)
+                apply_player_deltas(session, player_deltas)
+                session.commit()
+            except Exception as exc:  # pragma: no cover - database failure
+                session.rollback()
+                return jsonify({"status": "error", "message": str(exc)}), 500
+            bump_data_version(session)
+            return jsonify({"status": "updated", "uid": uid})
+
+        attempts = 0
+        while attempts < 5:
+            record = GameData(
+                uid=uid,
+                name=name_value,
+                grid_size=grid_size,
+                error_probabilities=error_probabilities_json,
+                probability_stats=probability_stats_json,
+                level_stats=build_level_stats(grid_size, probability_stats),
+            )
+            try:
+                session.add(record)
+                apply_level_deltas(
+                    session, level_stat_deltas(grid_size, probability_stats)
+                )
+                apply_player_deltas(
+                    session,
+                    player_stat_deltas(name_value, grid_size, probability_stats),
+                )
+                session.commit()
+                bump_data_version(session)
+                return jsonify({"status": "stored", "uid": uid})
+            except IntegrityError:
+                session.rollback()
+                SAVE_UID_RETRIES.inc()
+                uid = _generate_uid()
+                attempts += 1
+                continue
+            except Exception as exc:  # pragma: no cover - database failure
+                session.rollback()
+                return jsonify({"status": "error", "message": str(exc)}), 500
+
+        SAVE_UID_EXHAUSTED.inc()
+        return jsonify({"status": "error", "message": "could not allocate uid"}), 500
+
+
+@app.route("/api/game/save_batch", methods=["POST"])
+def api_game_save_batch():
+    payload = request.get_json(silent=True)
+    items = payload.get("sessions") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        return jsonify({"status": "error", "message": "expected a list of sessions"}), 400
+    if len(items) > MAX_SAVE_BATCH:
+        return (
+            jsonify({"status": "error", "message": f"at most {MAX_SAVE_BATCH} sessions"}),
+            413,
+        )
+
+    records = []
+    errors = []
+    for index, item in enumerate(items):
+        parsed, error = _parse_save_payload(item)
+        if error:
+            errors.append({"index": index, "message": error})
             continue
+        parsed["index"] = index
+        records.append(parsed)
+
+    updated = set()
+    if records:
+        with db_manager.writer() as session:
+            try:
+                updated = upsert_game_sessions(session, records, uid_factory=_generate_uid)
+                session.commit()
+            except Exception as exc:  # pragma: no cover - database failure
+                session.rollback()
+                return jsonify({"status": "error", "message": str(exc)}), 500
+            bump_data_version(session)
+
+    results = [
+        {
+            "index": record["index"],
+            "uid": record["uid"],
+            "status": "updated" if record["uid"] in updated else "stored",
+        }
+        for record in records
+    ]
+    return jsonify({"status": "ok", "results": results, "errors": errors})
+
+
+def _parse_event_batch(item) -> tuple[dict | None, str | None]:
+    if not isinstance(item, dict):
+        return None, "expected an event batch object"
+    uid = _normalize_uid(item.get("uid"))
+    if uid is None:
+        return None, "uid is required"
+    try:
+        grid_size = int(item.get("grid_size"))
+        level = int(item.get("level", 0))
+        probability = float(item.get("probability"))
+    except (TypeError, ValueError, OverflowError):
+        return None, "grid_size, level and probability must be numbers"
+    if grid_size not in ALLOWED_GRID_SIZES:
+        return None, "invalid grid_size"
+    # ``level`` is the 0-based index into the run's levels.
+    if not 0 <= level < max(ALLOWED_LEVEL_COUNTS) or not 0.0 <= probability <= 1.0:
+        return None, "invalid level or probability"
+    records = item.get("records")
+    if not isinstance(records, list) or not records:
+        return None, "records must be a non-empty list"
+    if len(records) > MAX_EVENT_RECORDS:
+        return None, f"at most {MAX_EVENT_RECORDS} records per batch"
+    try:
+        payload = event_log.encode_batch(grid_size, records)
+    except ValueError as exc:
+        return None, str(exc)
+    return {
+        "uid": uid,
+        "level": level,
+        "grid_size": grid_size,
+        "probability": round(probability, 6),
+        "record_count": len(records),
+        "payload": payload,
+    }, None
+
+
+@app.route("/api/game/events", methods=["POST"])
+def api_game_events():
+    """Append per-round event logs, one packed row per level.
+
+    ``navigator.sendBeacon`` posts without a JSON content type, so the body
+    is parsed regardless of it. Event logs are not part of any served
+    summary, so the data version is left alone and no cache is invalidated.
+    """
+
+    if (request.content_length or 0) > MAX_EVENT_BODY_BYTES:
+        return jsonify({"status": "error", "message": "payload too large"}), 413
+    payload = request.get_json(silent=True, force=True)
+    items = payload.get("batches", [payload]) if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        return jsonify({"status": "error", "message": "expected event batches"}), 400
+    if len(items) > MAX_EVENT_BATCHES:
+        return (
+            jsonify({"status": "error", "message": f"at most {MAX_EVENT_BATCHES} batches"}),
+            413,
+        )
+
+    rows = []
+    for item in items:
+        row, error = _parse_event_batch(item)
+        if error:
+            return jsonify({"status": "error", "message": error}), 400
+        rows.append(row)
+
+    with db_manager.writer() as session:
+        try:
+            session.execute(insert(GameEventBatch), rows)
+            session.commit()
         except Exception as exc:  # pragma: no cover - database failure
-            db_manager.session.rollback()
+            session.rollback()
             return jsonify({"status": "error", "message": str(exc)}), 500
+    records = sum(row["record_count"] for row in rows)
+    EVENT_RECORDS.inc(amount=records)
+    return jsonify({"status": "stored", "batches": len(rows), "records": records}), 202
+
+
+@app.route("/api/game/events/<uid>")
+def api_game_events_for_session(uid):
+    normalized = _normalize_uid(uid)
+    if normalized is None:
+        return jsonify({"status": "error", "message": "invalid uid"}), 400
+    batches = db_manager.session.scalars(
+        select(GameEventBatch)
+        .where(GameEventBatch.uid == normalized)
+        .order_by(GameEventBatch.id)
+    ).all()
+    return jsonify(
+        [
+            {
+                "level": batch.level,
+                "grid_size": batch.grid_size,
+                "probability": batch.probability,
+                "created_at": batch.created_at.isoformat(),
+                "records": event_log.decode_batch(batch.payload)["records"],
+            }
+            for batch in batches
+        ]
+    )
+
+
+@app.cli.command("backfill-aggregates")
+def backfill_aggregates_command():
+    """Rebuild the per-level and per-player aggregate tables from every stored session."""
+
+    with db_manager.writer() as session:
+        try:
+            scanned = rebuild_level_aggregates(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        bump_data_version(session)
+    print(f"Rebuilt level aggregates from {scanned} stored sessions.")
+
+
+def startup_report() -> dict:
+    """Cold-start breakdown: module import, engine creation and schema check (ms)."""
+
+    return {"import_ms": IMPORT_MS, **db_manager.startup_timings}
+
 
-    return jsonify({"status": "error", "message": "could not allocate uid"}), 500
+IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 3)
+print(f"⏱  App imported in {IMPORT_MS} ms; the database initialises on first use")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+"""Benchmarks for the app's hot paths, the simulators and the HTTP API.
+
+Run from the repository root:
+
+    python -m benchmarks.run                  # everything, results/<commit>.json
+    python -m benchmarks.run --only micro --quick
+    python -m benchmarks.compare base.json head.json
+
+The API benchmarks always run against a throw-away SQLite database; the
+configured ``DATABASE_URL`` is never touched unless ``--url`` points the load
+generator at an already running server.
+"""
@@ -0,0 +1,82 @@
+"""Timing helpers and result metadata shared by the benchmark modules."""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import timeit
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+
+def measure(func, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """Time ``func()`` like ``timeit``: calibrate a loop count, keep the best repeat.
+
+    ``seconds`` (best per-call time) is the figure to compare between runs; the
+    median shows how noisy the machine was.
+    """
+
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(int(number * min_time / max(elapsed, 1e-9)), 1)
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    best = min(runs)
+    return {
+        "seconds": best,
+        "median_seconds": statistics.median(runs),
+        "calls_per_s": 1.0 / best if best > 0 else float("inf"),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def environment() -> dict:
+    import numpy as np
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def write_results(results: dict, path: str | None = None) -> str:
+    if path is None:
+        name = results.get("environment", {}).get("commit") or "results"
+        path = os.path.join(RESULTS_DIR, f"{name}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+    return path
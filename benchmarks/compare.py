@@ -0,0 +1,73 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare base.json head.json [--threshold 0.10]
+
+Times (``seconds``, ``*_ms``) are better when lower; rates (``*_per_s``) are
+better when higher. Exits with status 1 when any metric regresses by more
+than the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+# Primary figure per entry; medians, loop counts and config are not compared.
+LOWER_IS_BETTER = ("seconds", "p50_ms", "p99_ms")
+HIGHER_IS_BETTER = ("shots_per_s", "requests_per_s")
+
+
+def _flatten(results: dict) -> dict:
+    flat = {}
+    for suite in ("micro", "simulation", "load"):
+        for name, entry in results.get(suite, {}).items():
+            if not isinstance(entry, dict):
+                continue
+            for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+                value = entry.get(key)
+                if isinstance(value, (int, float)):
+                    flat[(suite, name, key)] = float(value)
+    return flat
+
+
+def compare(base: dict, head: dict, threshold: float = 0.10) -> tuple[list, list]:
+    """Return ``(rows, regressions)``; ``change`` > 0 always means "got worse"."""
+
+    before, after = _flatten(base), _flatten(head)
+    rows, regressions = [], []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if old <= 0 or new <= 0:
+            continue
+        change = new / old - 1 if key[2] in LOWER_IS_BETTER else old / new - 1
+        row = (*key, old, new, change)
+        rows.append(row)
+        if change > threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as handle:
+        base = json.load(handle)
+    with open(args.head, encoding="utf-8") as handle:
+        head = json.load(handle)
+
+    rows, regressions = compare(base, head, args.threshold)
+    print(f"{'suite':<11} {'benchmark':<42} {'metric':<15} {'base':>12} {'head':>12} {'worse':>8}")
+    for suite, name, key, old, new, change in rows:
+        flag = "  !" if change > args.threshold else ""
+        print(f"{suite:<11} {name:<42} {key:<15} {old:>12.4g} {new:>12.4g} {change:>+8.1%}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Concurrent ``/api/game/save`` and ``/api/game/data`` traffic against a live server.
+
+By default the app is served in-process by a threaded werkzeug server on an
+ephemeral port, backed by the temporary SQLite database that
+``benchmarks.run`` configures. Pass ``url`` to drive an external server
+(e.g. gunicorn) instead.
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.common import percentile
+
+PLAYER_NAMES = tuple(f"bench-{index:02d}" for index in range(40))
+
+
+def _save_payload(rng: random.Random, grid_sizes, levels) -> dict:
+    stats = []
+    for p in levels:
+        rounds = rng.randint(2, 10)
+        stats.append(
+            {"probability": p, "total_rounds": rounds, "logical_failures": rng.randint(0, rounds)}
+        )
+    return {
+        "uid": uuid.uuid4().hex,
+        "name": rng.choice(PLAYER_NAMES),
+        "grid_size": rng.choice(grid_sizes),
+        "error_probabilities": list(levels),
+        "probability_stats": stats,
+    }
+
+
+class _Client:
+    """Opens a fresh connection per request, so one instance can be shared by threads."""
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+
+    def request(self, method: str, path: str, body=None) -> int:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            headers = {}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+
+def _serve_app():
+    from werkzeug.serving import make_server
+
+    import app
+
+    # Per-request access logs would dominate the run's output and timing.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _summarise(samples, elapsed: float) -> dict:
+    latencies = sorted(latency for latency, ok in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "requests_per_s": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def run(
+    duration: float = 10.0,
+    concurrency: int = 8,
+    save_fraction: float = 0.3,
+    seed_sessions: int = 500,
+    url: str | None = None,
+    seed: int = 0,
+) -> dict:
+    from app import ALLOWED_GRID_SIZES, DEFAULT_LEVELS, MAX_SAVE_BATCH
+
+    server = None
+    if url is None:
+        server, url = _serve_app()
+    try:
+        rng = random.Random(seed)
+        client = _Client(url)
+        # Pre-populate so /api/game/data pages through realistic rows.
+        remaining = seed_sessions
+        while remaining > 0:
+            batch = [
+                _save_payload(rng, ALLOWED_GRID_SIZES, DEFAULT_LEVELS)
+                for _ in range(min(remaining, MAX_SAVE_BATCH))
+            ]
+            client.request("POST", "/api/game/save_batch", batch)
+            remaining -= len(batch)
+
+        samples = {"save": [], "data": []}
+        deadline = time.perf_counter() + duration
+
+        def worker(index: int) -> None:
+            local_rng = random.Random(seed * 1000 + index + 1)
+            local = {"save": [], "data": []}
+            while time.perf_counter() < deadline:
+                if local_rng.random() < save_fraction:
+                    kind, method, path = "save", "POST", "/api/game/save"
+                    body = _save_payload(local_rng, ALLOWED_GRID_SIZES, DEFAULT_LEVELS)
+                else:
+                    kind, method, path, body = "data", "GET", "/api/game/data", None
+                started = time.perf_counter()
+                try:
+                    status = client.request(method, path, body)
+                except OSError:
+                    status = 0
+                local[kind].append((time.perf_counter() - started, 200 <= status < 300))
+            for kind, values in local.items():
+                samples[kind].extend(values)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    results = {kind: _summarise(values, elapsed) for kind, values in samples.items()}
+    results["total"] = _summarise(samples["save"] + samples["data"], elapsed)
+    results["config"] = {
+        "duration": duration,
+        "concurrency": concurrency,
+        "save_fraction": save_fraction,
+        "seed_sessions": seed_sessions,
+        "external": server is None,
+    }
+    return results
@@ -0,0 +1,68 @@
+"""Micro-benchmarks of the request-path helpers in ``app.py`` and code construction."""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+from benchmarks.common import measure
+
+
+def _sample_stats(levels) -> list[dict]:
+    return [
+        {"probability": p, "total_rounds": 12 + index, "logical_failures": index % 3}
+        for index, p in enumerate(levels)
+    ]
+
+
+def run(quick: bool = False) -> dict:
+    import app
+    import levels as game_levels
+    from database import GameData, build_level_stats
+    from game_pseudocode import surface_code
+
+    repeat = 3 if quick else 5
+    min_time = 0.05 if quick else 0.2
+    results = {}
+
+    def bench(name, func):
+        results[name] = measure(func, repeat=repeat, min_time=min_time)
+
+    for count in (game_levels.DEFAULT_LEVEL_COUNT, max(game_levels.ALLOWED_LEVEL_COUNTS)):
+        levels = game_levels.generate_levels(count)
+        stats = _sample_stats(levels)
+        stats_json = json.dumps(stats)
+        levels_json = json.dumps(levels)
+
+        bench(f"generate_levels[{count}]", lambda count=count: game_levels.generate_levels(count))
+        bench(
+            f"parse_json_array[list,{count}]",
+            lambda levels=levels: app._parse_json_array(levels, float),
+        )
+        bench(
+            f"parse_json_array[json,{count}]",
+            lambda raw=levels_json: app._parse_json_array(raw, float),
+        )
+        bench(
+            f"parse_probability_stats[list,{count}]",
+            lambda stats=stats: app._parse_probability_stats(stats),
+        )
+        bench(
+            f"parse_probability_stats[json,{count}]",
+            lambda raw=stats_json: app._parse_probability_stats(raw),
+        )
+
+        game = GameData(
+            uid="0" * 32,
+            timestamp=datetime(2024, 1, 1, 12, 0, 0),
+            name="bench",
+            grid_size=5,
+            error_probabilities=levels_json,
+            probability_stats=stats_json,
+            level_stats=build_level_stats(5, stats),
+        )
+        bench(f"serialize_game[{count}]", lambda game=game: app._serialize_game(game))
+
+    for d in app.ALLOWED_GRID_SIZES:
+        bench(f"surface_code[d={d}]", lambda d=d: surface_code(d))
+
+    return results
@@ -0,0 +1,61 @@
+"""Run the benchmark suite and write the results as JSON.
+
+    python -m benchmarks.run [--only micro simulation load] [--quick] [--output path]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+
+SUITES = ("micro", "simulation", "load")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Whack-an-Error benchmark suite")
+    parser.add_argument("--only", nargs="*", choices=SUITES, default=None)
+    parser.add_argument("--quick", action="store_true", help="shorter runs for smoke checks")
+    parser.add_argument("--output", default=None, help="default: benchmarks/results/<commit>.json")
+    parser.add_argument("--shots", type=int, default=None, help="shots per simulator benchmark")
+    parser.add_argument("--duration", type=float, default=None, help="load test seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--save-fraction", type=float, default=0.3)
+    parser.add_argument("--url", default=None, help="load-test an already running server")
+    args = parser.parse_args(argv)
+
+    # Must happen before anything imports app/database.
+    workdir = tempfile.mkdtemp(prefix="whack-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("DECODER_CACHE_DIR", os.path.join(workdir, "decoder-cache"))
+    os.environ.setdefault("ASSET_CACHE_DIR", os.path.join(workdir, "asset-cache"))
+
+    from benchmarks.common import environment, write_results
+
+    suites = args.only or SUITES
+    results = {"environment": environment(), "quick": args.quick}
+    if "micro" in suites:
+        from benchmarks import micro
+
+        results["micro"] = micro.run(quick=args.quick)
+    if "simulation" in suites:
+        from benchmarks import simulation_bench
+
+        results["simulation"] = simulation_bench.run(quick=args.quick, shots=args.shots)
+    if "load" in suites:
+        from benchmarks import load
+
+        duration = args.duration or (3.0 if args.quick else 15.0)
+        results["load"] = load.run(
+            duration=duration,
+            concurrency=args.concurrency,
+            save_fraction=args.save_fraction,
+            seed_sessions=100 if args.quick else 500,
+            url=args.url,
+        )
+
+    path = write_results(results, args.output)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of the game's sampling loop and the vectorised simulators (shots/s)."""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+# Middle of the default level range; high enough that syndromes are common.
+BENCH_PROBABILITY = 0.08
+
+
+def _per_shot_loop(d: int, p: float, shots: int, rng: np.random.Generator) -> int:
+    """The sampling part of ``game_pseudocode.main``: one error and one ``H @ e`` per shot."""
+
+    from simulation import code_matrices
+
+    H, L = code_matrices(d)
+    n_qubits = H.shape[1]
+    hidden = 0
+    for _ in range(shots):
+        error = (rng.random(n_qubits) < p).astype(np.uint8)
+        syndrome = H @ error % 2
+        if not syndrome.any() and (error @ L) % 2:
+            hidden += 1
+    return hidden
+
+
+def _throughput(func, shots: int) -> dict:
+    started = time.perf_counter()
+    func(shots)
+    elapsed = time.perf_counter() - started
+    return {
+        "shots": shots,
+        "seconds": elapsed,
+        "shots_per_s": shots / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def run(quick: bool = False, shots: int | None = None, distances=None) -> dict:
+    from levels import ALLOWED_GRID_SIZES
+    from decoder import baseline
+    from packed_code import simulate_packed
+    from simulation import simulate, syndrome_free_probabilities
+    from weight_enumerator import exact_rates, sweep_counts
+
+    shots = shots or (50_000 if quick else 500_000)
+    loop_shots = max(shots // 100, 500)
+    decoder_shots = max(shots // 10, 1000)
+    p = BENCH_PROBABILITY
+    results = {}
+    for d in distances or ALLOWED_GRID_SIZES:
+        rng = np.random.default_rng(d)
+        # Warm the per-distance caches so only sampling is timed.
+        simulate(d, p, 64, rng=rng)
+        simulate_packed(d, p, 64, rng=rng)
+        baseline(d, p, 64, rng=rng)
+
+        results[f"per_shot_loop[d={d}]"] = _throughput(
+            lambda n: _per_shot_loop(d, p, n, rng), loop_shots
+        )
+        results[f"simulate[d={d}]"] = _throughput(lambda n: simulate(d, p, n, rng=rng), shots)
+        results[f"simulate_packed[d={d}]"] = _throughput(
+            lambda n: simulate_packed(d, p, n, rng=rng), shots
+        )
+        results[f"decoder_baseline[d={d}]"] = _throughput(
+            lambda n: baseline(d, p, n, rng=rng), decoder_shots
+        )
+
+        syndrome_free_probabilities.cache_clear()
+        started = time.perf_counter()
+        syndrome_free_probabilities(d, p)
+        results[f"syndrome_free_probabilities[d={d}]"] = {
+            "seconds": time.perf_counter() - started
+        }
+
+        started = time.perf_counter()
+        sweep_counts(d)
+        results[f"weight_enumerator_sweep[d={d}]"] = {"seconds": time.perf_counter() - started}
+        exact_rates(d, [p])
+        started = time.perf_counter()
+        exact_rates(d, [p])
+        results[f"exact_rates[d={d}]"] = {"seconds": time.perf_counter() - started}
+    return results
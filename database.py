@@ -1,13 +1,39 @@
 """Database Module for Whack-an-Error."""
 
+import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine, inspect, text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    cast,
+    create_engine,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+    update,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import relationship, scoped_session, sessionmaker
 
 Base = declarative_base()
+# Generated uids are 32 hex digits; ``_migrate_uid_length`` widens older columns.
+UID_LENGTH = 32
 
 
 class GameData(Base):
@@ -15,16 +41,739 @@ class GameData(Base):
 
     __tablename__ = "game_data"
 
-    uid = Column(String(32), primary_key=True)
+    uid = Column(String(UID_LENGTH), primary_key=True)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     name = Column(String(100))
     grid_size = Column(Integer, nullable=False)
     error_probabilities = Column(Text, nullable=False)
     probability_stats = Column(Text, nullable=False)
 
+    level_stats = relationship(
+        "GameLevelStats",
+        order_by="GameLevelStats.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (Index("ix_game_data_timestamp_uid", "timestamp", "uid"),)
+
+
+class GameLevelStats(Base):
+    """One row per level of a stored session, normalised out of ``probability_stats``."""
+
+    __tablename__ = "game_level_stats"
+
+    uid = Column(
+        String(UID_LENGTH), ForeignKey("game_data.uid", ondelete="CASCADE"), primary_key=True
+    )
+    position = Column(Integer, primary_key=True)
+    grid_size = Column(Integer, nullable=False)
+    probability = Column(Float, nullable=False)
+    total_rounds = Column(Integer, nullable=False, default=0)
+    logical_failures = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_game_level_stats_grid_probability", "grid_size", "probability"),
+    )
+
+    def as_dict(self) -> dict:
+        return {
+            "probability": self.probability,
+            "total_rounds": self.total_rounds,
+            "logical_failures": self.logical_failures,
+        }
+
+
+class DataVersion(Base):
+    """Single-row counter bumped by every write that changes served data.
+
+    Response caches in each worker compare against it, so invalidation is
+    shared across processes through one primary-key read. Writers bump it in
+    a separate short transaction after their data commits, so the row lock is
+    never held for the length of a write.
+    """
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+def bump_data_version(session) -> None:
+    """Increment the shared data version in its own transaction; call after committing.
+
+    Bumping after the data is visible is safe: a response cached under the
+    old version was read before the bump and is invalidated by it. A failed
+    bump is logged, not raised, since the data is already stored; caches then
+    catch up when their TTL expires.
+    """
+
+    try:
+        session.execute(
+            update(DataVersion).where(DataVersion.id == 1).values(version=DataVersion.version + 1)
+        )
+        session.commit()
+    except Exception as exc:
+        session.rollback()
+        print(f"⚠️  Data version bump failed: {exc}")
+
+
+def current_data_version(session) -> int:
+    return session.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar() or 0
+
+
+class SchemaVersion(Base):
+    """Applied entries of ``SCHEMA_MIGRATIONS``."""
+
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class LevelAggregate(Base):
+    """Running totals per (grid size, probability) across every stored session."""
+
+    __tablename__ = "level_aggregates"
+
+    grid_size = Column(Integer, primary_key=True)
+    probability = Column(Float, primary_key=True)
+    total_rounds = Column(Integer, nullable=False, default=0)
+    logical_failures = Column(Integer, nullable=False, default=0)
+
+
+class PlayerAggregate(Base):
+    """Running totals per (grid size, probability, player) for the leaderboard.
+
+    ``logical_error_rate`` is stored (``NULL`` until a player has rounds) so
+    ``ix_player_aggregates_rank`` can serve top-k queries without sorting.
+    """
+
+    __tablename__ = "player_aggregates"
+
+    grid_size = Column(Integer, primary_key=True)
+    probability = Column(Float, primary_key=True)
+    name = Column(String(100), primary_key=True)
+    total_rounds = Column(Integer, nullable=False, default=0)
+    logical_failures = Column(Integer, nullable=False, default=0)
+    logical_error_rate = Column(Float)
+
+    __table_args__ = (
+        Index(
+            "ix_player_aggregates_rank",
+            "grid_size",
+            "probability",
+            "logical_error_rate",
+            total_rounds.desc(),
+            "name",
+        ),
+    )
+
+
+class GameEventBatch(Base):
+    """One level's per-round event log, packed by ``event_log.encode_batch``.
+
+    Kept apart from ``game_data`` (no foreign key: batches arrive before the
+    summary save) so event logs never widen the rows the summary endpoints read.
+    """
+
+    __tablename__ = "game_event_batches"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uid = Column(String(UID_LENGTH), nullable=False)
+    level = Column(Integer, nullable=False)
+    grid_size = Column(Integer, nullable=False)
+    probability = Column(Float, nullable=False)
+    record_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_game_event_batches_uid", "uid", "id"),)
+
+
+ANONYMOUS_PLAYER = "Anonymous"
+
+
+def player_name(name) -> str:
+    """Leaderboard key for a stored session name (blank names are pooled).
+
+    Only spaces are stripped so the key matches SQL ``trim`` in
+    ``_player_totals_select``.
+    """
+
+    return ("" if name is None else str(name)).strip(" ") or ANONYMOUS_PLAYER
+
+
+def level_stat_deltas(grid_size, stats, sign=1, deltas=None):
+    """Accumulate ``(rounds, failures)`` deltas keyed by ``(grid_size, probability)``."""
+
+    deltas = {} if deltas is None else deltas
+    for entry in stats or []:
+        key = (grid_size, round(float(entry["probability"]), 6))
+        rounds, failures = deltas.get(key, (0, 0))
+        deltas[key] = (
+            rounds + sign * int(entry["total_rounds"]),
+            failures + sign * int(entry["logical_failures"]),
+        )
+    return deltas
+
+
+def player_stat_deltas(name, grid_size, stats, sign=1, deltas=None):
+    """Like ``level_stat_deltas`` but keyed by ``(grid_size, probability, player)``."""
+
+    deltas = {} if deltas is None else deltas
+    player = player_name(name)
+    for (grid, probability), change in level_stat_deltas(grid_size, stats, sign).items():
+        rounds, failures = deltas.get((grid, probability, player), (0, 0))
+        deltas[(grid, probability, player)] = (rounds + change[0], failures + change[1])
+    return deltas
+
+
+def _dialect_insert(dialect_name):
+    """Return the insert construct supporting ``ON CONFLICT`` for the dialect."""
+
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def apply_level_deltas(session, deltas) -> None:
+    """Add per-level deltas to ``level_aggregates`` inside the session's transaction."""
+
+    rows = [
+        {
+            "grid_size": grid_size,
+            "probability": probability,
+            "total_rounds": rounds,
+            "logical_failures": failures,
+        }
+        for (grid_size, probability), (rounds, failures) in deltas.items()
+        if rounds or failures
+    ]
+    if not rows:
+        return
+
+    insert = _dialect_insert(session.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            aggregate = session.get(
+                LevelAggregate, (row["grid_size"], row["probability"])
+            )
+            if aggregate is None:
+                session.add(LevelAggregate(**row))
+                continue
+            aggregate.total_rounds += row["total_rounds"]
+            aggregate.logical_failures += row["logical_failures"]
+        return
+
+    statement = insert(LevelAggregate).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[LevelAggregate.grid_size, LevelAggregate.probability],
+        set_={
+            "total_rounds": LevelAggregate.total_rounds
+            + statement.excluded.total_rounds,
+            "logical_failures": LevelAggregate.logical_failures
+            + statement.excluded.logical_failures,
+        },
+    )
+    session.execute(statement)
+
+
+def apply_player_deltas(session, deltas) -> None:
+    """Add per-player deltas to ``player_aggregates`` and refresh their stored rates."""
+
+    rows = [
+        {
+            "grid_size": grid_size,
+            "probability": probability,
+            "name": name,
+            "total_rounds": rounds,
+            "logical_failures": failures,
+            "logical_error_rate": failures / rounds if rounds > 0 else None,
+        }
+        for (grid_size, probability, name), (rounds, failures) in deltas.items()
+        if rounds or failures
+    ]
+    if not rows:
+        return
+
+    insert = _dialect_insert(session.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            aggregate = session.get(
+                PlayerAggregate, (row["grid_size"], row["probability"], row["name"])
+            )
+            if aggregate is None:
+                session.add(PlayerAggregate(**row))
+                continue
+            aggregate.total_rounds += row["total_rounds"]
+            aggregate.logical_failures += row["logical_failures"]
+            aggregate.logical_error_rate = (
+                aggregate.logical_failures / aggregate.total_rounds
+                if aggregate.total_rounds > 0
+                else None
+            )
+        return
+
+    statement = insert(PlayerAggregate).values(rows)
+    rounds = PlayerAggregate.total_rounds + statement.excluded.total_rounds
+    failures = PlayerAggregate.logical_failures + statement.excluded.logical_failures
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            PlayerAggregate.grid_size,
+            PlayerAggregate.probability,
+            PlayerAggregate.name,
+        ],
+        set_={
+            "total_rounds": rounds,
+            "logical_failures": failures,
+            "logical_error_rate": cast(failures, Float) / func.nullif(rounds, 0),
+        },
+    )
+    session.execute(statement)
+
+
+def upsert_game_sessions(session, records, uid_factory=None) -> set:
+    """Insert or update many sessions with a fixed number of statements.
+
+    ``records`` are dicts with ``uid``, ``timestamp``, ``name``, ``grid_size``,
+    ``error_probabilities`` and ``probability_stats`` (already-parsed lists).
+    Records flagged ``generated`` had their uid minted server-side; if one
+    collides with a stored session it is reassigned via ``uid_factory`` rather
+    than overwriting. Later records win when a uid repeats. Level and player
+    aggregates are adjusted in the same transaction. Stored rows are locked
+    (``SELECT ... FOR UPDATE``) before their old stats are read, so two
+    concurrent updates of one uid cannot both subtract the same totals.
+    Returns the uids that were updates. The caller commits.
+    """
+
+    by_uid = {}
+    for record in records:
+        by_uid[record["uid"]] = record
+    if not by_uid:
+        return set()
+
+    existing = set(
+        session.scalars(
+            select(GameData.uid)
+            .where(GameData.uid.in_(list(by_uid)))
+            .order_by(GameData.uid)
+            .with_for_update()
+        )
+    )
+    if uid_factory is not None:
+        for uid in [uid for uid in existing if by_uid[uid].get("generated")]:
+            record = by_uid.pop(uid)
+            existing.discard(uid)
+            new_uid = uid_factory()
+            while new_uid in by_uid or session.get(GameData, new_uid) is not None:
+                new_uid = uid_factory()
+            record["uid"] = new_uid
+            by_uid[new_uid] = record
+
+    deltas = {}
+    player_deltas = {}
+    if existing:
+        previous = session.execute(
+            select(
+                GameData.name,
+                GameLevelStats.grid_size,
+                GameLevelStats.probability,
+                GameLevelStats.total_rounds,
+                GameLevelStats.logical_failures,
+            )
+            .join(GameData, GameData.uid == GameLevelStats.uid)
+            .where(GameLevelStats.uid.in_(existing))
+        )
+        for row in previous:
+            level_stat_deltas(row.grid_size, [row._mapping], sign=-1, deltas=deltas)
+            player_stat_deltas(
+                row.name, row.grid_size, [row._mapping], sign=-1, deltas=player_deltas
+            )
+
+    rows = []
+    children = []
+    for uid, record in by_uid.items():
+        stats = record["probability_stats"]
+        rows.append(
+            {
+                "uid": uid,
+                "timestamp": record.get("timestamp") or datetime.utcnow(),
+                "name": record.get("name"),
+                "grid_size": record["grid_size"],
+                "error_probabilities": json.dumps(record["error_probabilities"]),
+                "probability_stats": json.dumps(stats),
+            }
+        )
+        children.extend(
+            {"uid": uid, "position": position, "grid_size": record["grid_size"], **entry}
+            for position, entry in enumerate(stats)
+        )
+        level_stat_deltas(record["grid_size"], stats, deltas=deltas)
+        player_stat_deltas(record.get("name"), record["grid_size"], stats, deltas=player_deltas)
+
+    dialect_insert = _dialect_insert(session.get_bind().dialect.name)
+    if dialect_insert is None:
+        for row in rows:
+            session.merge(GameData(**row))
+        session.flush()
+    else:
+        statement = dialect_insert(GameData).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[GameData.uid],
+            set_={
+                column: statement.excluded[column]
+                for column in (
+                    "timestamp",
+                    "name",
+                    "grid_size",
+                    "error_probabilities",
+                    "probability_stats",
+                )
+            },
+        )
+        session.execute(statement)
+
+    if existing:
+        session.execute(delete(GameLevelStats).where(GameLevelStats.uid.in_(existing)))
+    if children:
+        session.execute(insert(GameLevelStats), children)
+    apply_level_deltas(session, deltas)
+    apply_player_deltas(session, player_deltas)
+    return existing
+
+
+def decode_probability_stats(raw_value) -> list:
+    """Decode a stored ``probability_stats`` JSON blob, skipping malformed entries."""
+
+    try:
+        items = json.loads(raw_value) if raw_value else []
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(items, list):
+        return []
+
+    stats = []
+    for item in items:
+        try:
+            stats.append(
+                {
+                    "probability": round(float(item["probability"]), 6),
+                    "total_rounds": max(int(item["total_rounds"]), 0),
+                    "logical_failures": max(int(item["logical_failures"]), 0),
+                }
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+    return stats
+
+
+def build_level_stats(grid_size, stats) -> list:
+    """Create ``GameLevelStats`` children for a session's parsed stats."""
+
+    return [
+        GameLevelStats(
+            position=position,
+            grid_size=grid_size,
+            probability=entry["probability"],
+            total_rounds=entry["total_rounds"],
+            logical_failures=entry["logical_failures"],
+        )
+        for position, entry in enumerate(stats)
+    ]
+
+
+def _player_totals_select():
+    """Per-player totals grouped from ``game_level_stats`` joined to session names."""
+
+    name_key = func.coalesce(func.nullif(func.trim(GameData.name), ""), ANONYMOUS_PLAYER)
+    rounds = func.sum(GameLevelStats.total_rounds)
+    failures = func.sum(GameLevelStats.logical_failures)
+    return (
+        select(
+            GameLevelStats.grid_size,
+            GameLevelStats.probability,
+            name_key,
+            rounds,
+            failures,
+            cast(failures, Float) / func.nullif(rounds, 0),
+        )
+        .join(GameData, GameData.uid == GameLevelStats.uid)
+        .group_by(GameLevelStats.grid_size, GameLevelStats.probability, name_key)
+    )
+
+
+def _rebuild_player_aggregates(executor) -> None:
+    executor.execute(delete(PlayerAggregate))
+    executor.execute(
+        insert(PlayerAggregate).from_select(
+            [
+                "grid_size",
+                "probability",
+                "name",
+                "total_rounds",
+                "logical_failures",
+                "logical_error_rate",
+            ],
+            _player_totals_select(),
+        )
+    )
+
+
+def _rebuild_level_totals(executor) -> None:
+    executor.execute(delete(LevelAggregate))
+    grouped = select(
+        GameLevelStats.grid_size,
+        GameLevelStats.probability,
+        func.sum(GameLevelStats.total_rounds),
+        func.sum(GameLevelStats.logical_failures),
+    ).group_by(GameLevelStats.grid_size, GameLevelStats.probability)
+    executor.execute(
+        insert(LevelAggregate).from_select(
+            ["grid_size", "probability", "total_rounds", "logical_failures"], grouped
+        )
+    )
+
+
+def rebuild_level_aggregates(session) -> int:
+    """Recompute ``level_aggregates`` and ``player_aggregates`` from ``game_level_stats``.
+
+    Each table is rebuilt with one grouped ``INSERT ... SELECT``. Returns the
+    number of sessions covered; the caller commits.
+    """
+
+    _rebuild_level_totals(session)
+    _rebuild_player_aggregates(session)
+    return session.execute(select(func.count()).select_from(GameData)).scalar_one()
+
+
+def _migrate_game_level_stats(connection, batch_size: int = 500) -> None:
+    """Copy existing ``probability_stats`` blobs into ``game_level_stats``."""
+
+    for index in GameData.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+    last_uid = ""
+    while True:
+        rows = connection.execute(
+            select(GameData.uid, GameData.grid_size, GameData.probability_stats)
+            .where(GameData.uid > last_uid)
+            .order_by(GameData.uid)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        children = [
+            {
+                "uid": uid,
+                "position": position,
+                "grid_size": grid_size,
+                **entry,
+            }
+            for uid, grid_size, raw_stats in rows
+            for position, entry in enumerate(decode_probability_stats(raw_stats))
+        ]
+        if children:
+            connection.execute(insert(GameLevelStats), children)
+        last_uid = rows[-1].uid
+
+
+def _migrate_keyset_index(connection) -> None:
+    """Replace the timestamp index with ``(timestamp, uid)`` for keyset paging."""
+
+    for index in GameData.__table__.indexes:
+        index.create(connection, checkfirst=True)
+    connection.execute(text("DROP INDEX IF EXISTS ix_game_data_timestamp"))
+
+
+def _migrate_data_version(connection) -> None:
+    """Seed the single ``data_version`` row."""
+
+    connection.execute(insert(DataVersion).values(id=1, version=0))
+
+
+def _migrate_player_aggregates(connection) -> None:
+    """Create the leaderboard table and backfill it from stored sessions."""
+
+    PlayerAggregate.__table__.create(connection, checkfirst=True)
+    _rebuild_player_aggregates(connection)
+
+
+def _migrate_game_event_batches(connection) -> None:
+    """Create the per-round event log table."""
+
+    GameEventBatch.__table__.create(connection, checkfirst=True)
+
+
+def _migrate_level_aggregates(connection) -> None:
+    """Backfill ``level_aggregates`` from stored sessions.
+
+    Sessions stored before the table existed were only counted after a
+    manual ``backfill-aggregates``; updating one earlier subtracted its old
+    totals from an empty row.
+    """
+
+    LevelAggregate.__table__.create(connection, checkfirst=True)
+    _rebuild_level_totals(connection)
+
+
+def _migrate_uid_length(connection) -> None:
+    """Widen a legacy ``game_data.uid`` column to ``UID_LENGTH``.
+
+    The app used to reflect the column length on every start and cap uids to
+    it; after this migration the model's length holds everywhere. SQLite does
+    not enforce ``VARCHAR`` lengths, so only PostgreSQL needs the change.
+    """
+
+    if connection.dialect.name != "postgresql":
+        return
+    for column in inspect(connection).get_columns("game_data"):
+        if column["name"] != "uid":
+            continue
+        length = getattr(column["type"], "length", None)
+        if isinstance(length, int) and length < UID_LENGTH:
+            connection.execute(
+                text(f"ALTER TABLE game_data ALTER COLUMN uid TYPE VARCHAR({UID_LENGTH})")
+            )
+
+
+# Ordered (version, migration) pairs applied once each by ``_ensure_schema``.
+# A database at ``LATEST_SCHEMA_VERSION`` skips ``create_all`` and reflection
+# entirely, so new tables and indexes must be created by a migration here.
+SCHEMA_MIGRATIONS = (
+    (1, _migrate_game_level_stats),
+    (2, _migrate_keyset_index),
+    (3, _migrate_data_version),
+    (4, _migrate_player_aggregates),
+    (5, _migrate_game_event_batches),
+    (6, _migrate_level_aggregates),
+    (7, _migrate_uid_length),
+)
+LATEST_SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_options(database_url: str) -> dict:
+    """Connection-pool settings for ``create_engine`` taken from the environment.
+
+    ``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT``, ``DB_POOL_RECYCLE``
+    and ``DB_POOL_PRE_PING`` override the defaults. In-memory SQLite uses a
+    single shared connection, so only the recycle/pre-ping options apply there.
+    """
+
+    options = {
+        "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", True),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+    }
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        return options
+    options.update(
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+    )
+    return options
+
+
+def sqlite_tuning(database_url: str) -> dict | None:
+    """Settings for tuned file-backed SQLite, or ``None`` when it does not apply.
+
+    On by default; ``DB_SQLITE_WAL=0`` opts out. ``DB_SQLITE_BUSY_TIMEOUT``
+    (ms), ``DB_SQLITE_MMAP_SIZE`` (bytes), ``DB_SQLITE_READERS`` and
+    ``DB_SQLITE_CHECKPOINT_EVERY`` (write transactions) override the defaults.
+    """
+
+    if not database_url.startswith("sqlite") or database_url in ("sqlite://", "sqlite:///:memory:"):
+        return None
+    if not _env_flag("DB_SQLITE_WAL", True):
+        return None
+    return {
+        "busy_timeout": _env_int("DB_SQLITE_BUSY_TIMEOUT", 5000),
+        "mmap_size": _env_int("DB_SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        "readers": max(_env_int("DB_SQLITE_READERS", 4), 1),
+        "checkpoint_every": max(_env_int("DB_SQLITE_CHECKPOINT_EVERY", 500), 1),
+    }
+
+
+def _sqlite_engines(database_url: str, tuning: dict):
+    """``(writer, reader)`` engines for tuned SQLite.
+
+    The writer has exactly one connection, in WAL mode with
+    ``synchronous=NORMAL``, and opens every transaction with ``BEGIN
+    IMMEDIATE`` so it never has to upgrade a read lock. Readers are
+    ``query_only``; under WAL they neither block nor wait for the writer.
+    """
+
+    timeout = _env_int("DB_POOL_TIMEOUT", 30)
+    writer = create_engine(database_url, echo=False, pool_size=1, max_overflow=0, pool_timeout=timeout)
+    reader = create_engine(
+        database_url,
+        echo=False,
+        pool_size=tuning["readers"],
+        max_overflow=tuning["readers"],
+        pool_timeout=timeout,
+    )
+
+    def pragmas(dbapi_connection, statements):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    shared = (
+        f"PRAGMA busy_timeout = {int(tuning['busy_timeout'])}",
+        f"PRAGMA mmap_size = {int(tuning['mmap_size'])}",
+    )
+
+    @event.listens_for(writer, "connect")
+    def _writer_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy's "begin" event issue BEGIN instead of pysqlite.
+        dbapi_connection.isolation_level = None
+        pragmas(
+            dbapi_connection,
+            ("PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL", *shared),
+        )
+
+    @event.listens_for(writer, "begin")
+    def _writer_begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @event.listens_for(reader, "connect")
+    def _reader_connect(dbapi_connection, connection_record):
+        pragmas(dbapi_connection, (*shared, "PRAGMA query_only = ON"))
+
+    return writer, reader
+
 
 class DatabaseManager:
-    """Manages database connection and operations"""
+    """Manages database connection and operations
+
+    Nothing touches the database until ``engine`` or ``session`` is first
+    used, so importing the app stays cheap on a cold start. Timings of that
+    first initialisation are kept in ``startup_timings``.
+
+    ``session`` is for reads; write transactions go through ``writer()``. For
+    PostgreSQL both are the same thread-local session. For file-backed
+    SQLite (see ``sqlite_tuning``) reads use a pool of ``query_only``
+    connections and writes are serialised through one WAL connection.
+    """
     
     def __init__(self):
         # Get database URL from environment (Render provides this)
@@ -41,24 +790,192 @@ class DatabaseManager:
         if database_url.startswith('postgres://'):
             database_url = database_url.replace('postgres://', 'postgresql://', 1)
         
-        self.uid_max_length = 32
+        self.database_url = database_url
+        self.startup_timings = {}
+        self._engine = None
+        self._reader_engine = None
+        self._session = None
+        self._writer_session = None
+        self._write_lock = None
+        self._sqlite = None
+        self._sqlite_stats = {
+            "write_transactions": 0,
+            "lock_waits": 0,
+            "lock_wait_ms_total": 0.0,
+            "lock_wait_ms_max": 0.0,
+            "checkpoints": 0,
+            "checkpoint_ms_total": 0.0,
+            "last_checkpoint": None,
+        }
+        self._init_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._session is None:
+            self._initialize()
+        return self._engine
+
+    @property
+    def reader_engine(self):
+        if self._session is None:
+            self._initialize()
+        return self._reader_engine
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._initialize()
+        return self._session
+
+    @contextmanager
+    def writer(self):
+        """Session for one write transaction; commit inside the block.
+
+        In tuned SQLite mode callers queue on an in-process lock for the single
+        writer connection (the wait is recorded in ``sqlite_status``), and the
+        session is closed on exit so uncommitted work is rolled back.
+        """
+
+        session = self.session
+        if self._write_lock is None:
+            yield session
+            return
+
+        started = time.perf_counter()
+        contended = not self._write_lock.acquire(blocking=False)
+        if contended:
+            self._write_lock.acquire()
+        try:
+            waited_ms = (time.perf_counter() - started) * 1000
+            stats = self._sqlite_stats
+            stats["write_transactions"] += 1
+            if contended:
+                stats["lock_waits"] += 1
+                stats["lock_wait_ms_total"] += waited_ms
+                stats["lock_wait_ms_max"] = max(stats["lock_wait_ms_max"], waited_ms)
+            try:
+                yield self._writer_session
+            finally:
+                self._writer_session.remove()
+            if stats["write_transactions"] % self._sqlite["checkpoint_every"] == 0:
+                self._checkpoint()
+        finally:
+            self._write_lock.release()
+
+    def _checkpoint(self) -> None:
+        """Passive WAL checkpoint on the idle writer connection (lock held)."""
+
+        started = time.perf_counter()
+        raw = self._engine.raw_connection()
         try:
-            self.engine = create_engine(database_url, echo=False)
-            # Create all tables if they don't exist
-            Base.metadata.create_all(self.engine)
-            self._ensure_schema()
-            print("✅ Database tables initialized")
-
-            Session = sessionmaker(bind=self.engine)
-            self.session = Session()
-            self.uid_max_length = self._detect_uid_length()
-        except Exception as e:
-            print(f"❌ Database connection failed: {e}")
-            raise
+            cursor = raw.cursor()
+            busy, wal_frames, checkpointed = cursor.execute(
+                "PRAGMA wal_checkpoint(PASSIVE)"
+            ).fetchone()
+            cursor.close()
+        finally:
+            raw.close()
+        stats = self._sqlite_stats
+        stats["checkpoints"] += 1
+        stats["checkpoint_ms_total"] += (time.perf_counter() - started) * 1000
+        stats["last_checkpoint"] = {
+            "busy": bool(busy),
+            "wal_frames": wal_frames,
+            "checkpointed_frames": checkpointed,
+            "at": datetime.utcnow().isoformat(),
+        }
+
+    def sqlite_status(self) -> dict | None:
+        """WAL size, writer lock waits and checkpoint history for tuned SQLite."""
+
+        if not self.initialized or self._sqlite is None:
+            return None
+        stats = dict(self._sqlite_stats)
+        stats["lock_wait_ms_total"] = round(stats["lock_wait_ms_total"], 3)
+        stats["lock_wait_ms_max"] = round(stats["lock_wait_ms_max"], 3)
+        stats["checkpoint_ms_total"] = round(stats["checkpoint_ms_total"], 3)
+        wal_path = f"{self._engine.url.database}-wal"
+        stats["wal_bytes"] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        return {"settings": dict(self._sqlite), "stats": stats}
+
+    @property
+    def initialized(self) -> bool:
+        return self._session is not None
+
+    def _initialize(self) -> None:
+        """Create the engine and bring the schema up to date, once per process."""
+
+        with self._init_lock:
+            if self._session is not None:
+                return
+            try:
+                started = time.perf_counter()
+                self._sqlite = sqlite_tuning(self.database_url)
+                if self._sqlite is None:
+                    self._engine = create_engine(
+                        self.database_url, echo=False, **pool_options(self.database_url)
+                    )
+                    self._reader_engine = self._engine
+                else:
+                    self._engine, self._reader_engine = _sqlite_engines(
+                        self.database_url, self._sqlite
+                    )
+                engine_done = time.perf_counter()
+                if self._schema_is_current():
+                    schema_path = "current"
+                else:
+                    # Create all tables if they don't exist
+                    Base.metadata.create_all(self._engine)
+                    self._ensure_schema()
+                    schema_path = "migrated"
+                    print("✅ Database tables initialized")
+                schema_done = time.perf_counter()
+            except Exception as e:
+                print(f"❌ Database connection failed: {e}")
+                raise
+
+            self.startup_timings.update(
+                engine_ms=round((engine_done - started) * 1000, 3),
+                schema_check_ms=round((schema_done - engine_done) * 1000, 3),
+                schema_path=schema_path,
+            )
+            print(
+                f"⏱  Database ready: engine {self.startup_timings['engine_ms']} ms, "
+                f"schema check {self.startup_timings['schema_check_ms']} ms ({schema_path})"
+            )
+            # One session per thread; app.py removes it when each request ends.
+            self._writer_session = scoped_session(sessionmaker(bind=self._engine))
+            if self._sqlite is None:
+                self._session = self._writer_session
+            else:
+                self._write_lock = threading.Lock()
+                self._session = scoped_session(sessionmaker(bind=self._reader_engine))
     
     def close(self):
-        """Close database connection"""
-        self.session.close()
+        """Close the current thread's session and return its connection to the pool"""
+        if self._session is not None:
+            self._session.remove()
+            self._writer_session.remove()
+
+    def pool_status(self) -> dict:
+        """Report connection-pool utilisation for health checks."""
+
+        if not self.initialized:
+            return {"initialized": False}
+        pool = self._reader_engine.pool
+        status = {"class": type(pool).__name__}
+        for key, method in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            reader = getattr(pool, method, None)
+            if callable(reader):
+                status[key] = reader()
+        if self._sqlite is not None:
+            status["sqlite"] = self.sqlite_status()
+        return status
     
     def __enter__(self):
         return self
@@ -67,9 +984,9 @@ class DatabaseManager:
         self.close()
 
     def _ensure_schema(self) -> None:
-        """Apply lightweight schema adjustments for backward compatibility."""
+        """Apply lightweight schema adjustments and pending versioned migrations."""
 
-        inspector = inspect(self.engine)
+        inspector = inspect(self._engine)
         try:
             columns = {column["name"] for column in inspector.get_columns("game_data")}
         except Exception:
@@ -77,38 +994,41 @@ class DatabaseManager:
 
         if "probability_stats" not in columns:
             try:
-                with self.engine.begin() as connection:
+                with self._engine.begin() as connection:
                     connection.execute(
                         text("ALTER TABLE game_data ADD COLUMN probability_stats TEXT")
                     )
             except Exception:
                 pass
 
-    def _detect_uid_length(self) -> int:
-        """Inspect the backing table to determine the stored UID length."""
+        self._apply_migrations()
+
+    def _schema_is_current(self) -> bool:
+        """Steady-state fast path: one read of ``schema_version``, no reflection."""
 
-        default_length = 32
-        inspector = inspect(self.engine)
         try:
-            columns = inspector.get_columns("game_data")
+            return self._schema_version() >= LATEST_SCHEMA_VERSION
         except Exception:
-            return default_length
+            # Fresh database: the table does not exist yet.
+            return False
 
-        for column in columns:
-            if column.get("name") != "uid":
-                continue
-            column_type = column.get("type")
-            length = getattr(column_type, "length", None)
-            if isinstance(length, int) and length > 0:
-                return length
-            break
-        return default_length
+    def _schema_version(self) -> int:
+        with self._engine.connect() as connection:
+            return connection.execute(select(func.max(SchemaVersion.version))).scalar() or 0
 
-        if self.engine.dialect.name == "postgresql":
+    def _apply_migrations(self) -> None:
+        """Run every ``SCHEMA_MIGRATIONS`` entry newer than the recorded version."""
+
+        current = self._schema_version()
+        for version, migration in SCHEMA_MIGRATIONS:
+            if version <= current:
+                continue
             try:
-                with self.engine.begin() as connection:
-                    connection.execute(
-                        text("ALTER TABLE game_data ALTER COLUMN uid TYPE VARCHAR(32)")
-                    )
+                with self._engine.begin() as connection:
+                    migration(connection)
+                    connection.execute(insert(SchemaVersion).values(version=version))
+                print(f"✅ Applied schema migration {version}")
             except Exception:
-                pass
+                # Another worker may have applied it concurrently.
+                if self._schema_version() < version:
+                    raise
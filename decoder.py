@@ -0,0 +1,279 @@
+"""Automatic decoders giving a machine score for the surface-code game.
+
+Both decoders take ``H`` and ``L`` from ``surface_code(d)`` and work on batches
+of boolean syndromes as produced by ``simulation.syndromes_and_parities``.
+
+* ``LookupDecoder`` -- for small distances the whole syndrome space is
+  enumerable (2**6 syndromes at d=3, 2**12 at d=4). A breadth-first search over
+  syndromes, adding one qubit column per step, finds a minimum-weight
+  correction for every syndrome. The table is cached on disk.
+* ``UnionFindDecoder`` -- every qubit of this code touches one or two
+  stabilizers, so the code is a matching graph (qubits are edges; single-check
+  qubits attach to a shared boundary vertex). Clusters grow around defects
+  until each has even parity or reaches the boundary, then a spanning forest
+  of each cluster is peeled to obtain the correction.
+
+``decoder_for(d)`` picks the right one, and ``baseline(d, p, shots)`` reports
+the logical error rate of the decoder playing the game.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import math
+import os
+from collections import deque
+
+import numpy as np
+
+from simulation import DEFAULT_CHUNK_SIZE, code_matrices, sample_errors, syndromes_and_parities
+
+LOOKUP_MAX_DISTANCE = 4
+CACHE_DIR = os.environ.get(
+    "DECODER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+
+def _matrix_key(H: np.ndarray, L: np.ndarray) -> str:
+    digest = hashlib.sha1()
+    digest.update(np.asarray(H.shape, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(H, dtype=np.uint8).tobytes())
+    digest.update(np.ascontiguousarray(L, dtype=np.uint8).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class LookupDecoder:
+    """Minimum-weight syndrome -> correction table for small codes."""
+
+    def __init__(self, H: np.ndarray, L: np.ndarray, cache_dir: str | None = CACHE_DIR):
+        self.H = np.asarray(H, dtype=np.uint8)
+        self.L = np.asarray(L, dtype=np.uint8)
+        self.n_stabilizers, self.n_qubits = self.H.shape
+        if self.n_stabilizers > 24:
+            raise ValueError("syndrome space too large for a lookup table")
+        self._weights = (np.uint64(1) << np.arange(self.n_stabilizers, dtype=np.uint64))
+
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, f"lookup-{_matrix_key(self.H, self.L)}.npz")
+        if path and os.path.exists(path):
+            with np.load(path) as cached:
+                self.corrections = cached["corrections"]
+                self.logical = cached["logical"]
+        else:
+            self.corrections, self.logical = self._build()
+            if path:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+                np.savez_compressed(tmp_path, corrections=self.corrections, logical=self.logical)
+                os.replace(tmp_path, path)
+
+    def _build(self) -> tuple[np.ndarray, np.ndarray]:
+        """Breadth-first search: level ``w`` holds syndromes of minimum weight ``w``."""
+
+        size = 1 << self.n_stabilizers
+        columns = (self.H.astype(np.uint64) * self._weights[:, None]).sum(axis=0)
+        corrections = np.zeros((size, self.n_qubits), dtype=bool)
+        logical = np.zeros(size, dtype=bool)
+        seen = np.zeros(size, dtype=bool)
+        seen[0] = True
+        frontier = np.array([0], dtype=np.uint64)
+        while frontier.size:
+            parents = np.repeat(frontier, self.n_qubits)
+            qubits = np.tile(np.arange(self.n_qubits), frontier.size)
+            children = parents ^ columns[qubits]
+            fresh = ~seen[children]
+            children, parents, qubits = children[fresh], parents[fresh], qubits[fresh]
+            children, first = np.unique(children, return_index=True)
+            parents, qubits = parents[first], qubits[first]
+            seen[children] = True
+            corrections[children] = corrections[parents]
+            corrections[children, qubits] ^= True
+            logical[children] = logical[parents] ^ self.L[qubits].astype(bool)
+            frontier = children
+        if not seen.all():
+            raise ValueError("H does not have full row rank")
+        return corrections, logical
+
+    def _index(self, syndromes: np.ndarray) -> np.ndarray:
+        return (np.asarray(syndromes, dtype=np.uint64) * self._weights).sum(axis=1).astype(np.intp)
+
+    def decode_batch(self, syndromes: np.ndarray) -> np.ndarray:
+        """Boolean ``(shots, n_qubits)`` corrections for ``(shots, n_stabilizers)`` syndromes."""
+
+        return self.corrections[self._index(syndromes)]
+
+    def logical_flips(self, syndromes: np.ndarray) -> np.ndarray:
+        """Logical parity of the correction chosen for each syndrome."""
+
+        return self.logical[self._index(syndromes)]
+
+
+class UnionFindDecoder:
+    """Union-find decoder on the code's matching graph."""
+
+    def __init__(self, H: np.ndarray, L: np.ndarray):
+        self.H = np.asarray(H, dtype=np.uint8)
+        self.L = np.asarray(L, dtype=np.uint8)
+        self.n_stabilizers, self.n_qubits = self.H.shape
+        self.boundary = self.n_stabilizers
+        self.edges = []
+        self.adjacency = [[] for _ in range(self.n_stabilizers + 1)]
+        for qubit in range(self.n_qubits):
+            checks = np.flatnonzero(self.H[:, qubit])
+            if len(checks) == 1:
+                u, v = int(checks[0]), self.boundary
+            elif len(checks) == 2:
+                u, v = int(checks[0]), int(checks[1])
+            else:
+                raise ValueError("every qubit must touch one or two stabilizers")
+            self.edges.append((u, v))
+            self.adjacency[u].append((qubit, v))
+            self.adjacency[v].append((qubit, u))
+
+    def decode(self, syndrome: np.ndarray) -> np.ndarray:
+        """Correction for a single boolean syndrome vector."""
+
+        correction = np.zeros(self.n_qubits, dtype=bool)
+        defects = np.flatnonzero(syndrome)
+        if not defects.size:
+            return correction
+
+        n_vertices = self.n_stabilizers + 1
+        parent = list(range(n_vertices))
+        parity = [0] * n_vertices
+        touches_boundary = [False] * n_vertices
+        touches_boundary[self.boundary] = True
+        members = {v: [v] for v in range(n_vertices)}
+        for v in defects:
+            parity[v] = 1
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        def union(a, b):
+            a, b = find(a), find(b)
+            if a == b:
+                return
+            if len(members[a]) < len(members[b]):
+                a, b = b, a
+            parent[b] = a
+            parity[a] ^= parity[b]
+            touches_boundary[a] = touches_boundary[a] or touches_boundary[b]
+            members[a].extend(members.pop(b))
+
+        def active_roots():
+            roots = {find(int(v)) for v in defects}
+            return [r for r in roots if parity[r] and not touches_boundary[r]]
+
+        growth = [0] * self.n_qubits
+        active = active_roots()
+        while active:
+            grown = []
+            for root in active:
+                for vertex in members[root]:
+                    for edge, _ in self.adjacency[vertex]:
+                        if growth[edge] < 2:
+                            growth[edge] += 1
+                            if growth[edge] == 2:
+                                grown.append(edge)
+            for edge in grown:
+                union(*self.edges[edge])
+            active = active_roots()
+
+        # Peel a spanning forest of the grown edges, rooting at the boundary
+        # where possible so leftover parity is absorbed there.
+        marks = [0] * n_vertices
+        for v in defects:
+            marks[v] = 1
+        visited = [False] * n_vertices
+        for start in [self.boundary, *(int(v) for v in defects)]:
+            if visited[start]:
+                continue
+            visited[start] = True
+            order = []
+            queue = deque([start])
+            while queue:
+                vertex = queue.popleft()
+                for edge, neighbor in self.adjacency[vertex]:
+                    if growth[edge] == 2 and not visited[neighbor]:
+                        visited[neighbor] = True
+                        order.append((neighbor, vertex, edge))
+                        queue.append(neighbor)
+            for vertex, up, edge in reversed(order):
+                if marks[vertex]:
+                    marks[vertex] = 0
+                    marks[up] ^= 1
+                    correction[edge] = True
+        return correction
+
+    def decode_batch(self, syndromes: np.ndarray) -> np.ndarray:
+        """Decode each distinct syndrome once and broadcast the corrections."""
+
+        syndromes = np.asarray(syndromes, dtype=bool)
+        unique, inverse = np.unique(syndromes, axis=0, return_inverse=True)
+        decoded = np.array([self.decode(row) for row in unique], dtype=bool)
+        return decoded.reshape(len(unique), self.n_qubits)[inverse.reshape(-1)]
+
+    def logical_flips(self, syndromes: np.ndarray) -> np.ndarray:
+        corrections = self.decode_batch(syndromes)
+        return (corrections.astype(np.uint8) @ self.L % 2).astype(bool)
+
+
+@functools.lru_cache(maxsize=None)
+def decoder_for(d: int):
+    """Lookup table for ``d <= LOOKUP_MAX_DISTANCE``, union-find otherwise."""
+
+    H, L = code_matrices(d)
+    if d <= LOOKUP_MAX_DISTANCE:
+        return LookupDecoder(H, L)
+    return UnionFindDecoder(H, L)
+
+
+def baseline(
+    d: int,
+    p: float,
+    shots: int,
+    rng: np.random.Generator | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """Play ``shots`` rounds with the automatic decoder and count logical failures.
+
+    A round fails when the decoder's correction combined with the error has odd
+    logical parity; rounds without syndrome fail exactly when the error itself
+    is a logical operator, as in the game.
+    """
+
+    rng = np.random.default_rng() if rng is None else rng
+    decoder = decoder_for(d)
+    n_qubits = code_matrices(d)[0].shape[1]
+
+    failures = 0
+    no_syndrome = 0
+    no_syndrome_logical = 0
+    remaining = int(shots)
+    while remaining > 0:
+        batch = min(remaining, chunk_size)
+        syndromes, logical = syndromes_and_parities(d, sample_errors(rng, batch, n_qubits, p))
+        clean = ~syndromes.any(axis=1)
+        no_syndrome += int(clean.sum())
+        no_syndrome_logical += int((clean & logical).sum())
+        failures += int((logical ^ decoder.logical_flips(syndromes)).sum())
+        remaining -= batch
+
+    rate = failures / shots if shots else 0.0
+    variance = rate * (1 - rate) / shots if shots else 0.0
+    return {
+        "grid_size": d,
+        "probability": round(float(p), 6),
+        "shots": int(shots),
+        "decoder": type(decoder).__name__,
+        "logical_failures": failures,
+        "logical_error_rate": rate,
+        "stderr": math.sqrt(variance) if variance > 0 else 0.0,
+        "no_syndrome": no_syndrome,
+        "no_syndrome_logical": no_syndrome_logical,
+    }
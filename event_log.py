@@ -0,0 +1,214 @@
+"""Compact binary encoding of per-round game events.
+
+The browser sends one batch per level: the interactive rounds with the
+sampled error, the qubits the player flipped in order and when, plus
+run-length records for syndrome-free rounds. A batch is stored as a single
+blob:
+
+    batch  := varint(FORMAT_VERSION) varint(grid_size) varint(count) record*
+    record := byte(kind) body
+
+    kind SUCCESS / LOGICAL_ERROR (interactive round):
+        error bitmask, ceil(n_qubits / 8) bytes, little-endian bit order
+        varint(n_flips) varint(qubit)*n_flips varint(delta_ms)*n_flips
+    kind NO_SYNDROME (run of skipped rounds):
+        varint(rounds) varint(hidden_logical_errors)
+
+Flip times are milliseconds since the round was shown, stored as deltas.
+Syndrome weights are not stored: ``decode_batch`` replays the flips against
+the code's stabilizer supports to recover them.
+"""
+from __future__ import annotations
+
+import math
+
+from game_pseudocode import stabilizer_supports
+
+FORMAT_VERSION = 1
+SUCCESS = 0
+LOGICAL_ERROR = 1
+NO_SYNDROME = 2
+KIND_NAMES = {SUCCESS: "success", LOGICAL_ERROR: "logical_error", NO_SYNDROME: "no_syndrome"}
+KIND_CODES = {name: code for code, name in KIND_NAMES.items()}
+MAX_FLIPS_PER_ROUND = 1000
+
+
+def _n_qubits(d: int) -> int:
+    return d * d + (d - 1) * (d - 1)
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError("varints are unsigned")
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("truncated varint")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _pack_mask(indices, n_bits: int) -> bytes:
+    mask = bytearray((n_bits + 7) // 8)
+    for index in indices:
+        mask[index >> 3] |= 1 << (index & 7)
+    return bytes(mask)
+
+
+def _unpack_mask(mask: bytes, n_bits: int) -> list[int]:
+    return [index for index in range(n_bits) if mask[index >> 3] >> (index & 7) & 1]
+
+
+def _integer(value, message: str) -> int:
+    if isinstance(value, (list, dict)):
+        raise ValueError(message)
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(message) from None
+
+
+def _qubit_list(value, n_qubits: int, name: str) -> list[int]:
+    if not isinstance(value, list):
+        raise ValueError(f"{name} must be a list")
+    indices = [_integer(item, f"{name} must hold qubit indices") for item in value]
+    if any(not 0 <= index < n_qubits for index in indices):
+        raise ValueError(f"{name} holds a qubit index outside the code")
+    return indices
+
+
+def _flip_times(value) -> list[int]:
+    if not isinstance(value, list):
+        raise ValueError("flip_ms must be a list")
+    try:
+        times = [float(item) for item in value]
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("flip_ms must hold numbers") from None
+    if not all(math.isfinite(item) for item in times):
+        raise ValueError("flip_ms must be finite")
+    return [int(round(item)) for item in times]
+
+
+def encode_batch(grid_size: int, records) -> bytes:
+    """Validate client records and pack them; raises ``ValueError`` on bad input.
+
+    Interactive records are ``{"kind": "success" | "logical_error", "error":
+    [qubit, ...], "flips": [qubit, ...], "flip_ms": [ms, ...]}`` with
+    ``flip_ms`` non-decreasing; syndrome-free runs are ``{"kind":
+    "no_syndrome", "rounds": n, "logical": k}``.
+    """
+
+    n_qubits = _n_qubits(grid_size)
+    out = bytearray()
+    write_varint(out, FORMAT_VERSION)
+    write_varint(out, grid_size)
+    write_varint(out, len(records))
+    for record in records:
+        kind_name = record.get("kind") if isinstance(record, dict) else None
+        if not isinstance(kind_name, str) or kind_name not in KIND_CODES:
+            raise ValueError("unknown record kind")
+        kind = KIND_CODES[kind_name]
+        out.append(kind)
+        if kind == NO_SYNDROME:
+            rounds = _integer(record.get("rounds", 0), "rounds must be an integer")
+            logical = _integer(record.get("logical", 0), "logical must be an integer")
+            if rounds < 0 or not 0 <= logical <= rounds:
+                raise ValueError("invalid syndrome-free run")
+            write_varint(out, rounds)
+            write_varint(out, logical)
+            continue
+
+        error = _qubit_list(record.get("error", []), n_qubits, "error")
+        flips = _qubit_list(record.get("flips", []), n_qubits, "flips")
+        times = _flip_times(record.get("flip_ms", []))
+        if len(times) != len(flips) or len(flips) > MAX_FLIPS_PER_ROUND:
+            raise ValueError("flips and flip_ms must have the same length")
+        out += _pack_mask(error, n_qubits)
+        write_varint(out, len(flips))
+        for qubit in flips:
+            write_varint(out, qubit)
+        previous = 0
+        for value in times:
+            if value < previous:
+                raise ValueError("flip_ms must be non-decreasing")
+            write_varint(out, value - previous)
+            previous = value
+    return bytes(out)
+
+
+def _syndrome_weights(supports, error: list[int], flips: list[int], n_qubits: int) -> list[int]:
+    """Syndrome weight before the first flip and after each one."""
+
+    residual = [0] * n_qubits
+    for index in error:
+        residual[index] = 1
+
+    def weight():
+        return sum(sum(residual[q] for q in support) & 1 for support in supports)
+
+    weights = [weight()]
+    for qubit in flips:
+        residual[qubit] ^= 1
+        weights.append(weight())
+    return weights
+
+
+def decode_batch(data: bytes) -> dict:
+    """Inverse of ``encode_batch``, with replayed syndrome weights."""
+
+    version, offset = read_varint(data, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported event format {version}")
+    grid_size, offset = read_varint(data, offset)
+    count, offset = read_varint(data, offset)
+    n_qubits = _n_qubits(grid_size)
+    mask_bytes = (n_qubits + 7) // 8
+    supports = stabilizer_supports(grid_size)
+
+    records = []
+    for _ in range(count):
+        kind = data[offset]
+        offset += 1
+        if kind == NO_SYNDROME:
+            rounds, offset = read_varint(data, offset)
+            logical, offset = read_varint(data, offset)
+            records.append({"kind": KIND_NAMES[kind], "rounds": rounds, "logical": logical})
+            continue
+        if kind not in KIND_NAMES:
+            raise ValueError(f"unknown record kind {kind}")
+
+        error = _unpack_mask(data[offset:offset + mask_bytes], n_qubits)
+        offset += mask_bytes
+        n_flips, offset = read_varint(data, offset)
+        flips = []
+        for _ in range(n_flips):
+            qubit, offset = read_varint(data, offset)
+            flips.append(qubit)
+        times = []
+        elapsed = 0
+        for _ in range(n_flips):
+            delta, offset = read_varint(data, offset)
+            elapsed += delta
+            times.append(elapsed)
+        records.append(
+            {
+                "kind": KIND_NAMES[kind],
+                "error": error,
+                "flips": flips,
+                "flip_ms": times,
+                "syndrome_weights": _syndrome_weights(supports, error, flips, n_qubits),
+            }
+        )
+    return {"grid_size": grid_size, "records": records}
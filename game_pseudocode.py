@@ -1,6 +1,21 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
+def stabilizer_supports(d : int):
+    # Data qubit (row, col) has index row*d + col; the half-integer qubit at
+    # (row+0.5, col+0.5) has index d*d + row*(d-1) + col. Each X stabilizer at
+    # (row, col+0.5) touches its left/right and up/down neighbours, listed in
+    # ascending index order.
+    supports = []
+    for row in range(d):
+        for col in range(d-1):
+            support = [row*d + col, row*d + col + 1]
+            if row > 0:
+                support.append(d*d + (row-1)*(d-1) + col)
+            if row < d-1:
+                support.append(d*d + row*(d-1) + col)
+            supports.append(support)
+    return supports
+
 def surface_code(d : int):
     # data qubits which can have errors
     data_qubits = []
@@ -14,19 +29,13 @@ def surface_code(d : int):
             data_qubits += [{'idx' : nq, 'row' : row+0.5, 'col' : col+0.5}]
             nq += 1
     
-    def neighbor(qubit, row, col):
-        up = (qubit['row'] == row-0.5 and qubit['col'] == col)
-        down = (qubit['row'] == row+0.5 and qubit['col'] == col)
-        left = (qubit['row'] == row and qubit['col'] == col-0.5)
-        right = (qubit['row'] == row and qubit['col'] == col+0.5)
-        return up or down or left or right
-    
     # X stabilizers
+    supports = stabilizer_supports(d)
     stabilizers = []
     ns = 0
     for row in range(d):
         for col in range(d-1):
-            stabilizers += [{'idx' : ns, 'row' : row, 'col' : col+0.5, 'neighbors' : [d for d in data_qubits if neighbor(d,row,col+0.5)]}]
+            stabilizers += [{'idx' : ns, 'row' : row, 'col' : col+0.5, 'neighbors' : [data_qubits[q] for q in supports[ns]]}]
             ns += 1
     H = np.zeros((ns,nq), dtype=int)
     for s in range(ns):
@@ -178,6 +187,8 @@ def main():
             print(f"  Logical Error Rate: N/A")
             # print(syndrome,syndrome.shape)
         
+    # import matplotlib.pyplot as plt
+    #
     # # Plot data qubits
     # data_rows = [q['row'] for q in data_qubtis]
     # data_cols = [q['col'] for q in data_qubtis]
@@ -0,0 +1,283 @@
+"""Weight-stratified estimates of the decoder's logical error rate at low ``p``.
+
+Plain Monte Carlo (``decoder.baseline``) at ``p = 0.01`` spends nearly every
+shot on light errors the decoder always corrects, so failures are rare and
+the error bars useless. Conditioning on the error weight ``w`` splits the rate
+into
+
+    P_fail(p) = sum_w Binom(w; n, p) * A_w
+
+where ``A_w`` is the failure probability for a uniformly random weight-``w``
+error on the ``n`` qubits of ``surface_code(d)``. ``A_w`` does not depend on
+``p``, so one set of samples is reweighted to every level. Shots are spent
+where ``Binom(w; n, p) * sqrt(A_w (1 - A_w))`` is large (Neyman allocation)
+instead of on the typical, harmless weights. This is the limit of sampling
+at a biased rate ``q > p`` and reweighting by the likelihood ratio
+``(p/q)**w ((1-p)/(1-q))**(n-w)``, which is constant within a weight class.
+
+The variance is ``sum_w Binom(w; n, p)**2 * A_w (1 - A_w) / N_w``. Weights
+whose strata saw no failure contribute nothing to it, so at very low rates
+the reported error is optimistic; ``upper`` replaces those strata with the
+rule-of-three bound ``3 / N_w``.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from decoder import CACHE_DIR, _matrix_key, decoder_for
+from levels import ALLOWED_GRID_SIZES, DEFAULT_LEVEL_COUNT, DEFAULT_LEVELS, generate_levels
+from simulation import DEFAULT_CHUNK_SIZE, code_matrices, syndromes_and_parities
+
+DEFAULT_RELATIVE_ERROR = 0.1
+DEFAULT_MAX_SHOTS = 20_000
+PILOT_SHOTS = 64
+# Weights whose upper-tail mass is below this at every target p are dropped.
+TRUNCATION = 1e-12
+REFERENCE_FORMAT = 1
+# Cold ``reference_strata`` calls sample under this lock, so concurrent
+# requests for a distance wait for one build instead of each running their own.
+_REFERENCE_LOCK = threading.Lock()
+_REFERENCE = {}
+
+
+def binomial_pmf(n: int, p: float) -> np.ndarray:
+    """``P(W = w)`` for ``w = 0..n`` of a ``Binomial(n, p)`` weight."""
+
+    w = np.arange(n + 1)
+    if p <= 0:
+        return (w == 0).astype(np.float64)
+    if p >= 1:
+        return (w == n).astype(np.float64)
+    log_comb = np.array([math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1) for k in w])
+    return np.exp(log_comb + w * math.log(p) + (n - w) * math.log1p(-p))
+
+
+def sample_weight_errors(rng: np.random.Generator, shots: int, n_qubits: int, weight: int) -> np.ndarray:
+    """``(shots, n_qubits)`` errors, each flipping a uniformly random set of ``weight`` qubits."""
+
+    # Ranks of i.i.d. uniforms form a random permutation; its ``weight``
+    # smallest positions are a uniform ``weight``-subset.
+    return rng.random((shots, n_qubits)).argsort(axis=1) < weight
+
+
+class WeightStrata:
+    """Per-weight decoder failure counts for one distance."""
+
+    def __init__(self, d: int, max_weight: int):
+        self.d = d
+        self.decoder = decoder_for(d)
+        self.n_qubits = code_matrices(d)[0].shape[1]
+        self.max_weight = min(max_weight, self.n_qubits)
+        self.trials = np.zeros(self.max_weight + 1, dtype=np.int64)
+        self.failures = np.zeros(self.max_weight + 1, dtype=np.int64)
+
+    @property
+    def shots(self) -> int:
+        return int(self.trials.sum())
+
+    def sample(self, rng: np.random.Generator, weight: int, shots: int) -> None:
+        remaining = int(shots)
+        while remaining > 0:
+            batch = min(remaining, DEFAULT_CHUNK_SIZE)
+            errors = sample_weight_errors(rng, batch, self.n_qubits, weight)
+            syndromes, logical = syndromes_and_parities(self.d, errors)
+            self.failures[weight] += int((logical ^ self.decoder.logical_flips(syndromes)).sum())
+            self.trials[weight] += batch
+            remaining -= batch
+
+    def _rates(self) -> tuple[np.ndarray, np.ndarray]:
+        """Failure rates per weight and their sampling variances (weight 0 never fails)."""
+
+        sampled = self.trials > 0
+        rates = np.zeros(self.max_weight + 1)
+        rates[sampled] = self.failures[sampled] / self.trials[sampled]
+        variances = np.zeros(self.max_weight + 1)
+        variances[sampled] = rates[sampled] * (1 - rates[sampled]) / self.trials[sampled]
+        return rates, variances
+
+    def estimate(self, p: float) -> dict:
+        pmf = binomial_pmf(self.n_qubits, p)
+        weights = pmf[: self.max_weight + 1]
+        rates, variances = self._rates()
+        rate = float(weights @ rates)
+        stderr = math.sqrt(float(weights**2 @ variances))
+        unseen = (self.trials > 0) & (self.failures == 0)
+        unseen[0] = False
+        bounds = np.where(unseen, 3.0 / np.maximum(self.trials, 1), rates)
+        relative = stderr / rate if rate > 0 else math.inf
+        # Plain Monte Carlo needs (1 - P) / (P * r**2) shots for relative error r.
+        mc_shots = (1 - rate) / (rate * relative**2) if rate > 0 and relative > 0 else None
+        return {
+            "probability": round(float(p), 6),
+            "logical_error_rate": rate,
+            "stderr": stderr,
+            "relative_error": relative if math.isfinite(relative) else None,
+            "upper": float(weights @ bounds) + 2 * stderr,
+            "truncation": float(pmf[self.max_weight + 1:].sum()),
+            "shots": self.shots,
+            "mc_shots_for_same_error": None if mc_shots is None else float(mc_shots),
+        }
+
+    def allocation(self, probabilities, shots: int) -> np.ndarray:
+        """Split ``shots`` over weights ``1..max_weight`` for all ``probabilities`` at once.
+
+        Neyman allocation for the sum of squared relative errors:
+        ``N_w ~ sigma_w * sqrt(sum_p (Binom(w; n, p) / P_fail(p))**2)``.
+        """
+
+        # Smoothed rates so strata without failures still get some shots and
+        # probabilities without failures so far do not get an infinite weight.
+        smoothed = (self.failures + 0.5) / (self.trials + 1)
+        smoothed[0] = 0.0
+        pressure = np.zeros(self.max_weight + 1)
+        for p in probabilities:
+            weights = binomial_pmf(self.n_qubits, p)[: self.max_weight + 1]
+            pressure += (weights / max(float(weights @ smoothed), 1e-300)) ** 2
+        scores = np.sqrt(smoothed * (1 - smoothed) * pressure)
+        total = scores.sum()
+        if total <= 0:
+            return np.zeros_like(self.trials)
+        return np.floor(shots * scores / total).astype(np.int64)
+
+
+def max_weight_for(n_qubits: int, probabilities) -> int:
+    """Smallest weight whose upper tail is below ``TRUNCATION`` at every probability."""
+
+    limit = 0
+    for p in probabilities:
+        tail = np.cumsum(binomial_pmf(n_qubits, p)[::-1])[::-1]
+        beyond = np.flatnonzero(tail < TRUNCATION)
+        limit = max(limit, int(beyond[0]) - 1 if beyond.size else n_qubits)
+    return limit
+
+
+def build_strata(
+    d: int,
+    probabilities,
+    relative_error: float = DEFAULT_RELATIVE_ERROR,
+    max_shots: int = DEFAULT_MAX_SHOTS,
+    seed=0,
+) -> WeightStrata:
+    """Sample until every probability reaches ``relative_error`` or ``max_shots`` is spent.
+
+    After a pilot of ``PILOT_SHOTS`` per weight, each round doubles the shots
+    so far, allocated jointly over the probabilities not yet at the target.
+    """
+
+    probabilities = [float(p) for p in probabilities]
+    rng = np.random.default_rng(seed)
+    n_qubits = code_matrices(d)[0].shape[1]
+    strata = WeightStrata(d, max_weight_for(n_qubits, probabilities))
+    pilot = max(min(PILOT_SHOTS, max_shots // max(strata.max_weight, 1)), 1)
+    for weight in range(1, strata.max_weight + 1):
+        strata.sample(rng, weight, pilot)
+
+    while strata.shots < max_shots:
+        pending = []
+        for p in probabilities:
+            error = strata.estimate(p)["relative_error"]
+            if error is None or error > relative_error:
+                pending.append(p)
+        if not pending:
+            break
+        budget = min(max_shots - strata.shots, max(strata.shots, 1000))
+        plan = strata.allocation(pending, budget)
+        if not plan.any():
+            break
+        for weight in np.flatnonzero(plan):
+            strata.sample(rng, int(weight), int(plan[weight]))
+    return strata
+
+
+def reference_strata(d: int, cache_dir: str | None = CACHE_DIR) -> WeightStrata:
+    """Strata for ``DEFAULT_LEVELS`` at the default budget, sampled once per machine.
+
+    Seeded by ``d`` and cached as ``.cache/strata-*.npz``. The deploy build
+    runs ``python importance_sampling.py --reference`` to fill the cache.
+    """
+
+    key = (d, cache_dir)
+    strata = _REFERENCE.get(key)
+    if strata is not None:
+        return strata
+    with _REFERENCE_LOCK:
+        strata = _REFERENCE.get(key)
+        if strata is None:
+            strata = _load_or_build_reference(d, cache_dir)
+            _REFERENCE[key] = strata
+    return strata
+
+
+def _load_or_build_reference(d: int, cache_dir: str | None) -> WeightStrata:
+    path = None
+    if cache_dir:
+        H, L = code_matrices(d)
+        settings = [
+            REFERENCE_FORMAT,
+            type(decoder_for(d)).__name__,
+            DEFAULT_LEVELS,
+            DEFAULT_RELATIVE_ERROR,
+            DEFAULT_MAX_SHOTS,
+            PILOT_SHOTS,
+            TRUNCATION,
+        ]
+        digest = hashlib.sha1(json.dumps(settings).encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(cache_dir, f"strata-{_matrix_key(H, L)}-{digest}.npz")
+    if path and os.path.exists(path):
+        with np.load(path) as cached:
+            strata = WeightStrata(d, len(cached["trials"]) - 1)
+            if strata.max_weight + 1 == len(cached["trials"]):
+                strata.trials[:] = cached["trials"]
+                strata.failures[:] = cached["failures"]
+                return strata
+
+    strata = build_strata(d, DEFAULT_LEVELS, seed=np.random.SeedSequence([d]))
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, trials=strata.trials, failures=strata.failures)
+        os.replace(tmp_path, path)
+    return strata
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distances", type=int, nargs="*", default=None)
+    parser.add_argument("--levels", type=int, default=None, help="number of levels")
+    parser.add_argument("--relative-error", type=float, default=DEFAULT_RELATIVE_ERROR)
+    parser.add_argument("--max-shots", type=int, default=DEFAULT_MAX_SHOTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--reference",
+        action="store_true",
+        help="use (and cache) the reference strata served by /api/stats/reference",
+    )
+    args = parser.parse_args(argv)
+
+    levels = generate_levels(args.levels or DEFAULT_LEVEL_COUNT)
+    print(f"{'d':>3} {'p':>7} {'shots':>8} {'rate':>10} {'rel.err':>8} {'MC shots':>10}")
+    for d in args.distances or ALLOWED_GRID_SIZES:
+        if args.reference:
+            strata = reference_strata(d)
+        else:
+            strata = build_strata(d, levels, args.relative_error, args.max_shots, args.seed)
+        for p in levels:
+            row = strata.estimate(p)
+            relative = row["relative_error"]
+            mc = row["mc_shots_for_same_error"]
+            print(
+                f"{d:>3} {p:>7.3f} {row['shots']:>8} {row['logical_error_rate']:>10.2e} "
+                f"{'-' if relative is None else f'{relative:.1%}':>8} "
+                f"{'-' if mc is None else f'{mc:.2e}':>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Grid sizes, probability levels and rounds per level offered by the game.
+
+Kept apart from ``app.py`` so the command-line tools (``simulation.py``,
+``sweep.py``, ``importance_sampling.py``, ``weight_enumerator.py``) can use
+the same levels without building the Flask app and its database.
+"""
+from __future__ import annotations
+
+ALLOWED_GRID_SIZES = (3, 4, 5, 6, 7)
+LEVEL_MIN_PROBABILITY = 0.01
+LEVEL_MAX_PROBABILITY = 0.15
+LEVEL_PRECISION = 3
+ALLOWED_LEVEL_COUNTS = tuple(range(3, 11))
+DEFAULT_LEVEL_COUNT = 5
+ALLOWED_ROUNDS_PER_LEVEL = tuple(range(1, 11))
+DEFAULT_ROUNDS_PER_LEVEL = 2
+
+
+def generate_levels(count: int) -> list[float]:
+    """Return evenly spaced probability levels between the configured bounds."""
+
+    safe_count = max(int(count), 1)
+    if safe_count == 1:
+        return [round(LEVEL_MIN_PROBABILITY, LEVEL_PRECISION)]
+
+    step = (LEVEL_MAX_PROBABILITY - LEVEL_MIN_PROBABILITY) / (safe_count - 1)
+    return [
+        round(LEVEL_MIN_PROBABILITY + step * index, LEVEL_PRECISION)
+        for index in range(safe_count)
+    ]
+
+
+DEFAULT_LEVELS = generate_levels(DEFAULT_LEVEL_COUNT)
@@ -0,0 +1,195 @@
+"""Bit-packed surface-code representation for large-distance sampling.
+
+``surface_code(d)`` returns dense ``int`` matrices, i.e. eight bytes per qubit
+per shot once errors are batched. Here stabilizer supports come straight from
+index arithmetic (``stabilizer_supports``), ``H`` rows and ``L`` are stored as
+``uint64`` bitmasks, and error batches are packed bit arrays, so syndromes and
+parities reduce to XOR and popcount.
+
+Two layouts are used:
+
+* shot-major ``(shots, words)`` -- one packed error vector per row, handy for
+  decoders and for converting to/from the dense matrices;
+* bit-sliced ``(n_qubits, lanes)`` -- each row holds one qubit across 64 shots
+  per word. Sampling uses this layout because a stabilizer's syndrome over 64
+  shots is just the XOR of its three or four support rows.
+"""
+from __future__ import annotations
+
+import functools
+
+import numpy as np
+
+from game_pseudocode import stabilizer_supports
+
+WORD_BITS = 64
+DEFAULT_LANES = 1 << 14  # 1,048,576 shots per chunk
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount64(words: np.ndarray) -> np.ndarray:
+    """Set-bit count of each ``uint64`` element."""
+
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    x = words - ((words >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+def parity64(words: np.ndarray) -> np.ndarray:
+    """Parity (0/1) of each ``uint64`` element by XOR folding."""
+
+    x = words.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        x ^= x >> np.uint64(shift)
+    return x & np.uint64(1)
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Pack a boolean array along its last axis into little-endian ``uint64`` words."""
+
+    bits = np.asarray(bits, dtype=bool)
+    n_bits = bits.shape[-1]
+    n_words = -(-n_bits // WORD_BITS)
+    padded = np.zeros(bits.shape[:-1] + (n_words * WORD_BITS,), dtype=bool)
+    padded[..., :n_bits] = bits
+    packed = np.packbits(padded, axis=-1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64, copy=False)
+
+
+def unpack_bits(words: np.ndarray, n_bits: int) -> np.ndarray:
+    """Inverse of ``pack_bits``."""
+
+    raw = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.unpackbits(raw, axis=-1, bitorder="little")[..., :n_bits].astype(bool)
+
+
+class PackedSurfaceCode:
+    """Distance-``d`` code from ``game_pseudocode`` with bitmask stabilizers.
+
+    Construction is O(qubits): no pairwise neighbour search and no dense
+    ``H`` is ever built.
+    """
+
+    def __init__(self, d: int):
+        self.d = d
+        self.n_qubits = d * d + (d - 1) * (d - 1)
+        self.n_words = -(-self.n_qubits // WORD_BITS)
+        self.supports = [np.asarray(s, dtype=np.intp) for s in stabilizer_supports(d)]
+        self.n_stabilizers = len(self.supports)
+        self.logical_support = np.arange(d, dtype=np.intp) * d
+
+        self.h_masks = np.zeros((self.n_stabilizers, self.n_words), dtype=np.uint64)
+        for row, support in enumerate(self.supports):
+            self._set_bits(self.h_masks[row], support)
+        self.l_mask = np.zeros(self.n_words, dtype=np.uint64)
+        self._set_bits(self.l_mask, self.logical_support)
+
+    @staticmethod
+    def _set_bits(row: np.ndarray, indices: np.ndarray) -> None:
+        for index in indices:
+            row[index // WORD_BITS] |= np.uint64(1) << np.uint64(index % WORD_BITS)
+
+    def dense(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(H, L)`` as dense ``uint8`` arrays (matches ``surface_code``)."""
+
+        H = unpack_bits(self.h_masks, self.n_qubits).astype(np.uint8)
+        L = unpack_bits(self.l_mask, self.n_qubits).astype(np.uint8)
+        return H, L
+
+    # -- shot-major layout -------------------------------------------------
+
+    def pack_errors(self, errors: np.ndarray) -> np.ndarray:
+        """``(shots, n_qubits)`` bools -> ``(shots, n_words)`` ``uint64``."""
+
+        return pack_bits(errors)
+
+    def syndromes(self, packed_errors: np.ndarray) -> np.ndarray:
+        """Boolean ``(shots, n_stabilizers)`` syndromes for shot-major errors."""
+
+        overlap = packed_errors[:, None, :] & self.h_masks[None, :, :]
+        folded = np.bitwise_xor.reduce(overlap, axis=-1)
+        return parity64(folded).astype(bool)
+
+    def logical_parities(self, packed_errors: np.ndarray) -> np.ndarray:
+        """Boolean logical parity per shot for shot-major errors."""
+
+        folded = np.bitwise_xor.reduce(packed_errors & self.l_mask, axis=-1)
+        return parity64(folded).astype(bool)
+
+    # -- bit-sliced layout -------------------------------------------------
+
+    def sample_sliced(self, rng: np.random.Generator, lanes: int, p: float) -> np.ndarray:
+        """Draw ``lanes * 64`` shots as a bit-sliced ``(n_qubits, lanes)`` array."""
+
+        out = np.empty((self.n_qubits, lanes), dtype=np.uint64)
+        for qubit in range(self.n_qubits):
+            flips = rng.random(lanes * WORD_BITS, dtype=np.float32) < p
+            out[qubit] = np.packbits(flips, bitorder="little").view("<u8")
+        return out
+
+    def sliced_syndrome_any(self, sliced: np.ndarray) -> np.ndarray:
+        """Per-lane mask of shots with at least one violated stabilizer."""
+
+        any_violated = np.zeros(sliced.shape[1], dtype=np.uint64)
+        for support in self.supports:
+            any_violated |= np.bitwise_xor.reduce(sliced[support], axis=0)
+        return any_violated
+
+    def sliced_logical(self, sliced: np.ndarray) -> np.ndarray:
+        """Per-lane mask of shots with odd logical parity."""
+
+        return np.bitwise_xor.reduce(sliced[self.logical_support], axis=0)
+
+
+@functools.lru_cache(maxsize=None)
+def packed_code(d: int) -> PackedSurfaceCode:
+    return PackedSurfaceCode(d)
+
+
+def _tail_mask(lanes: int, shots: int) -> np.ndarray:
+    mask = np.full(lanes, np.uint64(0xFFFFFFFFFFFFFFFF), dtype=np.uint64)
+    extra = lanes * WORD_BITS - shots
+    if extra:
+        mask[-1] = np.uint64((1 << (WORD_BITS - extra)) - 1)
+    return mask
+
+
+def simulate_packed(
+    d: int,
+    p: float,
+    shots: int,
+    rng: np.random.Generator | None = None,
+    lanes: int = DEFAULT_LANES,
+) -> dict:
+    """Bit-sliced equivalent of ``simulation.simulate``; same result keys."""
+
+    rng = np.random.default_rng() if rng is None else rng
+    code = packed_code(d)
+
+    no_syndrome = 0
+    no_syndrome_logical = 0
+    remaining = int(shots)
+    while remaining > 0:
+        batch = min(remaining, lanes * WORD_BITS)
+        batch_lanes = -(-batch // WORD_BITS)
+        sliced = code.sample_sliced(rng, batch_lanes, p)
+        clean = ~code.sliced_syndrome_any(sliced) & _tail_mask(batch_lanes, batch)
+        no_syndrome += int(popcount64(clean).sum())
+        no_syndrome_logical += int(popcount64(clean & code.sliced_logical(sliced)).sum())
+        remaining -= batch
+
+    return {
+        "grid_size": d,
+        "probability": round(float(p), 6),
+        "shots": int(shots),
+        "no_syndrome": no_syndrome,
+        "no_syndrome_logical": no_syndrome_logical,
+        "with_syndrome": int(shots) - no_syndrome,
+    }
@@ -0,0 +1,81 @@
+"""Small in-process response cache with size and TTL eviction.
+
+Entries are keyed by the caller (``app.py`` includes the database data
+version in the key), so a bumped version simply stops matching old entries
+and they age out through LRU/TTL eviction.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    mimetype: str
+    headers: tuple
+    etag: str
+
+
+class ResponseCache:
+    """Thread-safe LRU of ``CachedResponse`` objects with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 128, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> CachedResponse | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires, entry = item
+            if expires <= now:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body: bytes, mimetype: str, headers=()) -> CachedResponse:
+        """Store ``body`` under ``key``; the strong ETag is a digest of the body."""
+
+        entry = CachedResponse(
+            body=body,
+            mimetype=mimetype,
+            headers=tuple(headers),
+            etag=hashlib.sha1(body).hexdigest()[:24],
+        )
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
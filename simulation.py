@@ -0,0 +1,240 @@
+"""Vectorised Monte Carlo baselines for the surface-code game loop.
+
+``game_pseudocode.main`` draws one error at a time and computes ``H @ error``
+per shot. This module draws whole batches of errors at once and gets every
+syndrome and logical parity from a single matrix product, so machine
+baselines for the levels players see take seconds instead of minutes.
+
+Run ``python simulation.py --shots 1000000`` for a table over the app's
+``ALLOWED_GRID_SIZES`` and default levels (from ``levels.py``).
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+
+import numpy as np
+
+from game_pseudocode import surface_code
+from levels import ALLOWED_GRID_SIZES, DEFAULT_LEVEL_COUNT, generate_levels
+
+DEFAULT_CHUNK_SIZE = 1 << 15
+
+
+@functools.lru_cache(maxsize=None)
+def code_matrices(d: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(H, L)`` from ``surface_code(d)`` as read-only ``uint8`` arrays."""
+
+    _, _, H, L = surface_code(d)
+    H = np.ascontiguousarray(H, dtype=np.uint8)
+    L = np.ascontiguousarray(L, dtype=np.uint8)
+    H.setflags(write=False)
+    L.setflags(write=False)
+    return H, L
+
+
+@functools.lru_cache(maxsize=None)
+def _check_matrix(d: int) -> np.ndarray:
+    """Stack ``H`` and ``L`` column-wise so one product yields both results."""
+
+    H, L = code_matrices(d)
+    # float32 matmul goes through BLAS and is exact for these small counts.
+    return np.ascontiguousarray(np.vstack([H, L]).T, dtype=np.float32)
+
+
+def sample_errors(rng: np.random.Generator, shots: int, n_qubits: int, p: float) -> np.ndarray:
+    """Draw an ``(shots, n_qubits)`` boolean matrix of independent bit flips."""
+
+    return rng.random((shots, n_qubits), dtype=np.float32) < p
+
+
+def syndromes_and_parities(d: int, errors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the boolean syndromes ``(shots, n_stabilizers)`` and logical parities."""
+
+    counts = errors.astype(np.float32) @ _check_matrix(d)
+    parity = counts.astype(np.int32) & 1
+    return parity[:, :-1].astype(bool), parity[:, -1].astype(bool)
+
+
+def simulate(
+    d: int,
+    p: float,
+    shots: int,
+    rng: np.random.Generator | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """Sample ``shots`` rounds at physical error rate ``p`` on distance ``d``.
+
+    Work proceeds in chunks of ``chunk_size`` shots so memory stays bounded for
+    any shot count. Returns raw counts: ``no_syndrome`` rounds and how many of
+    those hid an undetected logical error (``no_syndrome_logical``); the
+    remaining ``with_syndrome`` rounds are the ones a player would correct.
+    """
+
+    rng = np.random.default_rng() if rng is None else rng
+    H, _ = code_matrices(d)
+    n_qubits = H.shape[1]
+
+    no_syndrome = 0
+    no_syndrome_logical = 0
+    remaining = int(shots)
+    while remaining > 0:
+        batch = min(remaining, chunk_size)
+        syndromes, logical = syndromes_and_parities(
+            d, sample_errors(rng, batch, n_qubits, p)
+        )
+        clean = ~syndromes.any(axis=1)
+        no_syndrome += int(clean.sum())
+        no_syndrome_logical += int((clean & logical).sum())
+        remaining -= batch
+
+    return {
+        "grid_size": d,
+        "probability": round(float(p), 6),
+        "shots": int(shots),
+        "no_syndrome": no_syndrome,
+        "no_syndrome_logical": no_syndrome_logical,
+        "with_syndrome": int(shots) - no_syndrome,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _transfer_plan(d: int) -> tuple:
+    """Qubit order and per-qubit check/close lists for ``syndrome_free_probabilities``.
+
+    Qubits are swept in board order (row, then column) so only about ``d``
+    stabilizers are "open" -- touched by some but not all swept qubits -- at any
+    time, which keeps the state space near ``2**d``.
+    """
+
+    data_qubits, _, H, L = surface_code(d)
+    order = [q["idx"] for q in sorted(data_qubits, key=lambda q: (q["row"], q["col"]))]
+    position = {qubit: index for index, qubit in enumerate(order)}
+    checks = [np.flatnonzero(H[:, qubit]).tolist() for qubit in range(H.shape[1])]
+    last = {}
+    for qubit in order:
+        for stabilizer in checks[qubit]:
+            last[stabilizer] = max(last.get(stabilizer, -1), position[qubit])
+    plan = []
+    for index, qubit in enumerate(order):
+        closing = [s for s in checks[qubit] if last[s] == index]
+        plan.append((checks[qubit], bool(L[qubit]), closing))
+    return tuple(plan)
+
+
+@functools.lru_cache(maxsize=1024)
+def syndrome_free_probabilities(d: int, p: float) -> tuple[float, float]:
+    """Exact probabilities that a round shows no syndrome, and no syndrome but a logical error.
+
+    A transfer sweep over qubits tracks the joint distribution of the open
+    stabilizers' partial parities (bits 1..) and the logical parity (bit 0);
+    a stabilizer's bit must be zero when its last qubit has been swept.
+    ``static/js/app.js`` implements the same sweep in
+    ``SurfaceCode.syndromeFreeProbabilities`` so both sides agree.
+    """
+
+    slots = {}
+    free = []
+    next_slot = 1
+    states = {0: 1.0}
+    for checks, logical, closing in _transfer_plan(d):
+        flip = 1 if logical else 0
+        for stabilizer in checks:
+            if stabilizer not in slots:
+                if free:
+                    slots[stabilizer] = free.pop()
+                else:
+                    slots[stabilizer] = next_slot
+                    next_slot += 1
+            flip |= 1 << slots[stabilizer]
+        updated = {}
+        for state, weight in states.items():
+            updated[state] = updated.get(state, 0.0) + weight * (1 - p)
+            updated[state ^ flip] = updated.get(state ^ flip, 0.0) + weight * p
+        for stabilizer in closing:
+            bit = 1 << slots[stabilizer]
+            updated = {state: w for state, w in updated.items() if not state & bit}
+            free.append(slots.pop(stabilizer))
+        states = updated
+    return states.get(0, 0.0) + states.get(1, 0.0), states.get(1, 0.0)
+
+
+def sample_skipped_rounds(rng: np.random.Generator, d: int, p: float) -> tuple[int, int]:
+    """Draw the syndrome-free rounds before the next syndromed one in one step.
+
+    Returns ``(skipped, skipped_logical)``: a geometric count of rounds without
+    syndrome and a binomial count of those that hid a logical error. This has
+    exactly the distribution of the game's rejection loop.
+    """
+
+    p_clean, p_clean_logical = syndrome_free_probabilities(d, p)
+    if p_clean <= 0:
+        return 0, 0
+    if p_clean >= 1:
+        raise ValueError("no syndrome can ever occur at p=0")
+    skipped = int(rng.geometric(1 - p_clean)) - 1
+    logical = int(rng.binomial(skipped, p_clean_logical / p_clean)) if skipped else 0
+    return skipped, logical
+
+
+def sample_syndromed_error(rng: np.random.Generator, d: int, p: float, batch: int = 64) -> np.ndarray:
+    """Draw one error conditioned on a non-zero syndrome (vectorised rejection)."""
+
+    if p <= 0:
+        raise ValueError("no syndrome can ever occur at p=0")
+    n_qubits = code_matrices(d)[0].shape[1]
+    while True:
+        errors = sample_errors(rng, batch, n_qubits, p)
+        syndromes, _ = syndromes_and_parities(d, errors)
+        hits = np.flatnonzero(syndromes.any(axis=1))
+        if hits.size:
+            return errors[hits[0]]
+
+
+def run_baselines(
+    distances, levels, shots: int, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, packed=False
+) -> list[dict]:
+    """Simulate every ``(d, p)`` pair; one seeded generator drives the whole grid.
+
+    ``packed=True`` uses the bit-sliced kernel from ``packed_code`` instead of
+    the dense matrix product (``chunk_size`` is then ignored).
+    """
+
+    rng = np.random.default_rng(seed)
+    if packed:
+        from packed_code import simulate_packed
+
+        return [simulate_packed(d, p, shots, rng=rng) for d in distances for p in levels]
+    return [
+        simulate(d, p, shots, rng=rng, chunk_size=chunk_size)
+        for d in distances
+        for p in levels
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shots", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--levels", type=int, default=None, help="number of levels")
+    parser.add_argument("--distances", type=int, nargs="*", default=None)
+    parser.add_argument("--packed", action="store_true", help="use the bit-sliced kernel")
+    args = parser.parse_args(argv)
+
+    distances = args.distances or ALLOWED_GRID_SIZES
+    levels = generate_levels(args.levels or DEFAULT_LEVEL_COUNT)
+    print(f"{'d':>3} {'p':>7} {'shots':>10} {'no-syndrome':>12} {'undetected':>11} {'rate':>10}")
+    rows = run_baselines(
+        distances, levels, args.shots, args.seed, args.chunk_size, packed=args.packed
+    )
+    for row in rows:
+        rate = row["no_syndrome_logical"] / row["shots"]
+        print(
+            f"{row['grid_size']:>3} {row['probability']:>7.3f} {row['shots']:>10} "
+            f"{row['no_syndrome']:>12} {row['no_syndrome_logical']:>11} {rate:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1745 @@
+(function() {
+  const config = JSON.parse(document.getElementById('config-data').textContent);
+  const allowedSizes = Array.isArray(config.grid_sizes) ? config.grid_sizes : [];
+  const defaultLevels = Array.isArray(config.levels) ? config.levels : [];
+  const boundsArray = Array.isArray(config.level_bounds) ? config.level_bounds : [];
+  const minProbability = Number(boundsArray[0]);
+  const maxProbability = Number(boundsArray[1]);
+  const precisionValue = Number(config.level_precision);
+  const levelPrecision = Number.isInteger(precisionValue) && precisionValue >= 0 ? precisionValue : 3;
+  const allowedLevelCounts = (config.allowed_level_counts || [])
+    .map((value) => Number(value))
+    .filter((value) => Number.isFinite(value) && value > 0)
+    .sort((a, b) => a - b);
+  const rawLevelCount = Number(config.level_count);
+
+  function generateLevels(count) {
+    const min = Number.isFinite(minProbability) ? minProbability : 0.01;
+    const max = Number.isFinite(maxProbability) ? maxProbability : min;
+    const precision = levelPrecision;
+    const safeCount = Math.max(1, Math.floor(Number(count) || 0));
+    if (safeCount === 1 || max === min) {
+      return [Number(min.toFixed(precision))];
+    }
+    const step = (max - min) / (safeCount - 1);
+    const levels = [];
+    for (let i = 0; i < safeCount; i += 1) {
+      const value = min + step * i;
+      levels.push(Number(value.toFixed(precision)));
+    }
+    return levels;
+  }
+
+  let selectedLevelCount = Number.isFinite(rawLevelCount) ? Math.max(1, Math.floor(rawLevelCount)) : (defaultLevels.length || 3);
+  if (allowedLevelCounts.length && !allowedLevelCounts.includes(selectedLevelCount)) {
+    selectedLevelCount = allowedLevelCounts[0];
+  } else if (!allowedLevelCounts.length && selectedLevelCount < 1) {
+    selectedLevelCount = 1;
+  }
+
+  const baseLevelCount = selectedLevelCount;
+
+  let initialLevels = defaultLevels.slice();
+  if (initialLevels.length !== selectedLevelCount) {
+    initialLevels = generateLevels(selectedLevelCount);
+  }
+
+  const allowedRoundOptions = (config.allowed_rounds || []).map((value) => Number(value));
+  let targetInteractiveRounds = Number(config.rounds_per_level);
+  if (!Number.isFinite(targetInteractiveRounds) || !allowedRoundOptions.includes(targetInteractiveRounds)) {
+    targetInteractiveRounds = allowedRoundOptions.length ? allowedRoundOptions[0] : 3;
+  }
+
+  const baseRoundsPerLevel = targetInteractiveRounds;
+
+  const startBtn = document.getElementById('start-game');
+  const resetBtn = document.getElementById('reset-game');
+  const showStatsBtn = document.getElementById('show-stats');
+  const showDataBtn = document.getElementById('show-data');
+  const nextRoundBtn = document.getElementById('next-round');
+  const autoAdvanceToggle = document.getElementById('auto-advance-toggle');
+  const expertToggle = document.getElementById('expert-toggle');
+  const selectD = document.getElementById('config-d');
+  const selectRounds = document.getElementById('config-rounds');
+  const selectLevels = document.getElementById('config-levels');
+  const playerNameInput = document.getElementById('player-name');
+  const boardWrapper = document.querySelector('.board-wrapper');
+  const boardEl = document.getElementById('board');
+  const statusLine = document.getElementById('status-line');
+  const levelLabel = document.getElementById('level-label');
+  const targetRoundsLabel = document.getElementById('target-rounds');
+  const summaryCard = document.getElementById('summary-card');
+  const summaryOutput = document.getElementById('summary-output');
+  const overlay = document.getElementById('data-overlay');
+  const overlayOutput = document.getElementById('overlay-output');
+  const overlayClose = document.getElementById('overlay-close');
+  const statsOverlay = document.getElementById('stats-overlay');
+  const statsOverlayOutput = document.getElementById('stats-overlay-output');
+  const statsOverlayClose = document.getElementById('stats-overlay-close');
+  const StatsCore = window.StatsCore;
+  const statsClient = createStatsClient(config.stats_worker_url);
+  const logList = document.getElementById('log-list');
+  const statLevel = document.getElementById('stat-level');
+  const statRound = document.getElementById('stat-round');
+  const statLogical = document.getElementById('stat-logical');
+  const statNoSyndrome = document.getElementById('stat-nosyndrome');
+  const expertControls = document.querySelectorAll('[data-expert-control]');
+  const AUTO_ADVANCE_DELAY_MS = 1000;
+
+  if (selectRounds) {
+    selectRounds.value = String(targetInteractiveRounds);
+  }
+  if (selectLevels) {
+    selectLevels.value = String(selectedLevelCount);
+  }
+
+  const state = {
+    running: false,
+    surface: null,
+    qubitButtons: [],
+    stabilizerWidgets: [],
+    sessionId: null,
+    playerName: null,
+    expertMode: Boolean(expertToggle && expertToggle.checked),
+    levelIndex: 0,
+    levels: initialLevels.slice(),
+    levelCount: selectedLevelCount,
+    levelStats: null,
+    levelsData: [],
+    current: null,
+    autoTimer: null,
+    autoAdvanceEnabled: true,
+  };
+
+  let boardScaleFrameId = null;
+  let lastStatsSignature = null;
+  let statusFlashTimer = null;
+  let nextButtonMode = 'continue';
+
+  function setNodeText(node, value) {
+    if (!node) {
+      return;
+    }
+    const nextValue = value == null ? '' : String(value);
+    if (node.textContent !== nextValue) {
+      node.textContent = nextValue;
+    }
+  }
+
+  function parseCssNumber(value) {
+    const parsed = Number.parseFloat(value);
+    return Number.isFinite(parsed) ? parsed : 0;
+  }
+
+  function updateBoardScale() {
+    if (!boardEl) {
+      return;
+    }
+    const boardSizeRaw = boardEl.style.getPropertyValue('--board-size');
+    const boardSize = Number.parseInt(boardSizeRaw, 10);
+    if (!Number.isFinite(boardSize) || boardSize <= 0) {
+      boardEl.style.setProperty('--board-scale', '1');
+      return;
+    }
+    boardEl.style.setProperty('--board-scale', '1');
+    const styles = window.getComputedStyle(boardEl);
+    const paddingLeft = parseCssNumber(styles.paddingLeft);
+    const paddingRight = parseCssNumber(styles.paddingRight);
+    const gap = parseCssNumber(styles.getPropertyValue('--cell-gap'));
+    const baseCellMin = parseCssNumber(styles.getPropertyValue('--cell-min-size'));
+    if (!Number.isFinite(baseCellMin) || baseCellMin <= 0) {
+      boardEl.style.setProperty('--board-scale', '1');
+      return;
+    }
+    const contentWidth = boardEl.clientWidth - paddingLeft - paddingRight;
+    if (!Number.isFinite(contentWidth) || contentWidth <= 0) {
+      boardEl.style.setProperty('--board-scale', '1');
+      return;
+    }
+    const totalGap = gap * Math.max(0, boardSize - 1);
+    const available = contentWidth - totalGap;
+    if (!Number.isFinite(available) || available <= 0) {
+      boardEl.style.setProperty('--board-scale', '1');
+      return;
+    }
+    const targetSize = available / boardSize;
+    if (!Number.isFinite(targetSize) || targetSize >= baseCellMin) {
+      boardEl.style.setProperty('--board-scale', '1');
+      return;
+    }
+    const scale = targetSize / baseCellMin;
+    if (!Number.isFinite(scale) || scale >= 1 || scale <= 0) {
+      boardEl.style.setProperty('--board-scale', '1');
+      return;
+    }
+    boardEl.style.setProperty('--board-scale', scale.toFixed(4));
+  }
+
+  function requestBoardScale() {
+    if (typeof window.requestAnimationFrame !== 'function') {
+      updateBoardScale();
+      return;
+    }
+    if (boardScaleFrameId !== null) {
+      window.cancelAnimationFrame(boardScaleFrameId);
+    }
+    boardScaleFrameId = window.requestAnimationFrame(() => {
+      boardScaleFrameId = null;
+      updateBoardScale();
+    });
+  }
+
+  function setStatus(message, variant) {
+    if (!statusLine) {
+      return;
+    }
+    setNodeText(statusLine, message);
+    let normalized;
+    if (typeof variant === 'string') {
+      normalized = variant.toLowerCase();
+    } else if (variant === true) {
+      normalized = 'error';
+    } else {
+      normalized = 'info';
+    }
+    if (normalized !== 'error' && normalized !== 'success') {
+      normalized = 'info';
+    }
+    statusLine.classList.remove('is-error', 'is-success', 'is-info');
+    statusLine.classList.add('is-' + normalized);
+    if (statusFlashTimer !== null) {
+      window.clearTimeout(statusFlashTimer);
+      statusFlashTimer = null;
+    }
+    statusLine.classList.remove('flash');
+    if (message) {
+      const triggerFlash = () => {
+        statusLine.classList.add('flash');
+        statusFlashTimer = window.setTimeout(() => {
+          statusLine.classList.remove('flash');
+          statusFlashTimer = null;
+        }, 420);
+      };
+      if (typeof window.requestAnimationFrame === 'function') {
+        window.requestAnimationFrame(triggerFlash);
+      } else {
+        triggerFlash();
+      }
+    }
+  }
+
+  function setNextButtonMode(mode) {
+    if (!nextRoundBtn) {
+      nextButtonMode = 'continue';
+      return;
+    }
+    const normalized = mode === 'restart' ? 'restart' : 'continue';
+    nextButtonMode = normalized;
+    nextRoundBtn.dataset.mode = normalized;
+    const label = normalized === 'restart' ? 'Restart' : 'Continue';
+    setNodeText(nextRoundBtn, label);
+    nextRoundBtn.classList.toggle('is-restart', normalized === 'restart');
+  }
+
+  function addLog(message) {
+    const entry = document.createElement('li');
+    entry.textContent = '[' + new Date().toLocaleTimeString() + '] ' + message;
+    logList.prepend(entry);
+    while (logList.children.length > 40) {
+      logList.removeChild(logList.lastChild);
+    }
+  }
+
+  function clearAutoTimer() {
+    if (state.autoTimer !== null) {
+      window.clearTimeout(state.autoTimer);
+      state.autoTimer = null;
+    }
+    if (nextRoundBtn) {
+      nextRoundBtn.classList.remove('active');
+      nextRoundBtn.style.removeProperty('--progress');
+      nextRoundBtn.style.removeProperty('--auto-duration');
+    }
+  }
+
+  function maybeScheduleAutoContinue() {
+    clearAutoTimer();
+    if (
+      !state.running ||
+      !state.autoAdvanceEnabled ||
+      !state.current ||
+      !nextRoundBtn ||
+      nextRoundBtn.disabled
+    ) {
+      return;
+    }
+    const duration = AUTO_ADVANCE_DELAY_MS;
+    nextRoundBtn.style.setProperty('--auto-duration', duration + 'ms');
+    nextRoundBtn.classList.add('active');
+    state.autoTimer = window.setTimeout(() => {
+      state.autoTimer = null;
+      if (nextRoundBtn) {
+        nextRoundBtn.classList.remove('active');
+        nextRoundBtn.style.removeProperty('--progress');
+      }
+      if (
+        state.running &&
+        state.autoAdvanceEnabled &&
+        state.current &&
+        nextRoundBtn &&
+        !nextRoundBtn.disabled
+      ) {
+        handleContinue();
+      }
+    }, AUTO_ADVANCE_DELAY_MS);
+  }
+
+  function updateAutoAdvanceToggle() {
+    if (!autoAdvanceToggle) {
+      return;
+    }
+    const label = state.autoAdvanceEnabled ? 'Auto-advance On' : 'Auto-advance Off';
+    setNodeText(autoAdvanceToggle, label);
+    autoAdvanceToggle.classList.toggle('is-off', !state.autoAdvanceEnabled);
+    autoAdvanceToggle.setAttribute('aria-pressed', state.autoAdvanceEnabled ? 'true' : 'false');
+  }
+
+  function setAutoAdvanceEnabled(enabled) {
+    const normalized = Boolean(enabled);
+    state.autoAdvanceEnabled = normalized;
+    updateAutoAdvanceToggle();
+    if (!normalized) {
+      clearAutoTimer();
+    } else if (state.running && state.current) {
+      maybeScheduleAutoContinue();
+    }
+  }
+
+  // Runs StatsCore (static/js/stats.js) in a worker when the browser allows
+  // it and on the main thread otherwise. The worker is started on first use
+  // and dropped for good if it fails to load.
+  function createStatsClient(workerUrl) {
+    let worker = null;
+    let workerFailed = !workerUrl || typeof Worker === 'undefined';
+    let nextId = 0;
+    const pending = new Map();
+
+    function ensureWorker() {
+      if (worker || workerFailed) {
+        return worker;
+      }
+      try {
+        worker = new Worker(workerUrl);
+      } catch (error) {
+        workerFailed = true;
+        return null;
+      }
+      worker.onmessage = (event) => {
+        const { id, result, error } = event.data || {};
+        const entry = pending.get(id);
+        if (!entry) {
+          return;
+        }
+        pending.delete(id);
+        if (error) {
+          entry.reject(new Error(error));
+        } else {
+          entry.resolve(result);
+        }
+      };
+      worker.onerror = () => {
+        worker.terminate();
+        worker = null;
+        workerFailed = true;
+        pending.forEach((entry) => entry.reject(new Error('stats worker failed')));
+        pending.clear();
+      };
+      return worker;
+    }
+
+    function call(target, message, transfer) {
+      return new Promise((resolve, reject) => {
+        nextId += 1;
+        pending.set(nextId, { resolve, reject });
+        target.postMessage(Object.assign({ id: nextId }, message), transfer);
+      });
+    }
+
+    function decode(buffer) {
+      return buffer ? JSON.parse(new TextDecoder().decode(buffer)) : null;
+    }
+
+    function decodeOptional(buffer) {
+      try {
+        return decode(buffer);
+      } catch (error) {
+        return null;
+      }
+    }
+
+    return {
+      prepare(aggregate, leaderboard, threshold, reference, exact) {
+        const target = ensureWorker();
+        if (!target) {
+          return Promise.resolve(
+            StatsCore.prepareStats(
+              decode(aggregate),
+              decode(leaderboard),
+              decodeOptional(threshold),
+              decodeOptional(reference),
+              decodeOptional(exact),
+            ),
+          );
+        }
+        const buffers = [aggregate, leaderboard, threshold, reference, exact].filter(Boolean);
+        return call(
+          target,
+          { type: 'prepare', aggregate, leaderboard, threshold, reference, exact },
+          buffers,
+        );
+      },
+      draw(canvas, series, threshold) {
+        const size = {
+          width: canvas.clientWidth || canvas.width,
+          height: canvas.clientHeight || canvas.height,
+          dpr: window.devicePixelRatio || 1,
+        };
+        const target = ensureWorker();
+        if (!target || typeof canvas.transferControlToOffscreen !== 'function') {
+          StatsCore.drawStatsChart(canvas, series, threshold, size);
+          return Promise.resolve(true);
+        }
+        const offscreen = canvas.transferControlToOffscreen();
+        return call(target, { type: 'draw', canvas: offscreen, series, threshold, size }, [offscreen]);
+      },
+    };
+  }
+
+  function formatRate(value) {
+    if (!Number.isFinite(value) || value < 0) {
+      return '0.0000';
+    }
+    if (value === 0) {
+      return '0.0000';
+    }
+    if (value < 1e-4) {
+      return value.toExponential(2);
+    }
+    return value.toFixed(4);
+  }
+
+  function renderStatsOverlayContent(seriesList, threshold) {
+    if (!statsOverlayOutput) {
+      return;
+    }
+    statsOverlayOutput.textContent = '';
+    if (!seriesList.length) {
+      const emptyMessage = document.createElement('p');
+      emptyMessage.textContent = 'Not enough data yet. Play a few sessions to generate statistics.';
+      statsOverlayOutput.appendChild(emptyMessage);
+      return;
+    }
+
+    const fragment = document.createDocumentFragment();
+    const container = document.createElement('section');
+    container.className = 'stats-section';
+
+    const header = document.createElement('h3');
+    const totalRoundsAll = seriesList.reduce((total, series) => total + (series.totals.totalRounds || 0), 0);
+    header.textContent = 'Logical error rates by code distance (' + totalRoundsAll.toLocaleString() + ' rounds)';
+    container.appendChild(header);
+
+    const canvas = document.createElement('canvas');
+    canvas.width = 560;
+    canvas.height = 280;
+    canvas.className = 'stats-chart';
+    container.appendChild(canvas);
+
+    const legend = document.createElement('div');
+    legend.className = 'stats-legend';
+    seriesList.forEach((series) => {
+      const item = document.createElement('span');
+      item.className = 'stats-legend-item';
+      const swatch = document.createElement('span');
+      swatch.className = 'stats-legend-swatch';
+      swatch.style.backgroundColor = series.color;
+      swatch.style.borderColor = series.color;
+      item.appendChild(swatch);
+      const label = document.createElement('span');
+      label.textContent = 'd = ' + series.gridSize;
+      item.appendChild(label);
+      legend.appendChild(item);
+    });
+    const hasReference = seriesList.some((series) => series.points.some((point) => point.referenceRate !== null));
+    if (hasReference) {
+      const item = document.createElement('span');
+      item.className = 'stats-legend-item';
+      item.textContent = '◌ dashed: decoder reference (importance sampled)';
+      legend.appendChild(item);
+    }
+    if (seriesList.some((series) => series.exactCurve.length)) {
+      const item = document.createElement('span');
+      item.className = 'stats-legend-item';
+      item.textContent = 'thin line: exact undetected logical rate';
+      legend.appendChild(item);
+    }
+    container.appendChild(legend);
+
+    const thresholdNote = document.createElement('p');
+    thresholdNote.className = 'stats-threshold';
+    const thresholdValue = threshold ? Number(threshold.threshold) : NaN;
+    if (Number.isFinite(thresholdValue)) {
+      const interval = Array.isArray(threshold.interval) ? threshold.interval.map(Number) : [];
+      const percent = Math.round((Number(threshold.confidence) || 0.95) * 100);
+      thresholdNote.textContent = 'Estimated threshold p_th ≈ ' + thresholdValue.toFixed(3)
+        + (interval.length === 2 && interval.every(Number.isFinite)
+          ? ' (' + percent + '% CI ' + interval[0].toFixed(3) + '–' + interval[1].toFixed(3) + ')'
+          : '')
+        + ', from where larger distances stop beating smaller ones.';
+    } else {
+      thresholdNote.textContent = 'Threshold: the curves do not cross yet; more rounds are needed.';
+    }
+    container.appendChild(thresholdNote);
+
+    const table = document.createElement('table');
+    table.className = 'stats-table';
+    const thead = document.createElement('thead');
+    thead.innerHTML = '<tr><th>Distance</th><th>Probability</th><th>Total rounds</th><th>Logical failures</th><th>Logical error rate</th><th>Std. error</th><th>Decoder ref.</th><th>Best score</th></tr>';
+    table.appendChild(thead);
+    const tbody = document.createElement('tbody');
+
+    const tableRows = [];
+    seriesList.forEach((series) => {
+      series.points.forEach((point) => {
+        tableRows.push({ series, point });
+      });
+    });
+    tableRows.sort((a, b) => {
+      if (a.series.gridSize !== b.series.gridSize) {
+        return a.series.gridSize - b.series.gridSize;
+      }
+      return a.point.probability - b.point.probability;
+    });
+
+    tableRows.forEach(({ series, point }) => {
+      const row = document.createElement('tr');
+      const stderrValue = Number.isFinite(point.stderr) ? point.stderr : 0;
+      const bestSummary = point.bestName && Number.isFinite(point.bestRate)
+        ? point.bestName + ' (' + formatRate(point.bestRate) + ')'
+        : '—';
+      const referenceSummary = point.referenceRate !== null
+        ? formatRate(point.referenceRate) + ' ± ' + formatRate(point.referenceStderr)
+        : '—';
+      row.innerHTML = [
+        'd = ' + series.gridSize,
+        point.probability.toFixed(3),
+        point.totalRounds.toLocaleString(),
+        point.logicalFailures.toLocaleString(),
+        formatRate(point.logicalErrorRate),
+        formatRate(stderrValue),
+        referenceSummary,
+        bestSummary,
+      ]
+        .map((value) => '<td>' + value + '</td>')
+        .join('');
+      tbody.appendChild(row);
+    });
+
+    table.appendChild(tbody);
+    const tableWrapper = document.createElement('div');
+    tableWrapper.className = 'stats-table-wrapper';
+    tableWrapper.appendChild(table);
+    container.appendChild(tableWrapper);
+
+    const summaryList = document.createElement('ul');
+    summaryList.className = 'stats-summary-list';
+    seriesList.forEach((series) => {
+      const item = document.createElement('li');
+      const lerOverall = series.totals.totalRounds > 0
+        ? series.totals.logicalFailures / series.totals.totalRounds
+        : 0;
+      item.innerHTML = '<strong>d = ' + series.gridSize + '</strong> · ' + formatRate(lerOverall) + ' (' + series.totals.logicalFailures.toLocaleString() + ' / ' + series.totals.totalRounds.toLocaleString() + ')';
+      summaryList.appendChild(item);
+    });
+    container.appendChild(summaryList);
+
+    fragment.appendChild(container);
+    statsOverlayOutput.appendChild(fragment);
+    // Drawn once attached so the canvas has its laid-out size.
+    statsClient.draw(canvas, seriesList, threshold).catch((error) => {
+      addLog('Could not draw the statistics chart: ' + error.message);
+    });
+  }
+
+  function formatProbabilityValue(value) {
+    const numeric = Number(value);
+    if (!Number.isFinite(numeric)) {
+      return '—';
+    }
+    if (numeric === 0) {
+      return '0.000';
+    }
+    if (Math.abs(numeric) < 0.001) {
+      return numeric.toExponential(2);
+    }
+    return numeric.toFixed(3);
+  }
+
+  function createSummarySection(title) {
+    const section = document.createElement('div');
+    section.className = 'summary-section';
+    if (title) {
+      const heading = document.createElement('h3');
+      heading.textContent = title;
+      section.appendChild(heading);
+    }
+    return section;
+  }
+
+  function renderSummaryCard(summary) {
+    if (!summaryOutput) {
+      return;
+    }
+    summaryOutput.textContent = '';
+    if (!summary) {
+      const placeholder = document.createElement('p');
+      placeholder.className = 'summary-placeholder';
+      placeholder.textContent = 'No data yet.';
+      summaryOutput.appendChild(placeholder);
+      return;
+    }
+
+    const fragment = document.createDocumentFragment();
+    const metaSection = createSummarySection('Stored metadata');
+    const metaGrid = document.createElement('div');
+    metaGrid.className = 'summary-grid';
+
+    const appendMeta = (label, value) => {
+      const item = document.createElement('div');
+      item.className = 'summary-grid-item';
+      const labelSpan = document.createElement('span');
+      labelSpan.className = 'label';
+      labelSpan.textContent = label;
+      const valueSpan = document.createElement('span');
+      valueSpan.className = 'value';
+      valueSpan.textContent = value || '—';
+      item.appendChild(labelSpan);
+      item.appendChild(valueSpan);
+      metaGrid.appendChild(item);
+    };
+
+    const runId = summary.session_id || summary.uid || '';
+    const playerName = typeof summary.name === 'string' && summary.name.trim()
+      ? summary.name.trim()
+      : 'Not provided';
+    const gridSizeValue = Number(summary.grid_size);
+    appendMeta('Run ID', runId || '—');
+    appendMeta('Player', playerName);
+    appendMeta('Code distance', Number.isFinite(gridSizeValue) ? 'd = ' + gridSizeValue : '—');
+    metaSection.appendChild(metaGrid);
+    fragment.appendChild(metaSection);
+
+    const errorProbabilities = Array.isArray(summary.error_probabilities)
+      ? summary.error_probabilities
+      : [];
+    if (errorProbabilities.length) {
+      const probabilitiesSection = createSummarySection('Error probabilities');
+      const pillList = document.createElement('div');
+      pillList.className = 'summary-probabilities';
+      errorProbabilities.forEach((probability) => {
+        const pill = document.createElement('span');
+        pill.className = 'summary-pill';
+        pill.textContent = formatProbabilityValue(probability);
+        pillList.appendChild(pill);
+      });
+      probabilitiesSection.appendChild(pillList);
+      fragment.appendChild(probabilitiesSection);
+    }
+
+    const statsRaw = Array.isArray(summary.probability_stats)
+      ? summary.probability_stats
+      : [];
+    const stats = statsRaw
+      .map((entry) => {
+        const probability = Number(entry.probability);
+        const totalRoundsRaw = Number(entry.total_rounds);
+        const logicalFailuresRaw = Number(entry.logical_failures);
+        return {
+          probability,
+          totalRounds: Number.isFinite(totalRoundsRaw) ? Math.max(Math.round(totalRoundsRaw), 0) : 0,
+          logicalFailures: Number.isFinite(logicalFailuresRaw) ? Math.max(Math.round(logicalFailuresRaw), 0) : 0,
+        };
+      })
+      .filter((entry) => Number.isFinite(entry.probability))
+      .sort((a, b) => a.probability - b.probability);
+
+    if (stats.length) {
+      const statsSection = createSummarySection('Probability stats');
+      const tableWrapper = document.createElement('div');
+      tableWrapper.className = 'summary-table-wrapper';
+      const table = document.createElement('table');
+      table.className = 'summary-table';
+      table.innerHTML = '<thead><tr><th>Probability</th><th>Total rounds</th><th>Logical failures</th></tr></thead>';
+      const tbody = document.createElement('tbody');
+      stats.forEach((entry) => {
+        const row = document.createElement('tr');
+        row.innerHTML = [
+          formatProbabilityValue(entry.probability),
+          entry.totalRounds.toLocaleString(),
+          entry.logicalFailures.toLocaleString(),
+        ]
+          .map((value) => '<td>' + value + '</td>')
+          .join('');
+        tbody.appendChild(row);
+      });
+      table.appendChild(tbody);
+      tableWrapper.appendChild(table);
+      statsSection.appendChild(tableWrapper);
+
+      const barsTitle = document.createElement('p');
+      barsTitle.className = 'summary-subtitle';
+      barsTitle.textContent = 'Logical errors per level';
+      statsSection.appendChild(barsTitle);
+
+      const barsWrapper = document.createElement('div');
+      barsWrapper.className = 'summary-bars';
+      const maxFailures = stats.reduce((max, entry) => Math.max(max, entry.logicalFailures), 0);
+
+      stats.forEach((entry) => {
+        const bar = document.createElement('div');
+        bar.className = 'summary-bar';
+        const header = document.createElement('div');
+        header.className = 'summary-bar-header';
+        const label = document.createElement('span');
+        label.textContent = 'p = ' + formatProbabilityValue(entry.probability);
+        const value = document.createElement('span');
+        value.textContent = entry.logicalFailures.toLocaleString() + ' / ' + entry.totalRounds.toLocaleString();
+        header.appendChild(label);
+        header.appendChild(value);
+        const track = document.createElement('div');
+        track.className = 'summary-bar-track';
+        const fill = document.createElement('div');
+        fill.className = 'summary-bar-fill';
+        if (entry.logicalFailures > 0 && maxFailures > 0) {
+          const widthPercent = (entry.logicalFailures / maxFailures) * 100;
+          const clamped = Math.min(Math.max(widthPercent, 0), 100);
+          fill.style.width = clamped.toFixed(2) + '%';
+        } else {
+          fill.classList.add('is-zero');
+          fill.style.width = '0%';
+        }
+        track.appendChild(fill);
+        bar.appendChild(header);
+        bar.appendChild(track);
+        barsWrapper.appendChild(bar);
+      });
+
+      statsSection.appendChild(barsWrapper);
+      if (maxFailures === 0) {
+        const note = document.createElement('p');
+        note.className = 'summary-note';
+        note.textContent = 'No logical errors recorded for this run.';
+        statsSection.appendChild(note);
+      }
+
+      fragment.appendChild(statsSection);
+    }
+
+    summaryOutput.appendChild(fragment);
+  }
+
+  function showStatsOverlay() {
+    if (!statsOverlay) {
+      return;
+    }
+    statsOverlay.classList.add('visible');
+    if (statsOverlayOutput) {
+      statsOverlayOutput.textContent = 'Loading...';
+    }
+    // Bodies stay raw bytes here; the stats worker parses them.
+    const fetchBuffer = (url) => fetch(url).then((response) => {
+      if (!response.ok) {
+        throw new Error('HTTP ' + response.status);
+      }
+      return response.arrayBuffer();
+    });
+    Promise.all([
+      fetchBuffer('/api/stats/aggregate'),
+      fetchBuffer('/api/leaderboard?limit=1'),
+      // The chart is still useful without the threshold fit.
+      fetchBuffer('/api/stats/threshold').catch(() => null),
+      fetchBuffer('/api/stats/reference').catch(() => null),
+      fetchBuffer('/api/stats/exact').catch(() => null),
+    ])
+      .then(([aggregate, leaderboard, threshold, reference, exact]) => (
+        statsClient.prepare(aggregate, leaderboard, threshold, reference, exact)
+      ))
+      .then(({ series, threshold }) => {
+        renderStatsOverlayContent(series, threshold);
+      })
+      .catch((error) => {
+        if (statsOverlayOutput) {
+          statsOverlayOutput.textContent = 'Failed to load statistics: ' + error.message;
+        }
+      });
+  }
+
+  function hideStatsOverlay(event) {
+    if (!statsOverlay) {
+      return;
+    }
+    if (!event || event.target === statsOverlay || event.target === statsOverlayClose) {
+      statsOverlay.classList.remove('visible');
+    }
+  }
+
+  function setExpertControlsDisabled(disabled) {
+    expertControls.forEach((element) => {
+      if (!element) {
+        return;
+      }
+      element.disabled = disabled;
+      if (disabled) {
+        element.classList.remove('active');
+        element.style.removeProperty('--progress');
+        element.style.removeProperty('--auto-duration');
+      }
+    });
+  }
+
+  function applyExpertMode(isExpert) {
+    state.expertMode = isExpert;
+    document.body.classList.toggle('expert-mode', isExpert);
+    setExpertControlsDisabled(!isExpert);
+    if (!isExpert) {
+      if (!state.running) {
+        selectedLevelCount = baseLevelCount;
+        state.levelCount = baseLevelCount;
+        state.levels = generateLevels(baseLevelCount);
+        if (selectLevels) {
+          selectLevels.value = String(baseLevelCount);
+        }
+        targetInteractiveRounds = baseRoundsPerLevel;
+        if (selectRounds) {
+          selectRounds.value = String(targetInteractiveRounds);
+        }
+      }
+    } else if (selectLevels) {
+      selectLevels.value = String(selectedLevelCount);
+    }
+    updateBoardLabels();
+    renderStats();
+  }
+
+  function ensureBoardVisibility() {
+    if (!boardWrapper) {
+      return;
+    }
+    const compactLayout = window.matchMedia('(max-width: 960px)').matches;
+    if (!compactLayout) {
+      return;
+    }
+    const scrollToBoard = () => {
+      boardWrapper.scrollIntoView({ block: 'start', behavior: 'smooth' });
+    };
+    if (window.requestAnimationFrame) {
+      window.requestAnimationFrame(() => {
+        window.setTimeout(scrollToBoard, 60);
+      });
+    } else {
+      window.setTimeout(scrollToBoard, 60);
+    }
+  }
+
+  function clearBoard() {
+    boardEl.textContent = '';
+    boardEl.style.setProperty('--board-size', 1);
+    boardEl.style.setProperty('--board-scale', '1');
+    const placeholder = document.createElement('div');
+    placeholder.className = 'cell placeholder';
+    placeholder.textContent = 'Select a distance and press Start Game.';
+    boardEl.appendChild(placeholder);
+    state.qubitButtons = [];
+    state.stabilizerWidgets = [];
+    updateBoardScale();
+    requestBoardScale();
+  }
+
+  class SurfaceCode {
+    constructor(distance) {
+      this.d = distance;
+      this.dataQubits = [];
+      this.stabilizers = [];
+      this.matrixH = [];
+      this.checksOf = [];
+      this.logicalVector = null;
+      this.build();
+    }
+
+    build() {
+      const d = this.d;
+      let idx = 0;
+      for (let row = 0; row < d; row += 1) {
+        for (let col = 0; col < d; col += 1) {
+          this.dataQubits.push({ idx: idx++, row, col, isEdge: col === 0 });
+        }
+      }
+      for (let row = 0; row < d - 1; row += 1) {
+        for (let col = 0; col < d - 1; col += 1) {
+          this.dataQubits.push({ idx: idx++, row: row + 0.5, col: col + 0.5, isEdge: false });
+        }
+      }
+
+      // Integer-grid qubit (row, col) has index row*d + col; the half-integer
+      // qubit at (row+0.5, col+0.5) has index d*d + row*(d-1) + col. Same
+      // ordering as stabilizer_supports() in game_pseudocode.py.
+      const halfOffset = d * d;
+      let sIdx = 0;
+      for (let row = 0; row < d; row += 1) {
+        for (let col = 0; col < d - 1; col += 1) {
+          const colMid = col + 0.5;
+          const neighborList = [row * d + col, row * d + col + 1];
+          if (row > 0) {
+            neighborList.push(halfOffset + (row - 1) * (d - 1) + col);
+          }
+          if (row < d - 1) {
+            neighborList.push(halfOffset + row * (d - 1) + col);
+          }
+          this.stabilizers.push({ idx: sIdx, row, col: colMid, neighbors: neighborList });
+          this.matrixH.push(neighborList);
+          sIdx += 1;
+        }
+      }
+
+      // Qubit -> stabilizer adjacency, so a flip only revisits its (one or
+      // two) stabilizers instead of recomputing the whole syndrome.
+      const checks = this.dataQubits.map(() => []);
+      this.matrixH.forEach((indices, stabilizerIdx) => {
+        indices.forEach((qubitIdx) => checks[qubitIdx].push(stabilizerIdx));
+      });
+      this.checksOf = checks.map((list) => Uint16Array.from(list));
+      this.logicalVector = Uint8Array.from(this.dataQubits, (q) => (q.col === 0 ? 1 : 0));
+    }
+
+    syndrome(vector) {
+      const syndrome = new Uint8Array(this.matrixH.length);
+      this.matrixH.forEach((indices, stabilizerIdx) => {
+        let total = 0;
+        for (const idx of indices) {
+          total ^= vector[idx];
+        }
+        syndrome[stabilizerIdx] = total;
+      });
+      return syndrome;
+    }
+
+    // Interactive round state: typed vectors plus a running syndrome weight.
+    createRound(error, syndrome) {
+      return {
+        error,
+        correction: new Uint8Array(error.length),
+        residual: error.slice(),
+        syndrome,
+        syndromeWeight: sumVector(syndrome),
+      };
+    }
+
+    // Toggles qubit idx in the round's correction and updates only the
+    // stabilizers it touches. Returns their indices for the board patch.
+    applyFlip(round, idx) {
+      round.correction[idx] ^= 1;
+      round.residual[idx] ^= 1;
+      const checks = this.checksOf[idx];
+      for (let i = 0; i < checks.length; i += 1) {
+        const stabilizerIdx = checks[i];
+        round.syndrome[stabilizerIdx] ^= 1;
+        round.syndromeWeight += round.syndrome[stabilizerIdx] ? 1 : -1;
+      }
+      return checks;
+    }
+
+    logicalParity(vector) {
+      let total = 0;
+      for (let i = 0; i < vector.length; i += 1) {
+        if (this.logicalVector[i]) {
+          total ^= vector[i];
+        }
+      }
+      return total;
+    }
+
+    // Exact probabilities that a round has no syndrome (clean) and no syndrome
+    // but odd logical parity (cleanLogical). Sweeps qubits in board order while
+    // tracking the open stabilizers' partial parities; mirrors
+    // simulation.syndrome_free_probabilities on the server.
+    syndromeFreeProbabilities(probability) {
+      if (!this.cleanCache) {
+        this.cleanCache = new Map();
+      }
+      if (this.cleanCache.has(probability)) {
+        return this.cleanCache.get(probability);
+      }
+      const checksOf = this.checksOf;
+      const order = this.dataQubits
+        .slice()
+        .sort((a, b) => (a.row - b.row) || (a.col - b.col))
+        .map((q) => q.idx);
+      const lastUse = new Map();
+      order.forEach((qIdx, position) => {
+        checksOf[qIdx].forEach((sIdx) => lastUse.set(sIdx, position));
+      });
+
+      const slots = new Map();
+      const freeSlots = [];
+      let nextSlot = 1;
+      let states = new Map([[0, 1]]);
+      order.forEach((qIdx, position) => {
+        let flip = this.logicalVector[qIdx] ? 1 : 0;
+        checksOf[qIdx].forEach((sIdx) => {
+          if (!slots.has(sIdx)) {
+            slots.set(sIdx, freeSlots.length ? freeSlots.pop() : nextSlot++);
+          }
+          flip |= 1 << slots.get(sIdx);
+        });
+        let updated = new Map();
+        states.forEach((weight, key) => {
+          updated.set(key, (updated.get(key) || 0) + weight * (1 - probability));
+          const flipped = key ^ flip;
+          updated.set(flipped, (updated.get(flipped) || 0) + weight * probability);
+        });
+        checksOf[qIdx].forEach((sIdx) => {
+          if (lastUse.get(sIdx) !== position) {
+            return;
+          }
+          const bit = 1 << slots.get(sIdx);
+          const kept = new Map();
+          updated.forEach((weight, key) => {
+            if (!(key & bit)) {
+              kept.set(key, weight);
+            }
+          });
+          updated = kept;
+          freeSlots.push(slots.get(sIdx));
+          slots.delete(sIdx);
+        });
+        states = updated;
+      });
+      const cleanLogical = states.get(1) || 0;
+      const result = { clean: (states.get(0) || 0) + cleanLogical, cleanLogical };
+      this.cleanCache.set(probability, result);
+      return result;
+    }
+
+    // Number of syndrome-free rounds before the next syndromed one (geometric)
+    // and, per skipped round, whether it hid a logical error. Same distribution
+    // as sampling round by round until a syndrome appears.
+    sampleSkippedRounds(probability) {
+      const { clean, cleanLogical } = this.syndromeFreeProbabilities(probability);
+      if (!(clean > 0) || clean >= 1) {
+        return [];
+      }
+      const uniform = 1 - Math.random();
+      const skipped = Math.floor(Math.log(uniform) / Math.log(clean));
+      const logicalShare = cleanLogical / clean;
+      const outcomes = new Array(skipped);
+      for (let i = 0; i < skipped; i += 1) {
+        outcomes[i] = Math.random() < logicalShare;
+      }
+      return outcomes;
+    }
+
+    sampleSyndromedError(probability) {
+      for (;;) {
+        const error = randomVector(this.dataQubits.length, probability);
+        const syndrome = this.syndrome(error);
+        if (sumVector(syndrome) > 0) {
+          return this.createRound(error, syndrome);
+        }
+      }
+    }
+  }
+
+  function buildBoard(surface) {
+    boardEl.textContent = '';
+    const size = surface.d * 2 - 1;
+    boardEl.style.setProperty('--board-size', size);
+    boardEl.style.setProperty('--board-scale', '1');
+    const fragment = document.createDocumentFragment();
+    const cells = Array.from({ length: size * size }, () => {
+      const wrapper = document.createElement('div');
+      wrapper.className = 'cell empty';
+      fragment.appendChild(wrapper);
+      return wrapper;
+    });
+    boardEl.appendChild(fragment);
+
+    const indexFor = (row, col) => row * size + col;
+
+    state.qubitButtons = surface.dataQubits.map((q) => {
+      const r = Math.round(q.row * 2);
+      const c = Math.round(q.col * 2);
+      const button = document.createElement('button');
+      button.className = 'qubit';
+      button.type = 'button';
+      const label = String(q.idx);
+      button.dataset.idx = label;
+      button.dataset.label = label;
+      button.textContent = state.expertMode ? label : '';
+      button.disabled = true;
+      const cell = cells[indexFor(r, c)];
+      cell.classList.remove('empty');
+      cell.appendChild(button);
+      return button;
+    });
+
+    state.stabilizerWidgets = surface.stabilizers.map((s) => {
+      const r = Math.round(s.row * 2);
+      const c = Math.round(s.col * 2);
+      const span = document.createElement('div');
+      span.className = 'stabilizer';
+      const label = String(s.idx);
+      span.dataset.label = label;
+      span.textContent = state.expertMode ? label : '';
+      const cell = cells[indexFor(r, c)];
+      cell.classList.remove('empty');
+      cell.appendChild(span);
+      return span;
+    });
+
+    updateBoardLabels();
+    updateBoardScale();
+    requestBoardScale();
+  }
+
+  // Full repaint: once when a round is shown and once when it is cleared
+  // (which reveals the error). Clicks in between go through patchBoardMarkers.
+  function updateBoardMarkers() {
+    if (!state.current) {
+      return;
+    }
+    const { error, correction, residual, syndrome } = state.current;
+    const showErrors = state.current.syndromeWeight === 0;
+
+    state.qubitButtons.forEach((btn, idx) => {
+      const hasInitialError = showErrors && Boolean(error[idx]);
+      btn.classList.toggle('has-error', hasInitialError);
+      btn.classList.toggle('corrected', Boolean(correction[idx]));
+      btn.classList.toggle('residual', showErrors && Boolean(residual[idx]));
+    });
+
+    state.stabilizerWidgets.forEach((widget, idx) => {
+      widget.classList.toggle('active', Boolean(syndrome[idx]));
+    });
+  }
+
+  function patchBoardMarkers(qubitIdx, stabilizerIdxs) {
+    const { correction, syndrome } = state.current;
+    const button = state.qubitButtons[qubitIdx];
+    if (button) {
+      button.classList.toggle('corrected', Boolean(correction[qubitIdx]));
+    }
+    for (let i = 0; i < stabilizerIdxs.length; i += 1) {
+      const widget = state.stabilizerWidgets[stabilizerIdxs[i]];
+      if (widget) {
+        widget.classList.toggle('active', Boolean(syndrome[stabilizerIdxs[i]]));
+      }
+    }
+  }
+
+  function updateBoardLabels() {
+    const showLabels = Boolean(state.expertMode);
+    state.qubitButtons.forEach((btn) => {
+      const label = btn.dataset.label || '';
+      btn.textContent = showLabels ? label : '';
+    });
+    state.stabilizerWidgets.forEach((widget) => {
+      const label = widget.dataset.label || '';
+      widget.textContent = showLabels ? label : '';
+    });
+  }
+
+  function setControlsEnabled(enabled) {
+    state.qubitButtons.forEach((btn) => {
+      btn.disabled = !enabled;
+    });
+  }
+
+  function randomVector(length, probability) {
+    const vector = new Uint8Array(length);
+    for (let i = 0; i < length; i += 1) {
+      vector[i] = Math.random() < probability ? 1 : 0;
+    }
+    return vector;
+  }
+
+  function sumVector(vector) {
+    let total = 0;
+    for (let i = 0; i < vector.length; i += 1) {
+      total += vector[i];
+    }
+    return total;
+  }
+
+  function handleBoardClick(event) {
+    const target = event.target instanceof Element ? event.target.closest('.qubit') : null;
+    if (!target || target.disabled) {
+      return;
+    }
+    const idx = Number.parseInt(target.dataset.idx || '', 10);
+    if (!Number.isFinite(idx)) {
+      return;
+    }
+    handleQubitFlip(idx);
+  }
+
+  function handleQubitFlip(idx) {
+    if (!state.running || !state.current) {
+      return;
+    }
+    const current = state.current;
+    current.flips.push(idx);
+    current.flipTimes.push(Math.round(performance.now() - current.shownAt));
+    const touched = state.surface.applyFlip(current, idx);
+
+    const weight = current.syndromeWeight;
+    if (weight === 0) {
+      updateBoardMarkers();
+      setControlsEnabled(false);
+      nextRoundBtn.disabled = false;
+      const levelStats = state.levelStats;
+      levelStats.withSyndrome += 1;
+      const isLogicalError = state.surface.logicalParity(current.residual) === 1;
+      levelStats.records.push({
+        kind: isLogicalError ? 'logical_error' : 'success',
+        error: supportOf(current.error),
+        flips: current.flips,
+        flip_ms: current.flipTimes,
+      });
+      if (isLogicalError) {
+        levelStats.logicalErrors += 1;
+        levelStats.events.push({ type: 'logical_error', round: levelStats.withSyndrome });
+        setStatus('Logical error detected. Continue to the next round.', 'error');
+        addLog('Logical error recorded for this level.');
+      } else {
+        levelStats.events.push({ type: 'success', round: levelStats.withSyndrome });
+        const residualWeight = sumVector(current.residual);
+        const residualSummary = residualWeight === 0
+          ? 'Residual empty (errors identified uniquely).'
+          : 'Residual non-zero (stabilizer-equivalent correction).';
+        setStatus('Syndrome cleared. No logical error. ' + residualSummary, 'success');
+        addLog('Syndrome cleared without logical error.');
+      }
+      renderStats();
+      if (levelStats.withSyndrome >= targetInteractiveRounds) {
+        addLog('Target number of rounds with syndrome reached for this level.');
+      }
+      maybeScheduleAutoContinue();
+    } else {
+      patchBoardMarkers(idx, touched);
+      setStatus('Syndrome weight ' + weight + '. Continue correcting.', 'info');
+    }
+  }
+
+  function renderStats() {
+    const activeSyndromeWeight = (state.running && state.current)
+      ? state.current.syndromeWeight
+      : 0;
+    const hasActiveInteractiveRound = activeSyndromeWeight > 0;
+    let currentLevelRound = 0;
+    let levelText = '-';
+    let roundText = '-';
+    let logicalText = '-';
+    let noSyndromeText = '-';
+
+    addLog("rendering Stats")
+
+    if (state.running && state.levelStats) {
+      levelText = (state.levelIndex + 1) + ' / ' + state.levels.length;
+      currentLevelRound = Math.min(
+        state.levelStats.withSyndrome + (hasActiveInteractiveRound ? 1 : 0),
+        targetInteractiveRounds
+      );
+      roundText = currentLevelRound + '/' + targetInteractiveRounds;
+      logicalText = String(state.levelStats.logicalErrors);
+      noSyndromeText = String(state.levelStats.withoutSyndrome);
+    }
+    const totalInteractiveRounds = state.levels.length * targetInteractiveRounds;
+    let completedInteractiveRounds = (state.levelsData || []).reduce((sum, level) => {
+      return sum + (Number(level.interactive_rounds) || 0);
+    }, 0);
+    if (state.running && state.levelStats) {
+      completedInteractiveRounds += state.levelStats.withSyndrome;
+    }
+    const displayedInteractiveRounds = completedInteractiveRounds + (hasActiveInteractiveRound ? 1 : 0);
+    const overallRoundsText = totalInteractiveRounds > 0
+      ? displayedInteractiveRounds + '/' + totalInteractiveRounds
+      : '0/0';
+
+    const statsSignature = [
+      state.running ? 1 : 0,
+      state.levelIndex,
+      state.levels.length,
+      state.levelStats ? state.levelStats.withSyndrome : -1,
+      state.levelStats ? state.levelStats.withoutSyndrome : -1,
+      state.levelStats ? state.levelStats.logicalErrors : -1,
+      currentLevelRound,
+      displayedInteractiveRounds,
+      targetInteractiveRounds,
+      state.levelsData.length,
+      overallRoundsText,
+    ].join('|');
+
+    if (statsSignature === lastStatsSignature) {
+      return;
+    }
+    lastStatsSignature = statsSignature;
+
+    setNodeText(statLevel, levelText);
+    setNodeText(statRound, roundText);
+    setNodeText(statLogical, logicalText);
+    setNodeText(statNoSyndrome, noSyndromeText);
+    addLog("overall rounds: " + overallRoundsText)
+    if (targetRoundsLabel) {
+      setNodeText(targetRoundsLabel, overallRoundsText);
+    }
+    if (selectRounds && selectRounds.value !== String(targetInteractiveRounds)) {
+      selectRounds.value = String(targetInteractiveRounds);
+    }
+    if (selectLevels && selectLevels.value !== String(selectedLevelCount)) {
+      selectLevels.value = String(selectedLevelCount);
+    }
+  }
+
+  function handleRoundsChange() {
+    if (!selectRounds) {
+      return;
+    }
+    if (!state.expertMode) {
+      selectRounds.value = String(targetInteractiveRounds);
+      return;
+    }
+    const chosen = Number.parseInt(selectRounds.value, 10);
+    if (!Number.isFinite(chosen) || !allowedRoundOptions.includes(chosen)) {
+      return;
+    }
+    if (targetInteractiveRounds === chosen) {
+      return;
+    }
+    targetInteractiveRounds = chosen;
+    addLog('Rounds per level set to ' + chosen + '.');
+    renderStats();
+  }
+
+  function handleLevelsChange() {
+    if (!selectLevels) {
+      return;
+    }
+    if (!state.expertMode) {
+      selectLevels.value = String(selectedLevelCount);
+      return;
+    }
+    const chosen = Number.parseInt(selectLevels.value, 10);
+    if (!Number.isFinite(chosen)) {
+      selectLevels.value = String(selectedLevelCount);
+      return;
+    }
+    const normalized = Math.max(1, Math.floor(chosen));
+    if (allowedLevelCounts.length && !allowedLevelCounts.includes(normalized)) {
+      selectLevels.value = String(selectedLevelCount);
+      return;
+    }
+    if (state.running) {
+      selectLevels.value = String(selectedLevelCount);
+      return;
+    }
+    if (selectedLevelCount === normalized) {
+      return;
+    }
+    selectedLevelCount = normalized;
+    state.levelCount = normalized;
+    state.levels = generateLevels(normalized);
+    addLog('Levels per run set to ' + normalized + '.');
+    renderStats();
+  }
+
+  function resetState() {
+    clearAutoTimer();
+    state.running = false;
+    state.surface = null;
+    state.qubitButtons = [];
+    state.stabilizerWidgets = [];
+    state.sessionId = null;
+    state.playerName = null;
+    state.levelIndex = 0;
+    state.levelCount = selectedLevelCount;
+    state.levels = generateLevels(selectedLevelCount);
+    state.levelStats = null;
+    state.levelsData = [];
+    state.current = null;
+    nextRoundBtn.disabled = true;
+    setNextButtonMode('continue');
+    summaryCard.classList.remove('visible');
+    renderSummaryCard(null);
+    setNodeText(levelLabel, '-');
+    setStatus('', 'info');
+    clearBoard();
+    startBtn.disabled = false;
+    if (expertToggle) {
+      applyExpertMode(Boolean(expertToggle.checked));
+    } else {
+      renderStats();
+    }
+    updateAutoAdvanceToggle();
+  }
+
+  function startGame() {
+    const distance = Number.parseInt(selectD.value, 10);
+    if (!allowedSizes.includes(distance)) {
+      setStatus('Unknown code distance selected.', 'error');
+      return;
+    }
+    const isExpert = Boolean(expertToggle && expertToggle.checked);
+    const playerName = playerNameInput ? playerNameInput.value.trim() : '';
+    if (isExpert && selectRounds) {
+      const selectedRounds = Number.parseInt(selectRounds.value, 10);
+      if (Number.isFinite(selectedRounds) && allowedRoundOptions.includes(selectedRounds)) {
+        targetInteractiveRounds = selectedRounds;
+      }
+    }
+    if (isExpert && selectLevels) {
+      const selectedLevels = Number.parseInt(selectLevels.value, 10);
+      if (Number.isFinite(selectedLevels)) {
+        const normalized = Math.max(1, Math.floor(selectedLevels));
+        if (!allowedLevelCounts.length || allowedLevelCounts.includes(normalized)) {
+          selectedLevelCount = normalized;
+        }
+      }
+    }
+    resetState();
+    state.playerName = playerName ? playerName : null;
+    state.running = true;
+    state.surface = new SurfaceCode(distance);
+    state.sessionId = uuid();
+    startBtn.disabled = true;
+    if (state.expertMode && selectRounds) {
+      selectRounds.disabled = true;
+    }
+    if (state.expertMode && selectLevels) {
+      selectLevels.disabled = true;
+    }
+    if (selectLevels) {
+      selectLevels.value = String(selectedLevelCount);
+    }
+    const sessionLog = 'New session ' + state.sessionId + ' started with d=' + distance + (state.playerName ? ' for ' + state.playerName : '') + '.';
+    addLog(sessionLog);
+    buildBoard(state.surface);
+    renderStats();
+    ensureBoardVisibility();
+    advanceLevel();
+  }
+
+  function advanceLevel() {
+    clearAutoTimer();
+    if (!state.running) {
+      return;
+    }
+    if (state.levelIndex >= state.levels.length) {
+      finishRun();
+      return;
+    }
+
+    const probability = state.levels[state.levelIndex];
+    state.levelStats = {
+      probability,
+      withSyndrome: 0,
+      withoutSyndrome: 0,
+      logicalErrors: 0,
+      events: [],
+      records: [],
+    };
+    setNodeText(levelLabel, (state.levelIndex + 1) + ' (p = ' + probability + ')');
+    addLog('Level ' + (state.levelIndex + 1) + ' started with p=' + probability + '.');
+    state.current = null;
+    setStatus('Generating rounds...', 'info');
+    setControlsEnabled(false);
+    nextRoundBtn.disabled = true;
+    // renderStats();
+    scheduleNextRound();
+  }
+
+  function scheduleNextRound() {
+    clearAutoTimer();
+    if (!state.running) {
+      return;
+    }
+    const levelStats = state.levelStats;
+    if (levelStats.withSyndrome >= targetInteractiveRounds) {
+      finishLevel();
+      return;
+    }
+
+    const probability = levelStats.probability;
+    const skipped = state.surface.sampleSkippedRounds(probability);
+    if (skipped.length) {
+      let hiddenErrors = 0;
+      skipped.forEach((isLogicalError) => {
+        levelStats.withoutSyndrome += 1;
+        if (isLogicalError) {
+          hiddenErrors += 1;
+          levelStats.logicalErrors += 1;
+          levelStats.events.push({ type: 'no_syndrome_logical_error', round: levelStats.withoutSyndrome });
+        } else {
+          levelStats.events.push({ type: 'no_syndrome_clear', round: levelStats.withoutSyndrome });
+        }
+      });
+      levelStats.records.push({ kind: 'no_syndrome', rounds: skipped.length, logical: hiddenErrors });
+      addLog('Skipped ' + skipped.length + ' rounds without syndrome' + (hiddenErrors ? ' (' + hiddenErrors + ' hid a logical error).' : '.'));
+    }
+    const round = state.surface.sampleSyndromedError(probability);
+    state.current = Object.assign(round, {
+      probability,
+      flips: [],
+      flipTimes: [],
+      shownAt: performance.now(),
+    });
+    addLog('Round ' + (levelStats.withSyndrome + 1) + ' ready. Syndrome weight ' + round.syndromeWeight + '.');
+    setStatus('Flip qubits to clear the syndrome.', 'info');
+    setControlsEnabled(true);
+    nextRoundBtn.disabled = true;
+    updateBoardMarkers();
+    renderStats();
+  }
+
+  function finishLevel() {
+    clearAutoTimer();
+    const totalRounds = state.levelStats.withSyndrome + state.levelStats.withoutSyndrome;
+    state.levelsData.push({
+      probability: state.levelStats.probability,
+      interactive_rounds: state.levelStats.withSyndrome,
+      no_syndrome_rounds: state.levelStats.withoutSyndrome,
+      total_rounds: totalRounds,
+      logical_failures: state.levelStats.logicalErrors,
+      events: state.levelStats.events,
+    });
+    flushLevelEvents(state.levelIndex, state.levelStats);
+    addLog('Level ' + (state.levelIndex + 1) + ' completed.');
+    state.levelIndex += 1;
+    setTimeout(advanceLevel, 200);
+  }
+
+  function supportOf(vector) {
+    const indices = [];
+    vector.forEach((value, idx) => {
+      if (value) {
+        indices.push(idx);
+      }
+    });
+    return indices;
+  }
+
+  // Per-round records go to a separate endpoint at each level boundary so the
+  // summary save stays small. sendBeacon survives the page being closed; the
+  // keepalive fetch covers browsers without it or a refused beacon.
+  function flushLevelEvents(levelIndex, levelStats) {
+    if (!levelStats.records.length || !state.surface) {
+      return;
+    }
+    const body = JSON.stringify({
+      uid: state.sessionId,
+      grid_size: state.surface.d,
+      level: levelIndex,
+      probability: levelStats.probability,
+      records: levelStats.records,
+    });
+    const blob = new Blob([body], { type: 'application/json' });
+    if (navigator.sendBeacon && navigator.sendBeacon('/api/game/events', blob)) {
+      return;
+    }
+    fetch('/api/game/events', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body,
+      keepalive: true,
+    }).catch(() => {
+      addLog('Could not store the event log for level ' + (levelIndex + 1) + '.');
+    });
+  }
+
+  function finishRun() {
+    clearAutoTimer();
+    state.running = false;
+    setControlsEnabled(false);
+    nextRoundBtn.disabled = true;
+    nextRoundBtn.classList.remove('active');
+    nextRoundBtn.style.removeProperty('--progress');
+    startBtn.disabled = false;
+    if (selectRounds) {
+      selectRounds.disabled = false;
+    }
+    if (selectLevels) {
+      selectLevels.disabled = false;
+    }
+    setStatus('All levels completed. Saving summary.', 'info');
+    addLog('Session complete - preparing summary.');
+
+    const probabilityStats = state.levelsData.map((level) => ({
+      probability: level.probability,
+      total_rounds: level.total_rounds,
+      logical_failures: level.logical_failures,
+    }));
+
+    const totals = probabilityStats.reduce((acc, entry) => {
+      acc.total_rounds += entry.total_rounds;
+      acc.logical_failures += entry.logical_failures;
+      return acc;
+    }, { total_rounds: 0, logical_failures: 0 });
+
+    const summary = {
+      session_id: state.sessionId,
+      name: state.playerName,
+      grid_size: state.surface ? state.surface.d : null,
+      rounds_per_level: targetInteractiveRounds,
+      error_probabilities: state.levels,
+      probability_stats: probabilityStats,
+      totals,
+      levels: state.levelsData,
+    };
+
+    summaryCard.classList.add('visible');
+    renderSummaryCard(summary);
+
+    const payload = {
+      uid: state.sessionId,
+      name: state.playerName,
+      grid_size: summary.grid_size,
+      error_probabilities: summary.error_probabilities,
+      probability_stats: probabilityStats,
+    };
+
+    fetch('/api/game/save', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload),
+    })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error('HTTP ' + response.status);
+        }
+        return response.json();
+      })
+      .then((data) => {
+        addLog('Session stored with id ' + data.uid + '.');
+        const totals = summary.totals || { total_rounds: 0, logical_failures: 0 };
+        const totalRounds = Number(totals.total_rounds) || 0;
+        const totalFailures = Number(totals.logical_failures) || 0;
+        const statsMessage = 'Session saved to the database. You made ' + totalFailures + ' logical errors in ' + totalRounds + ' rounds.';
+        setStatus(statsMessage, 'success');
+        setNextButtonMode('restart');
+        if (nextRoundBtn) {
+          nextRoundBtn.disabled = false;
+          if (typeof nextRoundBtn.focus === 'function') {
+            nextRoundBtn.focus({ preventScroll: true });
+          }
+        }
+      })
+      .catch((error) => {
+        setStatus('Could not save session: ' + error.message, 'error');
+        addLog('Failed to persist session.');
+      });
+  }
+
+  function handleContinue() {
+    if (!state.current) {
+      if (!state.running && nextButtonMode === 'restart') {
+        clearAutoTimer();
+        setNextButtonMode('continue');
+        nextRoundBtn.disabled = true;
+        startGame();
+      }
+      return;
+    }
+    clearAutoTimer();
+    state.current = null;
+    nextRoundBtn.disabled = true;
+    setStatus('Preparing next round...', 'info');
+    setControlsEnabled(false);
+    setTimeout(scheduleNextRound, 200);
+  }
+
+  function showDataOverlay() {
+    overlay.classList.add('visible');
+    overlayOutput.textContent = 'Loading...';
+    fetch('/api/game/data')
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error('HTTP ' + response.status);
+        }
+        return response.json();
+      })
+      .then((data) => {
+        overlayOutput.textContent = JSON.stringify(data, null, 2);
+      })
+      .catch((error) => {
+        overlayOutput.textContent = 'Failed to load data: ' + error.message;
+      });
+  }
+
+  function hideOverlay(event) {
+    if (!event || event.target === overlay || event.target === overlayClose) {
+      overlay.classList.remove('visible');
+    }
+  }
+
+  function uuid() {
+    return ([1e7]+-1e3+-4e3+-8e3+-1e11).replace(/[018]/g, function(c) {
+      return (c ^ (crypto.getRandomValues(new Uint8Array(1))[0] & (15 >> (c / 4)))).toString(16);
+    });
+  }
+
+  if (selectRounds) {
+    selectRounds.addEventListener('change', handleRoundsChange);
+  }
+  if (selectLevels) {
+    selectLevels.addEventListener('change', handleLevelsChange);
+  }
+  if (expertToggle) {
+    expertToggle.addEventListener('change', () => {
+      applyExpertMode(Boolean(expertToggle.checked));
+    });
+  }
+  if (autoAdvanceToggle) {
+    autoAdvanceToggle.addEventListener('click', () => {
+      const nextEnabled = !state.autoAdvanceEnabled;
+      setAutoAdvanceEnabled(nextEnabled);
+      addLog(nextEnabled ? 'Auto-advance enabled.' : 'Auto-advance disabled.');
+    });
+  }
+
+  startBtn.addEventListener('click', startGame);
+  resetBtn.addEventListener('click', resetState);
+  showStatsBtn.addEventListener('click', showStatsOverlay);
+  showDataBtn.addEventListener('click', showDataOverlay);
+  nextRoundBtn.addEventListener('click', handleContinue);
+  overlay.addEventListener('click', hideOverlay);
+  overlayClose.addEventListener('click', hideOverlay);
+  statsOverlay.addEventListener('click', hideStatsOverlay);
+  statsOverlayClose.addEventListener('click', hideStatsOverlay);
+  if (boardEl) {
+    boardEl.addEventListener('click', handleBoardClick);
+  }
+  window.addEventListener('resize', requestBoardScale);
+
+  document.addEventListener('keydown', (event) => {
+    if (event.key === 'Escape') {
+      overlay.classList.remove('visible');
+      if (statsOverlay) {
+        statsOverlay.classList.remove('visible');
+      }
+    }
+  });
+
+  setNextButtonMode('continue');
+  clearBoard();
+  applyExpertMode(Boolean(expertToggle && expertToggle.checked));
+  setAutoAdvanceEnabled(state.autoAdvanceEnabled);
+})();
@@ -0,0 +1,351 @@
+// Stats overlay helpers shared by the page and the stats worker. Loaded as a
+// classic script this defines `self.StatsCore`; started as a worker from the
+// same URL it also answers 'prepare' and 'draw' messages, so parsing the
+// fetched JSON, merging it and drawing the chart stay off the UI thread.
+(function(scope) {
+  const PALETTE = ['#7dd3fc', '#fca5a5', '#fcd34d', '#c4b5fd', '#86efac', '#f9a8d4', '#f97316', '#fbbf24'];
+
+  function mergeServerAggregates(serverSections, leaderboard, reference, exact) {
+    const exactBySize = new Map();
+    (exact || []).forEach((section) => {
+      const curve = (section.points || [])
+        .map((entry) => ({
+          probability: Number(entry.probability),
+          rate: Number(entry.no_syndrome_logical),
+        }))
+        .filter((entry) => Number.isFinite(entry.probability) && Number.isFinite(entry.rate));
+      exactBySize.set(Number(section.grid_size), curve);
+    });
+    const referenceByLevel = new Map();
+    (reference || []).forEach((section) => {
+      (section.points || []).forEach((entry) => {
+        referenceByLevel.set(Number(section.grid_size) + '|' + Number(entry.probability), entry);
+      });
+    });
+    const bestByLevel = new Map();
+    (leaderboard || []).forEach((entry) => {
+      const leader = Array.isArray(entry.players) && entry.players.length ? entry.players[0] : null;
+      if (leader) {
+        bestByLevel.set(Number(entry.grid_size) + '|' + Number(entry.probability), leader);
+      }
+    });
+
+    return (serverSections || [])
+      .map((section) => {
+        const gridSize = Number(section.grid_size);
+        const totals = section.totals || {};
+        const points = (section.points || []).map((entry) => {
+          const probability = Number(entry.probability);
+          const best = bestByLevel.get(gridSize + '|' + probability);
+          const bestRate = best ? Number(best.logical_error_rate) : NaN;
+          const ref = referenceByLevel.get(gridSize + '|' + probability);
+          const referenceRate = ref ? Number(ref.logical_error_rate) : NaN;
+          return {
+            probability,
+            totalRounds: Number(entry.total_rounds) || 0,
+            logicalFailures: Number(entry.logical_failures) || 0,
+            logicalErrorRate: Number(entry.logical_error_rate) || 0,
+            stderr: Number(entry.stderr) || 0,
+            bestName: best ? best.name : null,
+            bestRate: Number.isFinite(bestRate) ? bestRate : null,
+            referenceRate: Number.isFinite(referenceRate) ? referenceRate : null,
+            referenceStderr: ref ? Number(ref.stderr) || 0 : 0,
+          };
+        });
+        return {
+          gridSize,
+          points,
+          exactCurve: exactBySize.get(gridSize) || [],
+          totals: {
+            totalRounds: Number(totals.total_rounds) || 0,
+            logicalFailures: Number(totals.logical_failures) || 0,
+          },
+        };
+      })
+      .filter((section) => Number.isFinite(section.gridSize) && section.points.length)
+      .sort((a, b) => a.gridSize - b.gridSize);
+  }
+
+  function drawStatsChart(canvas, seriesList, threshold, size) {
+    if (!canvas || !canvas.getContext || !Array.isArray(seriesList) || !seriesList.length) {
+      return;
+    }
+    const usableSeries = seriesList
+      .map((series) => ({
+        gridSize: series.gridSize,
+        color: series.color || 'rgba(120, 200, 255, 0.9)',
+        points: Array.isArray(series.points) ? series.points.slice() : [],
+        exactCurve: Array.isArray(series.exactCurve) ? series.exactCurve : [],
+      }))
+      .map((series) => {
+        series.points.sort((a, b) => a.probability - b.probability);
+        return series;
+      })
+      .filter((series) => series.points.length);
+    if (!usableSeries.length) {
+      return;
+    }
+
+    const allPoints = usableSeries.flatMap((series) => series.points);
+    const ctx = canvas.getContext('2d');
+    const dpr = size.dpr || 1;
+    const cssWidth = size.width || 560;
+    const cssHeight = size.height || 280;
+    const actualWidth = Math.max(1, Math.round(cssWidth * dpr));
+    const actualHeight = Math.max(1, Math.round(cssHeight * dpr));
+    if (canvas.width !== actualWidth) {
+      canvas.width = actualWidth;
+    }
+    if (canvas.height !== actualHeight) {
+      canvas.height = actualHeight;
+    }
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.clearRect(0, 0, actualWidth, actualHeight);
+    ctx.scale(dpr, dpr);
+    const width = cssWidth;
+    const height = cssHeight;
+
+    const margin = 48;
+    const chartWidth = width - margin * 2;
+    const chartHeight = height - margin * 2;
+    const minProb = 0;
+    const maxProb = Math.max(...allPoints.map((p) => p.probability), 0.01);
+    let maxRate = Math.max(
+      ...allPoints.map((p) => Math.max(p.logicalErrorRate + p.stderr, (p.referenceRate || 0) + (p.referenceStderr || 0))),
+      0.001,
+    );
+    if (!Number.isFinite(maxRate) || maxRate <= 0) {
+      maxRate = 0.001;
+    }
+    const paddedMaxRate = maxRate * 1.2;
+
+    const probRange = Math.max(maxProb - minProb, 0.001);
+    const rateRange = Math.max(paddedMaxRate, 0.001);
+
+    const projectX = (probability) => {
+      return margin + ((probability - minProb) / probRange) * chartWidth;
+    };
+    const projectY = (rate) => {
+      return margin + chartHeight - Math.max(0, Math.min(rate, rateRange)) / rateRange * chartHeight;
+    };
+
+    ctx.save();
+    ctx.strokeStyle = 'rgba(120, 150, 255, 0.4)';
+    ctx.lineWidth = 1;
+    ctx.beginPath();
+    ctx.moveTo(margin, margin);
+    ctx.lineTo(margin, margin + chartHeight);
+    ctx.lineTo(margin + chartWidth, margin + chartHeight);
+    ctx.stroke();
+
+    ctx.fillStyle = 'rgba(200, 210, 255, 0.65)';
+    ctx.font = '12px "Inter", sans-serif';
+    ctx.textBaseline = 'middle';
+    const tickCount = 4;
+    for (let i = 0; i <= tickCount; i += 1) {
+      const rateValue = (rateRange / tickCount) * i;
+      const y = projectY(rateValue);
+      ctx.strokeStyle = 'rgba(120, 150, 255, 0.12)';
+      ctx.beginPath();
+      ctx.moveTo(margin, y);
+      ctx.lineTo(margin + chartWidth, y);
+      ctx.stroke();
+      ctx.fillText(rateValue.toExponential(1), margin - 6, y);
+    }
+
+    ctx.textBaseline = 'top';
+    const xTickCount = Math.min(Math.max(allPoints.length, 1), 6);
+    for (let i = 0; i <= xTickCount; i += 1) {
+      const ratio = xTickCount ? i / xTickCount : 0;
+      const probValue = minProb + ratio * probRange;
+      const x = projectX(probValue);
+      ctx.strokeStyle = 'rgba(120, 150, 255, 0.12)';
+      ctx.beginPath();
+      ctx.moveTo(x, margin);
+      ctx.lineTo(x, margin + chartHeight);
+      ctx.stroke();
+      ctx.fillStyle = 'rgba(200, 210, 255, 0.65)';
+      ctx.fillText(probValue.toFixed(3), x - 12, margin + chartHeight + 6);
+    }
+
+    const thresholdValue = threshold ? Number(threshold.threshold) : NaN;
+    if (Number.isFinite(thresholdValue) && thresholdValue <= maxProb) {
+      const interval = Array.isArray(threshold.interval) ? threshold.interval.map(Number) : [];
+      if (interval.length === 2 && interval.every(Number.isFinite)) {
+        const left = projectX(Math.max(interval[0], minProb));
+        const right = projectX(Math.min(interval[1], maxProb));
+        ctx.fillStyle = 'rgba(250, 204, 21, 0.12)';
+        ctx.fillRect(left, margin, Math.max(right - left, 1), chartHeight);
+      }
+      const x = projectX(thresholdValue);
+      ctx.save();
+      ctx.strokeStyle = 'rgba(250, 204, 21, 0.85)';
+      ctx.setLineDash([6, 4]);
+      ctx.beginPath();
+      ctx.moveTo(x, margin);
+      ctx.lineTo(x, margin + chartHeight);
+      ctx.stroke();
+      ctx.restore();
+      ctx.fillStyle = 'rgba(250, 204, 21, 0.9)';
+      ctx.fillText('p_th ≈ ' + thresholdValue.toFixed(3), x + 4, margin + 2);
+    }
+
+    // Exact undetected-logical rate: a thin line under the player points.
+    usableSeries.forEach((series) => {
+      const curve = series.exactCurve.filter((entry) => entry.probability <= maxProb);
+      if (curve.length < 2) {
+        return;
+      }
+      ctx.save();
+      ctx.strokeStyle = series.color;
+      ctx.globalAlpha = 0.45;
+      ctx.lineWidth = 1;
+      ctx.beginPath();
+      curve.forEach((entry, index) => {
+        const x = projectX(entry.probability);
+        const y = projectY(entry.rate);
+        if (index === 0) {
+          ctx.moveTo(x, y);
+        } else {
+          ctx.lineTo(x, y);
+        }
+      });
+      ctx.stroke();
+      ctx.restore();
+    });
+
+    usableSeries.forEach((series) => {
+      ctx.save();
+      ctx.strokeStyle = series.color;
+      ctx.lineWidth = 2;
+      ctx.beginPath();
+      series.points.forEach((point, index) => {
+        const x = projectX(point.probability);
+        const y = projectY(point.logicalErrorRate);
+        if (index === 0) {
+          ctx.moveTo(x, y);
+        } else {
+          ctx.lineTo(x, y);
+        }
+      });
+      ctx.stroke();
+
+      ctx.lineWidth = 1;
+      series.points.forEach((point) => {
+        const x = projectX(point.probability);
+        const yCenter = projectY(point.logicalErrorRate);
+        const yTop = projectY(point.logicalErrorRate + point.stderr);
+        const yBottom = projectY(Math.max(point.logicalErrorRate - point.stderr, 0));
+        ctx.strokeStyle = series.color;
+        ctx.beginPath();
+        ctx.moveTo(x, yTop);
+        ctx.lineTo(x, yBottom);
+        ctx.stroke();
+        ctx.beginPath();
+        ctx.moveTo(x - 4, yTop);
+        ctx.lineTo(x + 4, yTop);
+        ctx.moveTo(x - 4, yBottom);
+        ctx.lineTo(x + 4, yBottom);
+        ctx.stroke();
+
+        ctx.fillStyle = series.color;
+        ctx.beginPath();
+        ctx.arc(x, yCenter, 3, 0, Math.PI * 2);
+        ctx.fill();
+      });
+
+      // Importance-sampled decoder reference: dashed line, hollow markers.
+      const referencePoints = series.points.filter((point) => point.referenceRate !== null && point.referenceRate !== undefined);
+      if (referencePoints.length) {
+        ctx.globalAlpha = 0.8;
+        ctx.setLineDash([4, 3]);
+        ctx.beginPath();
+        referencePoints.forEach((point, index) => {
+          const x = projectX(point.probability);
+          const y = projectY(point.referenceRate);
+          if (index === 0) {
+            ctx.moveTo(x, y);
+          } else {
+            ctx.lineTo(x, y);
+          }
+        });
+        ctx.stroke();
+        ctx.setLineDash([]);
+        referencePoints.forEach((point) => {
+          ctx.beginPath();
+          ctx.arc(projectX(point.probability), projectY(point.referenceRate), 3.5, 0, Math.PI * 2);
+          ctx.stroke();
+        });
+      }
+      ctx.restore();
+    });
+    ctx.restore();
+
+    ctx.fillStyle = 'rgba(210, 220, 255, 0.75)';
+    ctx.font = '12px "Inter", sans-serif';
+    ctx.fillText('Physical error probability', margin + chartWidth / 2 - 80, height - 12);
+    ctx.save();
+    ctx.translate(14, margin + chartHeight / 2 + 60);
+    ctx.rotate(-Math.PI / 2);
+    ctx.fillText('Logical error rate', 0, 0);
+    ctx.restore();
+  }
+
+  function buildSeries(sections) {
+    return sections
+      .map((section, index) => ({
+        gridSize: section.gridSize,
+        points: Array.isArray(section.points) ? section.points : [],
+        exactCurve: Array.isArray(section.exactCurve) ? section.exactCurve : [],
+        totals: section.totals || { totalRounds: 0, logicalFailures: 0 },
+        color: PALETTE[index % PALETTE.length],
+      }))
+      .filter((section) => section.points.length);
+  }
+
+  function prepareStats(serverSections, leaderboard, threshold, reference, exact) {
+    return {
+      series: buildSeries(mergeServerAggregates(serverSections, leaderboard, reference, exact)),
+      threshold: threshold || null,
+    };
+  }
+
+  scope.StatsCore = { mergeServerAggregates, buildSeries, drawStatsChart, prepareStats };
+
+  if (typeof WorkerGlobalScope === 'undefined' || !(scope instanceof WorkerGlobalScope)) {
+    return;
+  }
+
+  // Response bodies arrive as transferred ArrayBuffers, so the worker pays
+  // for decoding and JSON.parse instead of the page.
+  const decoder = new TextDecoder();
+  const parse = (buffer) => (buffer ? JSON.parse(decoder.decode(buffer)) : null);
+  const parseOptional = (buffer) => {
+    try {
+      return parse(buffer);
+    } catch (error) {
+      return null;
+    }
+  };
+
+  scope.onmessage = (event) => {
+    const message = event.data || {};
+    try {
+      if (message.type === 'prepare') {
+        const result = prepareStats(
+          parse(message.aggregate),
+          parse(message.leaderboard),
+          parseOptional(message.threshold),
+          parseOptional(message.reference),
+          parseOptional(message.exact),
+        );
+        scope.postMessage({ id: message.id, result });
+      } else if (message.type === 'draw') {
+        drawStatsChart(message.canvas, message.series, message.threshold, message.size);
+        scope.postMessage({ id: message.id, result: true });
+      }
+    } catch (error) {
+      scope.postMessage({ id: message.id, error: String((error && error.message) || error) });
+    }
+  };
+})(self);
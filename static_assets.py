@@ -0,0 +1,118 @@
+"""Fingerprinted, precompressed static assets for the game page.
+
+The page's stylesheet and script live in ``static/``. Each asset is read once
+per process and published under a name containing a digest of its contents
+(``js/app.3f2a9c1b7e4d.js``). Because the URL changes whenever the content
+does, browsers may keep a response for a year without revalidating.
+
+Every asset is served precompressed: gzip always, brotli when the optional
+``brotli`` package is installed. Compressed variants are cached under
+``.cache/assets`` keyed by the digest, so restarts only pay for hashing.
+
+    python static_assets.py   # warm the cache during a deploy build
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+
+try:  # optional: brotli is smaller than gzip but not always installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+CACHE_DIR = os.path.join(
+    os.environ.get("ASSET_CACHE_DIR", os.path.join(BASE_DIR, ".cache")), "assets"
+)
+ASSET_NAMES = ("css/app.css", "js/stats.js", "js/app.js")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DIGEST_LENGTH = 12
+
+# Preferred first when the client accepts several.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # mtime=0 keeps the gzip bytes identical across builds.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+@dataclass(frozen=True)
+class Asset:
+    name: str
+    path: str
+    digest: str
+    mimetype: str
+    variants: dict = field(repr=False)
+
+    def negotiate(self, accept_encodings) -> str:
+        """Pick the best encoding from a werkzeug ``Accept`` (or any mapping to q-values)."""
+
+        for encoding, _ in _ENCODINGS:
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return encoding
+        return "identity"
+
+
+class AssetBundle:
+    """Digest-named assets with their encoded variants, loaded eagerly."""
+
+    def __init__(self, names=ASSET_NAMES, static_dir: str = STATIC_DIR, cache_dir: str | None = CACHE_DIR):
+        self._by_name = {}
+        self._by_path = {}
+        for name in names:
+            asset = self._load(name, static_dir, cache_dir)
+            self._by_name[name] = asset
+            self._by_path[asset.path] = asset
+
+    @staticmethod
+    def _load(name: str, static_dir: str, cache_dir: str | None) -> Asset:
+        with open(os.path.join(static_dir, name), "rb") as handle:
+            data = handle.read()
+        digest = hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+        stem, ext = os.path.splitext(name)
+        path = f"{stem}.{digest}{ext}"
+
+        variants = {"identity": data}
+        for encoding, suffix in _ENCODINGS:
+            if encoding == "br" and brotli is None:
+                continue
+            cached = os.path.join(cache_dir, path + suffix) if cache_dir else None
+            if cached and os.path.exists(cached):
+                with open(cached, "rb") as handle:
+                    variants[encoding] = handle.read()
+                continue
+            variants[encoding] = _compress(encoding, data)
+            if cached:
+                os.makedirs(os.path.dirname(cached), exist_ok=True)
+                tmp_path = f"{cached}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as handle:
+                    handle.write(variants[encoding])
+                os.replace(tmp_path, cached)
+
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return Asset(name=name, path=path, digest=digest, mimetype=mimetype, variants=variants)
+
+    def url(self, name: str) -> str:
+        """Public URL of the fingerprinted asset for source ``name``."""
+
+        return f"/assets/{self._by_name[name].path}"
+
+    def get(self, path: str) -> Asset | None:
+        return self._by_path.get(path)
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
+
+if __name__ == "__main__":
+    for asset in AssetBundle():
+        sizes = ", ".join(f"{key} {len(body)} B" for key, body in asset.variants.items())
+        print(f"{asset.path}: {sizes}")
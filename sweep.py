@@ -0,0 +1,197 @@
+"""Parallel (d, p) sweeps for machine reference curves.
+
+Every ``(grid_size, probability)`` point is split into fixed-size chunks and
+each chunk runs as an independent job on a process pool. Jobs get their own
+random stream spawned from one ``SeedSequence`` in a fixed job order, so a
+sweep is reproducible regardless of worker count or completion order, and a
+checkpointed sweep resumed later produces the same totals as an
+uninterrupted one.
+
+Results use the shape of the app's save payload -- one entry per grid size
+with ``probability_stats`` records -- so they can be plotted next to player
+data or posted to ``/api/game/save_batch``.
+
+    python sweep.py --shots 200000 --levels 10 --checkpoint sweep.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from levels import ALLOWED_GRID_SIZES, generate_levels
+
+DEFAULT_CHUNK_SHOTS = 50_000
+
+
+def _run_job(d: int, p: float, shots: int, seed: np.random.SeedSequence, use_decoder: bool) -> dict:
+    """Worker entry point: sample one chunk and return its raw counts."""
+
+    rng = np.random.default_rng(seed)
+    if use_decoder:
+        from decoder import baseline
+
+        result = baseline(d, p, shots, rng=rng)
+        failures = result["logical_failures"]
+    else:
+        from packed_code import simulate_packed
+
+        result = simulate_packed(d, p, shots, rng=rng)
+        failures = result["no_syndrome_logical"]
+    return {
+        "shots": shots,
+        "logical_failures": failures,
+        "no_syndrome": result["no_syndrome"],
+        "no_syndrome_logical": result["no_syndrome_logical"],
+    }
+
+
+def _plan(distances, levels, shots: int, chunk_shots: int) -> list[tuple]:
+    jobs = []
+    for d in distances:
+        for level_index, p in enumerate(levels):
+            remaining = int(shots)
+            chunk = 0
+            while remaining > 0:
+                size = min(remaining, chunk_shots)
+                jobs.append((f"{d}:{level_index}:{chunk}", d, float(p), size))
+                remaining -= size
+                chunk += 1
+    return jobs
+
+
+def _load_checkpoint(path: str | None, config: dict) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        state = json.load(handle)
+    if state.get("config") != config:
+        raise ValueError(f"checkpoint {path} was written for a different sweep")
+    return state.get("completed", {})
+
+
+def _write_checkpoint(path: str | None, config: dict, completed: dict) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"config": config, "completed": completed}, handle)
+    os.replace(tmp_path, path)
+
+
+def _summarise(distances, levels, jobs, completed) -> list[dict]:
+    totals = {}
+    for job_id, d, p, _ in jobs:
+        counts = completed.get(job_id)
+        if counts is None:
+            continue
+        entry = totals.setdefault((d, p), {"total_rounds": 0, "logical_failures": 0})
+        entry["total_rounds"] += counts["shots"]
+        entry["logical_failures"] += counts["logical_failures"]
+
+    results = []
+    for d in distances:
+        stats = [
+            {"probability": round(float(p), 6), **totals[(d, float(p))]}
+            for p in levels
+            if (d, float(p)) in totals
+        ]
+        results.append({"grid_size": d, "probability_stats": stats})
+    return results
+
+
+def run_sweep(
+    distances,
+    levels,
+    shots: int,
+    chunk_shots: int = DEFAULT_CHUNK_SHOTS,
+    seed: int = 0,
+    workers: int | None = None,
+    checkpoint: str | None = None,
+    use_decoder: bool = True,
+    progress=None,
+) -> list[dict]:
+    """Run the sweep on a process pool and return ``probability_stats``-shaped results.
+
+    ``use_decoder`` counts failures of the automatic decoder; otherwise only
+    undetected logical errors in syndrome-free rounds are counted. Completed
+    chunks are recorded in ``checkpoint`` (if given) as they arrive, and a
+    rerun with the same arguments skips them. ``progress(done, total)`` is
+    called after each merged chunk.
+    """
+
+    distances = [int(d) for d in distances]
+    levels = [float(p) for p in levels]
+    config = {
+        "distances": distances,
+        "levels": levels,
+        "shots": int(shots),
+        "chunk_shots": int(chunk_shots),
+        "seed": int(seed),
+        "use_decoder": bool(use_decoder),
+    }
+    jobs = _plan(distances, levels, shots, chunk_shots)
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs))
+    completed = _load_checkpoint(checkpoint, config)
+
+    pending = [(job, job_seed) for job, job_seed in zip(jobs, seeds) if job[0] not in completed]
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_job, d, p, size, job_seed, use_decoder): job_id
+                for (job_id, d, p, size), job_seed in pending
+            }
+            for future in as_completed(futures):
+                completed[futures[future]] = future.result()
+                _write_checkpoint(checkpoint, config, completed)
+                if progress is not None:
+                    progress(len(completed), len(jobs))
+
+    return _summarise(distances, levels, jobs, completed)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Parallel (d, p) reference sweep")
+    parser.add_argument("--shots", type=int, default=100_000, help="shots per (d, p)")
+    parser.add_argument("--chunk-shots", type=int, default=DEFAULT_CHUNK_SHOTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--levels", type=int, default=10, help="number of levels")
+    parser.add_argument("--distances", type=int, nargs="*", default=None)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--output", default=None, help="write JSON results here")
+    parser.add_argument(
+        "--undetected-only",
+        action="store_true",
+        help="count only undetected logical errors instead of running the decoder",
+    )
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        print(f"\r{done}/{total} chunks", end="", flush=True)
+
+    results = run_sweep(
+        args.distances or ALLOWED_GRID_SIZES,
+        generate_levels(args.levels),
+        args.shots,
+        chunk_shots=args.chunk_shots,
+        seed=args.seed,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+        use_decoder=not args.undetected_only,
+        progress=report,
+    )
+    print()
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
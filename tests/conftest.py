@@ -0,0 +1,70 @@
+"""Shared fixtures: every test gets its own SQLite database and empty caches."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Must happen before anything imports app/database.
+_WORKDIR = tempfile.mkdtemp(prefix="whack-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_WORKDIR, 'import.db')}"
+os.environ["DECODER_CACHE_DIR"] = os.path.join(_WORKDIR, "decoder-cache")
+os.environ["ASSET_CACHE_DIR"] = os.path.join(_WORKDIR, "asset-cache")
+os.environ.pop("WRITE_BEHIND_ENABLED", None)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'whack.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    return url
+
+
+@pytest.fixture
+def db(database_url, monkeypatch):
+    """A fresh ``DatabaseManager`` swapped in for ``app.db_manager``."""
+
+    import app as app_module
+    from database import DatabaseManager
+
+    manager = DatabaseManager()
+    monkeypatch.setattr(app_module, "db_manager", manager)
+    # Cache keys include the data version, which restarts with each database.
+    app_module.response_cache.clear()
+    yield manager
+    manager.close()
+    if manager.initialized:
+        manager.engine.dispose()
+        manager.reader_engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    import app as app_module
+
+    return app_module.app.test_client()
+
+
+def save_session(client, uid, name="alice", grid_size=3, stats=()):
+    """POST one session summary; ``stats`` holds ``(p, rounds, failures)`` triples."""
+
+    response = client.post(
+        "/api/game/save",
+        json={
+            "uid": uid,
+            "name": name,
+            "grid_size": grid_size,
+            "error_probabilities": [p for p, _, _ in stats],
+            "probability_stats": [
+                {"probability": p, "total_rounds": rounds, "logical_failures": failures}
+                for p, rounds, failures in stats
+            ],
+        },
+    )
+    assert response.status_code in (200, 201), response.get_json()
+    return response
@@ -0,0 +1,139 @@
+"""Paging, conditional responses and bulk export of ``/api/game/*``."""
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import app as app_module
+from conftest import save_session
+from database import GameData
+
+STATS = [(0.01, 10, 2), (0.05, 10, 5)]
+
+
+def _backdate(db, uids, start=datetime(2024, 1, 1)):
+    """Give ``uids`` ascending timestamps in the past, one minute apart."""
+
+    with db.writer() as session:
+        for offset, uid in enumerate(uids):
+            session.execute(
+                update(GameData)
+                .where(GameData.uid == uid)
+                .values(timestamp=start + timedelta(minutes=offset))
+            )
+        session.commit()
+    db.close()
+
+
+def test_cursor_pages_cover_every_session_once(client, db):
+    uids = [f"s{index}" for index in range(7)]
+    for uid in uids:
+        save_session(client, uid, stats=STATS)
+    _backdate(db, uids)
+    # Two sessions share a timestamp so the uid tie-break is exercised.
+    _backdate(db, ["s3"], start=datetime(2024, 1, 1, 0, 4))
+
+    expected = [row["uid"] for row in client.get("/api/game/data").get_json()]
+    assert sorted(expected) == sorted(uids)
+
+    seen = []
+    url = "/api/game/data?limit=2"
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen += [row["uid"] for row in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        url = f"/api/game/data?limit=2&cursor={cursor}"
+    assert seen == expected
+
+
+@pytest.mark.parametrize(
+    "query", ["cursor=not-a-cursor", "grid_size=abc", "since=yesterday", "until=soon"]
+)
+def test_bad_query_arguments_are_rejected(client, query):
+    response = client.get(f"/api/game/data?{query}")
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+
+def test_etag_revalidates_until_a_save(client):
+    first = client.get("/api/game/data")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    cached = client.get("/api/game/data", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    save_session(client, "fresh", stats=STATS)
+    changed = client.get("/api/game/data", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [row["uid"] for row in changed.get_json()] == ["fresh"]
+
+
+def _export(client, query=""):
+    response = client.get(f"/api/game/export?{query}")
+    assert response.status_code == 200
+    assert response.mimetype == "application/gzip"
+    assert response.headers["X-Export-Until"]
+    return gzip.decompress(response.data).decode("utf-8")
+
+
+def test_csv_export_has_one_row_per_level(client, db):
+    save_session(client, "e1", "alice", 3, STATS)
+    save_session(client, "e2", "bob", 5, [])
+    _backdate(db, ["e1", "e2"])
+
+    rows = list(csv.reader(io.StringIO(_export(client))))
+    assert tuple(rows[0]) == app_module.EXPORT_CSV_COLUMNS
+    assert rows[1:] == [
+        ["e1", "2024-01-01T00:00:00", "alice", "3", "0", "0.01", "10", "2"],
+        ["e1", "2024-01-01T00:00:00", "alice", "3", "1", "0.05", "10", "5"],
+        ["e2", "2024-01-01T00:01:00", "bob", "5", "", "", "", ""],
+    ]
+
+    filtered = list(csv.reader(io.StringIO(_export(client, "grid_size=5"))))
+    assert [row[0] for row in filtered[1:]] == ["e2"]
+
+
+def test_empty_exports_are_still_well_formed(client, db):
+    save_session(client, "e1", stats=STATS)
+    _backdate(db, ["e1"])
+
+    assert _export(client, "since=2100-01-01") == ",".join(app_module.EXPORT_CSV_COLUMNS) + "\n"
+    assert _export(client, "since=2100-01-01&format=ndjson") == ""
+
+
+def test_ndjson_export_has_one_line_per_session(client, db, monkeypatch):
+    # Small chunks so a session's level rows straddle a chunk boundary.
+    monkeypatch.setattr(app_module, "EXPORT_CHUNK_SIZE", 1)
+    save_session(client, "n1", "alice", 3, STATS)
+    save_session(client, "n2", "bob", 4, [(0.1, 3, 1)])
+    _backdate(db, ["n1", "n2"])
+
+    lines = [json.loads(line) for line in _export(client, "format=ndjson").splitlines()]
+    assert [line["uid"] for line in lines] == ["n1", "n2"]
+    assert lines[0]["error_probabilities"] == [0.01, 0.05]
+    assert lines[0]["probability_stats"] == [
+        {"probability": 0.01, "total_rounds": 10, "logical_failures": 2},
+        {"probability": 0.05, "total_rounds": 10, "logical_failures": 5},
+    ]
+    assert lines[1]["probability_stats"] == [
+        {"probability": 0.1, "total_rounds": 3, "logical_failures": 1}
+    ]
+
+    since = _export(client, "format=ndjson&since=2024-01-01T00:01:00").splitlines()
+    assert [json.loads(line)["uid"] for line in since] == ["n2"]
+
+
+@pytest.mark.parametrize("query", ["format=xml", "since=bad", "grid_size=abc"])
+def test_bad_export_arguments_are_rejected(client, query):
+    assert client.get(f"/api/game/export?{query}").status_code == 400
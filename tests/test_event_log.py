@@ -0,0 +1,70 @@
+"""Packing and replay of per-round event logs."""
+from __future__ import annotations
+
+import pytest
+
+from event_log import decode_batch, encode_batch
+
+RECORDS = [
+    {"kind": "success", "error": [0, 4], "flips": [0, 4], "flip_ms": [120, 480]},
+    {"kind": "logical_error", "error": [12], "flips": [], "flip_ms": []},
+    {"kind": "no_syndrome", "rounds": 3, "logical": 1},
+    {"kind": "success", "error": [], "flips": [7, 7], "flip_ms": [300.4, 300.6]},
+]
+
+
+def test_encode_decode_round_trip():
+    decoded = decode_batch(encode_batch(3, RECORDS))
+
+    assert decoded["grid_size"] == 3
+    assert [record["kind"] for record in decoded["records"]] == [
+        "success",
+        "logical_error",
+        "no_syndrome",
+        "success",
+    ]
+    first, second, run, last = decoded["records"]
+    assert (first["error"], first["flips"], first["flip_ms"]) == ([0, 4], [0, 4], [120, 480])
+    # Correcting both flipped qubits clears the syndrome.
+    assert first["syndrome_weights"][-1] == 0
+    assert second["flips"] == [] and second["syndrome_weights"] == [second["syndrome_weights"][0]]
+    assert run == {"kind": "no_syndrome", "rounds": 3, "logical": 1}
+    assert last["flip_ms"] == [300, 301]
+    assert last["syndrome_weights"][0] == last["syndrome_weights"][2] == 0
+
+
+@pytest.mark.parametrize(
+    "record, message",
+    [
+        ({"kind": "unknown"}, "unknown record kind"),
+        ({"kind": ["success"]}, "unknown record kind"),
+        ({"kind": "no_syndrome", "rounds": "x"}, "rounds must be an integer"),
+        ({"kind": "no_syndrome", "rounds": 1, "logical": 2}, "invalid syndrome-free run"),
+        ({"kind": "success", "error": 5}, "error must be a list"),
+        ({"kind": "success", "error": [99]}, "outside the code"),
+        ({"kind": "success", "flips": [None], "flip_ms": [1]}, "flips must hold qubit indices"),
+        ({"kind": "success", "flips": [1], "flip_ms": 5}, "flip_ms must be a list"),
+        ({"kind": "success", "flips": [1], "flip_ms": [float("inf")]}, "flip_ms must be finite"),
+        ({"kind": "success", "flips": [1, 2], "flip_ms": [5, 1]}, "non-decreasing"),
+        ({"kind": "success", "flips": [1], "flip_ms": []}, "same length"),
+    ],
+)
+def test_invalid_records_raise_value_error(record, message):
+    with pytest.raises(ValueError, match=message):
+        encode_batch(3, [record])
+
+
+def test_events_endpoint_stores_and_replays(client):
+    body = {"uid": "ev1", "grid_size": 3, "level": 0, "probability": 0.05, "records": RECORDS}
+    assert client.post("/api/game/events", json=body).status_code == 202
+
+    stored = client.get("/api/game/events/ev1").get_json()
+    assert len(stored) == 1
+    assert stored[0]["records"] == decode_batch(encode_batch(3, RECORDS))["records"]
+
+
+@pytest.mark.parametrize("changes", [{"level": 10**12}, {"level": -1}, {"grid_size": 9}])
+def test_events_endpoint_rejects_out_of_range_batches(client, changes):
+    body = {"uid": "ev1", "grid_size": 3, "level": 0, "probability": 0.05, "records": RECORDS}
+    body.update(changes)
+    assert client.post("/api/game/events", json=body).status_code == 400
@@ -0,0 +1,128 @@
+"""Aggregate bookkeeping and schema migrations."""
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import create_engine, func, select, text
+
+from conftest import save_session
+from database import (
+    LATEST_SCHEMA_VERSION,
+    DatabaseManager,
+    DataVersion,
+    GameData,
+    GameLevelStats,
+    LevelAggregate,
+    PlayerAggregate,
+    rebuild_level_aggregates,
+)
+
+
+def _level_totals(session) -> dict:
+    return {
+        (row.grid_size, row.probability): (row.total_rounds, row.logical_failures)
+        for row in session.scalars(select(LevelAggregate))
+        if row.total_rounds or row.logical_failures
+    }
+
+
+def _player_totals(session) -> dict:
+    return {
+        (row.grid_size, row.probability, row.name): (row.total_rounds, row.logical_failures)
+        for row in session.scalars(select(PlayerAggregate))
+        if row.total_rounds or row.logical_failures
+    }
+
+
+def test_updates_apply_deltas_that_match_a_full_rebuild(client, db):
+    save_session(client, "a1", "alice", 3, [(0.01, 10, 2), (0.05, 10, 5)])
+    save_session(client, "b1", "bob", 3, [(0.01, 4, 1)])
+    # Same uid again: new totals, a new name and a new grid size.
+    save_session(client, "a1", "carol", 5, [(0.01, 20, 3)])
+    response = client.post(
+        "/api/game/save_batch",
+        json=[
+            {
+                "uid": "b1",
+                "name": "bob",
+                "grid_size": 3,
+                "probability_stats": [
+                    {"probability": 0.01, "total_rounds": 6, "logical_failures": 0}
+                ],
+            }
+        ],
+    )
+    assert response.status_code == 200
+
+    db.close()
+    assert _level_totals(db.session) == {(5, 0.01): (20, 3), (3, 0.01): (6, 0)}
+    assert _player_totals(db.session) == {(5, 0.01, "carol"): (20, 3), (3, 0.01, "bob"): (6, 0)}
+
+    incremental = (_level_totals(db.session), _player_totals(db.session))
+    db.close()
+    with db.writer() as session:
+        assert rebuild_level_aggregates(session) == 2
+        session.commit()
+    db.close()
+    assert (_level_totals(db.session), _player_totals(db.session)) == incremental
+
+
+def test_baseline_database_migrates_to_latest(database_url):
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        # ``game_data`` as the first release created it, with no other tables.
+        connection.execute(
+            text(
+                "CREATE TABLE game_data ("
+                " uid VARCHAR(32) NOT NULL PRIMARY KEY,"
+                " timestamp DATETIME NOT NULL,"
+                " name VARCHAR(100),"
+                " grid_size INTEGER NOT NULL,"
+                " error_probabilities TEXT NOT NULL,"
+                " probability_stats TEXT NOT NULL)"
+            )
+        )
+        for uid, name, stats in (
+            ("u1", "alice", [[0.01, 10, 1], [0.05, 8, 4]]),
+            ("u2", "alice", [[0.01, 5, 0]]),
+            ("u3", None, []),
+        ):
+            connection.execute(
+                text("INSERT INTO game_data VALUES (:uid, :ts, :name, 3, :probs, :stats)"),
+                {
+                    "uid": uid,
+                    "ts": "2024-01-01 00:00:00.000000",
+                    "name": name,
+                    "probs": json.dumps([p for p, _, _ in stats]),
+                    "stats": json.dumps(
+                        [
+                            {"probability": p, "total_rounds": r, "logical_failures": f}
+                            for p, r, f in stats
+                        ]
+                    ),
+                },
+            )
+    engine.dispose()
+
+    manager = DatabaseManager()
+    try:
+        session = manager.session
+        assert manager._schema_version() == LATEST_SCHEMA_VERSION
+        assert session.scalar(select(func.count()).select_from(GameLevelStats)) == 3
+        assert _level_totals(session) == {(3, 0.01): (15, 1), (3, 0.05): (8, 4)}
+        assert _player_totals(session) == {
+            (3, 0.01, "alice"): (15, 1),
+            (3, 0.05, "alice"): (8, 4),
+        }
+        assert session.scalar(select(DataVersion.version)) is not None
+        assert session.scalar(select(func.count()).select_from(GameData)) == 3
+
+        # A second start takes the fast path and applies nothing.
+        restarted = DatabaseManager()
+        restarted.session
+        assert restarted._schema_is_current()
+        applied = restarted.session.scalar(text("SELECT count(*) FROM schema_version"))
+        assert applied == LATEST_SCHEMA_VERSION
+        restarted.close()
+    finally:
+        manager.close()
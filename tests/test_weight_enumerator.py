@@ -0,0 +1,45 @@
+"""Weight enumerators against brute force at d=3."""
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pytest
+
+from simulation import code_matrices
+from weight_enumerator import exact_rates, sweep_counts, weight_counts
+
+
+def _brute_force(d: int) -> tuple[list[int], list[int]]:
+    H, L = code_matrices(d)
+    n_qubits = H.shape[1]
+    even = [0] * (n_qubits + 1)
+    odd = [0] * (n_qubits + 1)
+    for bits in itertools.product((0, 1), repeat=n_qubits):
+        error = np.array(bits, dtype=np.uint8)
+        if (H @ error % 2).any():
+            continue
+        counts = odd if int(L @ error) % 2 else even
+        counts[int(error.sum())] += 1
+    return even, odd
+
+
+def test_sweep_counts_match_brute_force():
+    assert sweep_counts(3) == _brute_force(3)
+
+
+def test_weight_counts_are_cached_on_disk(tmp_path):
+    counts = weight_counts(3, cache_dir=str(tmp_path))
+    even, odd = sweep_counts(3)
+    assert counts == (tuple(a + b for a, b in zip(even, odd)), tuple(odd))
+    assert [path.suffix for path in tmp_path.iterdir()] == [".json"]
+
+
+def test_exact_rates_evaluate_the_enumerator():
+    _, logical = weight_counts(3)
+    n_qubits = len(logical) - 1
+    p = 0.05
+    expected = sum(c * p**w * (1 - p) ** (n_qubits - w) for w, c in enumerate(logical))
+    (row,) = exact_rates(3, [p])
+    assert row["no_syndrome_logical"] == pytest.approx(expected, rel=1e-12)
+    assert exact_rates(3, [0.0])[0]["no_syndrome"] == 1.0
@@ -0,0 +1,150 @@
+"""Threshold estimate from aggregated per-level results.
+
+Below threshold a larger code has the lower logical error rate and above it
+the higher one, so the curves of neighbouring distances cross near ``p_th``.
+For each pair of neighbouring distances the crossing is where
+``LER_large(p) - LER_small(p)`` turns from negative to positive over the
+probabilities both have data for (see ``crossings``), interpolated linearly.
+The estimate is the mean over pairs.
+
+Confidence intervals use a parametric bootstrap. The failures at every point
+are redrawn as ``Binomial(rounds, observed rate)`` for all resamples at once,
+giving a ``(resamples, points)`` array. The crossing search then works on
+whole columns, so thousands of resamples cost a few array operations per
+distance pair.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+
+
+def crossings(probabilities: np.ndarray, smaller: np.ndarray, larger: np.ndarray) -> np.ndarray:
+    """Crossing per row of two ``(rows, k)`` rate arrays sampled at ``probabilities``.
+
+    Noise near ``p = 0`` (where both rates are ~0) produces spurious sign
+    changes, so rather than the first sign change each row takes the segment
+    that best splits ``diff = larger - smaller`` into "negative before,
+    positive after": the one minimising the total ``|diff|`` on the wrong
+    side. The crossing is interpolated inside that segment. Returns ``NaN``
+    where the best split is not an actual rise through zero.
+    """
+
+    diff = larger - smaller
+    positive = np.cumsum(np.maximum(diff, 0), axis=1)
+    negative = np.cumsum(np.maximum(-diff, 0), axis=1)
+    # Wrong-side mass if the curves cross between points i and i + 1.
+    misfit = positive[:, :-1] + (negative[:, -1:] - negative[:, :-1])
+    index = misfit.argmin(axis=1)
+    rows = np.arange(diff.shape[0])
+    before, after = diff[rows, index], diff[rows, index + 1]
+    found = (before < 0) & (after >= 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = before / (before - after)
+    p0, p1 = probabilities[index], probabilities[index + 1]
+    return np.where(found, p0 + fraction * (p1 - p0), np.nan)
+
+
+def _interval(values: np.ndarray, confidence: float) -> list | None:
+    finite = values[np.isfinite(values)]
+    if not finite.size:
+        return None
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(finite, [tail, 100 - tail])
+    return [float(low), float(high)]
+
+
+def _value(values: np.ndarray) -> float | None:
+    value = float(values[0])
+    return value if np.isfinite(value) else None
+
+
+def estimate_threshold(
+    points,
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed=0,
+    min_rounds: int = 1,
+) -> dict:
+    """Estimate the threshold from ``(grid_size, probability, rounds, failures)`` tuples.
+
+    Each distance pair reports its own crossing, interval and the fraction of
+    resamples in which the curves crossed at all; ``threshold`` combines the
+    pairs.
+    """
+
+    by_distance = {}
+    for grid_size, probability, rounds, failures in points:
+        if rounds >= max(min_rounds, 1):
+            by_distance.setdefault(int(grid_size), {})[round(float(probability), 6)] = (
+                int(rounds),
+                int(failures),
+            )
+
+    keys, rounds, failures = [], [], []
+    position = {}
+    for d in sorted(by_distance):
+        for p, (n, k) in sorted(by_distance[d].items()):
+            position[(d, p)] = len(keys)
+            keys.append((d, p))
+            rounds.append(n)
+            failures.append(min(k, n))
+    rounds = np.asarray(rounds, dtype=np.int64)
+    observed = np.asarray(failures, dtype=np.float64) / np.maximum(rounds, 1)
+
+    # Pair each distance with the next larger one sharing at least two levels.
+    distances = sorted(by_distance)
+    pairs = []
+    for index, small in enumerate(distances):
+        for large in distances[index + 1:]:
+            common = sorted(by_distance[small].keys() & by_distance[large].keys())
+            if len(common) >= 2:
+                pairs.append((small, large, np.asarray(common)))
+                break
+
+    result = {
+        "threshold": None,
+        "interval": None,
+        "confidence": confidence,
+        "resamples": int(resamples),
+        "crossing_fraction": 0.0,
+        "pairs": [],
+        "points": len(keys),
+    }
+    if not pairs:
+        return result
+
+    rng = np.random.default_rng(seed)
+    # Row 0 holds the observed rates; rows 1.. are bootstrap resamples.
+    rates = np.empty((resamples + 1, len(keys)))
+    rates[0] = observed
+    draws = rng.binomial(rounds, observed, size=(resamples, len(keys)))
+    rates[1:] = draws / np.maximum(rounds, 1)
+
+    per_pair = []
+    for small, large, common in pairs:
+        small_index = [position[(small, p)] for p in common]
+        large_index = [position[(large, p)] for p in common]
+        crossing = crossings(common, rates[:, small_index], rates[:, large_index])
+        per_pair.append(crossing)
+        result["pairs"].append(
+            {
+                "distances": [small, large],
+                "crossing": _value(crossing),
+                "interval": _interval(crossing[1:], confidence),
+                "crossing_fraction": float(np.isfinite(crossing[1:]).mean()),
+            }
+        )
+
+    # Mean over the pairs that crossed; NaN when none did.
+    stacked = np.column_stack(per_pair)
+    crossed = np.isfinite(stacked).sum(axis=1)
+    combined = np.where(
+        crossed > 0, np.nansum(stacked, axis=1) / np.maximum(crossed, 1), np.nan
+    )
+    result["threshold"] = _value(combined)
+    result["interval"] = _interval(combined[1:], confidence)
+    result["crossing_fraction"] = float(np.isfinite(combined[1:]).mean())
+    return result
@@ -0,0 +1,198 @@
+"""Exact syndrome-free and undetected-logical rates from weight enumerators.
+
+An error that shows no syndrome lies in the kernel of ``H``; it is an
+undetected logical error when its ``L`` parity is also odd. Both events depend
+on the error only through which qubits flipped, so with ``c_w`` such errors of
+weight ``w`` on ``n`` qubits
+
+    P(p) = sum_w c_w * p**w * (1 - p)**(n - w)
+
+for every ``p``. The counts come from the transfer sweep of
+``simulation.syndrome_free_probabilities`` with integer polynomials in place
+of probabilities: each state holds the number of partial errors per weight,
+and a flipped qubit shifts its polynomial by one. The kernel has dimension
+``d**2 - d + 1`` (2**43 codewords at d=7), so enumerating codewords is out of
+reach, but the sweep touches about ``2**(d + 1)`` states per qubit. That is
+milliseconds up to d=7 and a few seconds at d=11. The counts outgrow ``int64``
+(about 10**24 at d=7) and are kept as Python integers in a JSON file under
+``.cache/``; evaluating a level list afterwards is one small matrix product.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from decoder import CACHE_DIR, _matrix_key
+from levels import ALLOWED_GRID_SIZES, DEFAULT_LEVEL_COUNT, generate_levels
+from simulation import _transfer_plan, code_matrices
+
+FORMAT_VERSION = 1
+# Cold ``weight_counts`` calls sweep under this lock, so concurrent requests
+# for a distance wait for one sweep instead of each running their own.
+_COUNTS_LOCK = threading.Lock()
+_COUNTS = {}
+
+
+def sweep_counts(d: int) -> tuple[list[int], list[int]]:
+    """Per-weight counts of syndrome-free errors with even and odd ``L`` parity.
+
+    Always runs the sweep; ``weight_counts`` is the cached entry point.
+    """
+
+    plan = _transfer_plan(d)
+    n_qubits = len(plan)
+    slots = {}
+    free = []
+    next_slot = 1
+    # Row = state bits (logical parity in bit 0, open stabilizers above), column = weight.
+    table = np.zeros((2, n_qubits + 1), dtype=object)
+    table[0, 0] = 1
+    for step, (checks, logical, closing) in enumerate(plan):
+        flip = 1 if logical else 0
+        for stabilizer in checks:
+            if stabilizer not in slots:
+                if free:
+                    slots[stabilizer] = free.pop()
+                else:
+                    slots[stabilizer] = next_slot
+                    next_slot += 1
+                    table = np.vstack([table, np.zeros_like(table)])
+            flip |= 1 << slots[stabilizer]
+        # After ``step + 1`` qubits no error is heavier than ``step + 1``.
+        width = step + 2
+        index = np.arange(len(table))
+        table[:, 1:width] += table[index ^ flip, : width - 1]
+        for stabilizer in closing:
+            slot = slots.pop(stabilizer)
+            table[(index >> slot) & 1 == 1] = 0
+            free.append(slot)
+    return [int(value) for value in table[0]], [int(value) for value in table[1]]
+
+
+def weight_counts(d: int, cache_dir: str | None = CACHE_DIR) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """``(no_syndrome, no_syndrome_logical)`` error counts per weight ``0..n``.
+
+    ``no_syndrome`` counts every error in the kernel of ``H``;
+    ``no_syndrome_logical`` only those with odd ``L`` parity. The deploy
+    build runs ``python weight_enumerator.py`` so the cache file exists
+    before the first request.
+    """
+
+    key = (d, cache_dir)
+    counts = _COUNTS.get(key)
+    if counts is not None:
+        return counts
+    with _COUNTS_LOCK:
+        counts = _COUNTS.get(key)
+        if counts is None:
+            counts = _load_or_sweep(d, cache_dir)
+            _COUNTS[key] = counts
+    return counts
+
+
+def _load_or_sweep(d: int, cache_dir: str | None) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    H, L = code_matrices(d)
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f"weights-{_matrix_key(H, L)}.json")
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as handle:
+            cached = json.load(handle)
+        if cached.get("format") == FORMAT_VERSION:
+            return tuple(cached["no_syndrome"]), tuple(cached["no_syndrome_logical"])
+
+    even, odd = sweep_counts(d)
+    clean = tuple(a + b for a, b in zip(even, odd))
+    clean_logical = tuple(odd)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "format": FORMAT_VERSION,
+                    "grid_size": d,
+                    "no_syndrome": list(clean),
+                    "no_syndrome_logical": list(clean_logical),
+                },
+                handle,
+            )
+        os.replace(tmp_path, path)
+    return clean, clean_logical
+
+
+@functools.lru_cache(maxsize=None)
+def _log_coefficients(d: int) -> np.ndarray:
+    """``log(c_w)`` for both enumerators as a ``(2, n + 1)`` array (``-inf`` for zero)."""
+
+    rows = []
+    for counts in weight_counts(d):
+        logs = np.full(len(counts), -np.inf)
+        for weight, count in enumerate(counts):
+            if count:
+                logs[weight] = math.log(count)
+        rows.append(logs)
+    coefficients = np.vstack(rows)
+    coefficients.setflags(write=False)
+    return coefficients
+
+
+def exact_rates(d: int, probabilities) -> list[dict]:
+    """Exact no-syndrome and undetected-logical probabilities per round at each ``p``."""
+
+    probabilities = np.asarray([float(p) for p in probabilities], dtype=np.float64)
+    if probabilities.size == 0:
+        return []
+    if ((probabilities < 0) | (probabilities > 1)).any():
+        raise ValueError("probabilities must lie in [0, 1]")
+    coefficients = _log_coefficients(d)
+    n_qubits = coefficients.shape[1] - 1
+    weights = np.arange(n_qubits + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_p = np.log(probabilities)[:, None]
+        log_q = np.log1p(-probabilities)[:, None]
+        # 0 * log(0) is taken as 0 so p=0 and p=1 pick out a single weight.
+        log_terms = np.where(weights > 0, weights * log_p, 0.0) + np.where(
+            weights < n_qubits, (n_qubits - weights) * log_q, 0.0
+        )
+        values = np.exp(log_terms[:, None, :] + coefficients[None, :, :]).sum(axis=2)
+    return [
+        {
+            "probability": round(float(p), 6),
+            "no_syndrome": float(clean),
+            "no_syndrome_logical": float(logical),
+        }
+        for p, (clean, logical) in zip(probabilities, values)
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distances", type=int, nargs="*", default=None)
+    parser.add_argument("--levels", type=int, default=None, help="number of levels")
+    args = parser.parse_args(argv)
+
+    levels = generate_levels(args.levels or DEFAULT_LEVEL_COUNT)
+    print(f"{'d':>3} {'p':>7} {'no-syndrome':>12} {'undetected':>11} {'min weight':>10} {'count':>6}")
+    for d in args.distances or ALLOWED_GRID_SIZES:
+        started = time.perf_counter()
+        _, clean_logical = weight_counts(d)
+        elapsed = time.perf_counter() - started
+        minimum = next(w for w, count in enumerate(clean_logical) if count)
+        for row in exact_rates(d, levels):
+            print(
+                f"{d:>3} {row['probability']:>7.3f} {row['no_syndrome']:>12.4e} "
+                f"{row['no_syndrome_logical']:>11.4e} {minimum:>10} {clean_logical[minimum]:>6}"
+            )
+        print(f"    counts in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
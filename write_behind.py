@@ -0,0 +1,173 @@
+"""In-process write-behind queue that coalesces single saves into batches.
+
+Enabled from ``app.py`` when ``WRITE_BEHIND_ENABLED=1``. Each worker process
+owns one queue and one daemon flusher thread; the thread is started lazily so
+forking servers (gunicorn ``--preload``) do not inherit a dead thread.
+"""
+from __future__ import annotations
+
+import atexit
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Bounded set of pending session records flushed in periodic batches.
+
+    ``flush`` receives a list of records (at most ``max_batch``) and must write
+    them durably or raise. Pending records are keyed by uid and a newer submit
+    replaces the older summary, so the last save always wins. A failed batch
+    goes back to the front of the queue unless a newer save for its uid
+    arrived in the meantime. After ``max_retries`` failed batches its records
+    are written one at a time, so one bad record cannot hold back the others:
+    records that fail on their own are dropped, unless all of them do (the
+    database rather than the data is at fault), in which case they stay
+    queued. Whatever is still pending at interpreter exit is flushed by an
+    ``atexit`` hook.
+    """
+
+    def __init__(self, flush, max_size=1000, interval=1.0, max_batch=200, max_retries=3):
+        self._flush = flush
+        self._pending = {}
+        self._max_size = max_size
+        self._interval = interval
+        self._max_batch = max_batch
+        self._max_retries = max_retries
+        self._thread = None
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self.stats = {"queued": 0, "flushed": 0, "batches": 0, "failures": 0, "dropped": 0}
+        atexit.register(self.close)
+
+    def submit(self, record) -> bool:
+        """Queue ``record``; returns ``False`` when the queue is full.
+
+        A record whose uid is already pending always fits: it replaces the
+        queued one.
+        """
+
+        self._ensure_thread()
+        with self._condition:
+            uid = record["uid"]
+            if uid not in self._pending and len(self._pending) >= self._max_size:
+                return False
+            self._pending[uid] = (record, 0)
+            self.stats["queued"] += 1
+            if len(self._pending) >= self._max_batch:
+                self._condition.notify()
+        return True
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def close(self) -> None:
+        """Stop the flusher and synchronously write everything still queued."""
+
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=self._interval * 2 + 5)
+        while self._flush_once(block=False):
+            pass
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="write-behind-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._flush_once(block=True)
+
+    def _drain(self, block: bool) -> list:
+        """Take up to ``max_batch`` ``(record, attempts)`` pairs, oldest first."""
+
+        deadline = time.monotonic() + self._interval
+        with self._condition:
+            while block and len(self._pending) < self._max_batch and not self._stopping.is_set():
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                self._condition.wait(timeout)
+            uids = list(itertools.islice(self._pending, self._max_batch))
+            return [self._pending.pop(uid) for uid in uids]
+
+    def _restore(self, entries) -> None:
+        """Put failed entries back in front, unless a newer save superseded them."""
+
+        with self._condition:
+            restored = {}
+            for record, attempts in entries:
+                uid = record["uid"]
+                if uid in self._pending:
+                    continue
+                if len(self._pending) + len(restored) >= self._max_size:
+                    self.stats["dropped"] += 1
+                    logger.error("Dropped queued session %s", uid)
+                    continue
+                restored[uid] = (record, attempts)
+            restored.update(self._pending)
+            self._pending = restored
+
+    def _flush_singly(self, records) -> list:
+        """Write records one by one; returns the ones that failed."""
+
+        failed = []
+        for record in records:
+            try:
+                self._flush([record])
+            except Exception:
+                self.stats["failures"] += 1
+                failed.append(record)
+                continue
+            self.stats["batches"] += 1
+            self.stats["flushed"] += 1
+        return failed
+
+    def _flush_once(self, block: bool) -> bool:
+        entries = self._drain(block)
+        if not entries:
+            return False
+
+        records = [record for record, _ in entries]
+        try:
+            self._flush(records)
+        except Exception:
+            self.stats["failures"] += 1
+            logger.exception("Write-behind flush of %d sessions failed", len(records))
+            retry = [(record, attempts + 1) for record, attempts in entries]
+            exhausted = [record for record, attempts in retry if attempts >= self._max_retries]
+            if not self._stopping.is_set() and not exhausted:
+                self._restore(retry)
+                self._stopping.wait(self._interval)
+                return True
+
+            # Shutting down, or this batch keeps failing: isolate the bad records.
+            failed = self._flush_singly(records)
+            if len(failed) == len(records) and not self._stopping.is_set():
+                self._restore([(record, 0) for record in failed])
+            else:
+                for record in failed:
+                    self.stats["dropped"] += 1
+                    logger.error("Dropped session %s after repeated flush failures", record["uid"])
+            if failed:
+                self._stopping.wait(self._interval)
+            return True
+        self.stats["batches"] += 1
+        self.stats["flushed"] += len(records)
+        return True